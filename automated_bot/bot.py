@@ -10,6 +10,7 @@ class SocialNetworkBot:
         self.rules = rules
         self.api_base_url = api_base_url
         self.users = {}
+        self.session = requests.Session()
 
     def signup_users(self) -> None:
         for user_id in range(self.rules.get("number_of_users")):
@@ -36,16 +37,20 @@ class SocialNetworkBot:
             max_posts_number = random.randint(
                 1, self.rules.get("max_posts_per_user")
             )
-            for post_id in range(max_posts_number):
-                post_data = {
+            posts_data = [
+                {
                     "title": f"Post by user #{user_id}",
                     "content": f"Some content in the post #{post_id}",
                 }
-                response = self._make_request(
-                    "POST", "post/", data=post_data, token=token
-                )
+                for post_id in range(max_posts_number)
+            ]
+            response = self._make_request(
+                "POST", "post/bulk/", data={"posts": posts_data}, token=token
+            )
+            results = response.get("results", []) if response else []
+            for post_id, result in enumerate(results):
                 self.users[user_id]["posts"][post_id] = {
-                    "post_id": response.get("id"),
+                    "post_id": result.get("id"),
                     "likes": set(),
                 }
 
@@ -80,7 +85,7 @@ class SocialNetworkBot:
     def _make_request(self, method, endpoint, data=None, token=None):
         headers = {"Authorization": f"Bearer {token}"} if token else {}
         url = f"{self.api_base_url}{endpoint}"
-        response = requests.request(
+        response = self.session.request(
             method=method, url=url, json=data, headers=headers
         )
         return response.json() if response.ok else None
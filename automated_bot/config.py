@@ -5,3 +5,23 @@ rules = {
 }
 
 api_base_url = "http://localhost:8000/api/"
+
+load_rules = {
+    "number_of_users": 20,
+    "posts_per_user": 5,
+    "ramp_up_seconds": 10,
+    "steady_state_seconds": 60,
+    "think_time_seconds": 0.1,
+    # Relative weights of the actions run by every simulated user
+    "workload": {
+        "list_posts": 35,
+        "search_posts": 5,
+        "retrieve_post": 20,
+        "show_feed": 15,
+        "show_favorite_posts": 5,
+        "like_post": 10,
+        "unlike_post": 5,
+        "create_post": 4,
+        "follow_user": 1,
+    },
+}
@@ -0,0 +1,332 @@
+import argparse
+import math
+import random
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from automated_bot.config import load_rules, api_base_url
+
+SEARCH_TERMS = ("content", "post", "user", "some content")
+
+
+def percentile(sorted_values, fraction) -> float:
+    """Nearest-rank percentile of already sorted values"""
+    if not sorted_values:
+        return 0.0
+
+    rank = max(math.ceil(fraction * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+class LoadStats:
+    def __init__(self) -> None:
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, latency, ok) -> None:
+        with self._lock:
+            self.latencies[endpoint].append(latency)
+
+            if not ok:
+                self.errors[endpoint] += 1
+
+    def report(self, duration) -> str:
+        lines = [
+            f"{'Endpoint':<22}{'Requests':>10}{'Errors':>8}{'Req/s':>9}"
+            f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+        ]
+        endpoints = sorted(self.latencies)
+        all_latencies = [
+            latency
+            for endpoint in endpoints
+            for latency in self.latencies[endpoint]
+        ]
+        rows = [
+            (endpoint, self.latencies[endpoint], self.errors[endpoint])
+            for endpoint in endpoints
+        ]
+        rows.append(("total", all_latencies, sum(self.errors.values())))
+
+        for endpoint, latencies, errors in rows:
+            latencies = sorted(latencies)
+            lines.append(
+                f"{endpoint:<22}{len(latencies):>10}{errors:>8}"
+                f"{len(latencies) / duration:>9.1f}"
+                f"{percentile(latencies, 0.50) * 1000:>9.1f}"
+                f"{percentile(latencies, 0.95) * 1000:>9.1f}"
+                f"{percentile(latencies, 0.99) * 1000:>9.1f}"
+            )
+
+        return "\n".join(lines)
+
+
+class SimulatedUser:
+    """
+    A user of the service with its own HTTP session, so that the
+    connection to the server is kept alive between the requests
+    """
+
+    password = "password$$$"
+
+    def __init__(self, name, api_base_url, shared) -> None:
+        self.username = name
+        self.api_base_url = api_base_url
+        self.shared = shared
+        self.session = requests.Session()
+        self.user_id = None
+        self.liked_posts = set()
+
+    def request(self, method, endpoint, data=None, params=None):
+        response = self.session.request(
+            method=method,
+            url=f"{self.api_base_url}{endpoint}",
+            json=data,
+            params=params,
+        )
+
+        if response.status_code == 401 and endpoint != "user/token/":
+            self.login()
+            response = self.session.request(
+                method=method,
+                url=f"{self.api_base_url}{endpoint}",
+                json=data,
+                params=params,
+            )
+
+        return response
+
+    def setup(self, posts_number) -> None:
+        user_data = {"username": self.username, "password": self.password}
+        response = self.request("POST", "user/signup/", data=user_data)
+        response.raise_for_status()
+        self.user_id = response.json()["id"]
+        self.login()
+
+        response = self.request(
+            "POST",
+            "post/bulk/",
+            data={
+                "posts": [
+                    {
+                        "title": f"Post by {self.username}",
+                        "content": f"Some content in the post #{post_id}",
+                    }
+                    for post_id in range(posts_number)
+                ]
+            },
+        )
+        response.raise_for_status()
+        self.shared.add_posts(
+            result["id"] for result in response.json()["results"]
+        )
+        self.shared.add_user(self.user_id)
+
+    def login(self) -> None:
+        response = self.request(
+            "POST",
+            "user/token/",
+            data={"username": self.username, "password": self.password},
+        )
+        response.raise_for_status()
+        self.session.headers["Authorization"] = (
+            f"Bearer {response.json()['access']}"
+        )
+
+    def list_posts(self):
+        return self.request("GET", "post/")
+
+    def search_posts(self):
+        return self.request(
+            "GET", "post/", params={"q": random.choice(SEARCH_TERMS)}
+        )
+
+    def retrieve_post(self):
+        return self.request("GET", f"post/{self.shared.random_post()}/")
+
+    def show_feed(self):
+        return self.request("GET", "post/feed/")
+
+    def show_favorite_posts(self):
+        return self.request("GET", "post/favorite/")
+
+    def like_post(self):
+        post_id = self.shared.random_post()
+        self.liked_posts.add(post_id)
+        return self.request("PUT", f"post/{post_id}/like/")
+
+    def unlike_post(self):
+        if self.liked_posts:
+            post_id = self.liked_posts.pop()
+        else:
+            post_id = self.shared.random_post()
+
+        return self.request("DELETE", f"post/{post_id}/like/")
+
+    def create_post(self):
+        response = self.request(
+            "POST",
+            "post/",
+            data={
+                "title": f"Post by {self.username}",
+                "content": "Some content created under load",
+            },
+        )
+
+        if response.ok:
+            self.shared.add_posts([response.json()["id"]])
+
+        return response
+
+    def follow_user(self):
+        return self.request(
+            "POST", f"user/{self.shared.random_user(self.user_id)}/follow/"
+        )
+
+
+class SharedState:
+    """Ids of the posts and users known to all the simulated users"""
+
+    def __init__(self) -> None:
+        self.post_ids = []
+        self.user_ids = []
+        self._lock = threading.Lock()
+
+    def add_posts(self, post_ids) -> None:
+        with self._lock:
+            self.post_ids.extend(post_ids)
+
+    def add_user(self, user_id) -> None:
+        with self._lock:
+            self.user_ids.append(user_id)
+
+    def random_post(self):
+        return random.choice(self.post_ids)
+
+    def random_user(self, exclude):
+        return random.choice(
+            [user_id for user_id in self.user_ids if user_id != exclude]
+            or self.user_ids
+        )
+
+
+class LoadGenerator:
+    """
+    Runs the simulated users in a thread pool: they start one by one
+    during the ramp-up phase and then all run the workload mix during
+    the steady state. Only the steady state goes to the main report.
+    """
+
+    def __init__(self, rules, api_base_url) -> None:
+        self.rules = rules
+        self.api_base_url = api_base_url
+        self.shared = SharedState()
+        self.ramp_up_stats = LoadStats()
+        self.steady_stats = LoadStats()
+        self.actions, self.weights = zip(*rules["workload"].items())
+
+    def run(self) -> None:
+        run_id = uuid.uuid4().hex[:8]
+        number_of_users = self.rules["number_of_users"]
+        users = [
+            SimulatedUser(
+                f"load_{run_id}_{index}", self.api_base_url, self.shared
+            )
+            for index in range(number_of_users)
+        ]
+
+        with ThreadPoolExecutor(max_workers=number_of_users) as executor:
+            list(executor.map(
+                lambda user: user.setup(self.rules["posts_per_user"]), users
+            ))
+
+            ramp_up = self.rules["ramp_up_seconds"]
+            steady_state = self.rules["steady_state_seconds"]
+            self.started_at = time.monotonic()
+            self.steady_at = self.started_at + ramp_up
+            self.stopped_at = self.steady_at + steady_state
+            futures = [
+                executor.submit(
+                    self.run_user,
+                    user,
+                    self.started_at + index * ramp_up / number_of_users,
+                )
+                for index, user in enumerate(users)
+            ]
+
+            for future in futures:
+                future.result()
+
+        if ramp_up:
+            print(f"Ramp-up ({ramp_up}s):")
+            print(self.ramp_up_stats.report(ramp_up))
+            print()
+
+        print(f"Steady state ({steady_state}s, {number_of_users} users):")
+        print(self.steady_stats.report(steady_state))
+
+    def run_user(self, user, start_at) -> None:
+        time.sleep(max(start_at - time.monotonic(), 0))
+        think_time = self.rules["think_time_seconds"]
+
+        while time.monotonic() < self.stopped_at:
+            action = random.choices(self.actions, self.weights)[0]
+            started = time.monotonic()
+
+            try:
+                ok = getattr(user, action)().ok
+            except requests.RequestException:
+                ok = False
+
+            finished = time.monotonic()
+
+            if started >= self.steady_at:
+                stats = self.steady_stats
+            else:
+                stats = self.ramp_up_stats
+
+            stats.record(action, finished - started, ok)
+
+            if think_time:
+                time.sleep(random.uniform(0, 2 * think_time))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Generate load on the social network API"
+    )
+    parser.add_argument("--base-url", default=api_base_url)
+    parser.add_argument(
+        "--users", type=int, default=load_rules["number_of_users"]
+    )
+    parser.add_argument(
+        "--ramp-up", type=float, default=load_rules["ramp_up_seconds"]
+    )
+    parser.add_argument(
+        "--duration", type=float, default=load_rules["steady_state_seconds"]
+    )
+    parser.add_argument(
+        "--think-time",
+        type=float,
+        default=load_rules["think_time_seconds"],
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    random.seed(args.seed)
+    rules = {
+        **load_rules,
+        "number_of_users": args.users,
+        "ramp_up_seconds": args.ramp_up,
+        "steady_state_seconds": args.duration,
+        "think_time_seconds": args.think_time,
+    }
+    LoadGenerator(rules, args.base_url).run()
@@ -0,0 +1,176 @@
+import json
+import os
+import statistics
+import time
+from datetime import date, timedelta
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from benchmarks.data import BENCHMARK_PASSWORD, seed_benchmark_data
+from post.cache import response_cache
+from social_network.metrics import QueryTimer
+from user.activity import activity_buffer
+from user.cache import user_cache
+
+BUDGETS_PATH = os.path.join(os.path.dirname(__file__), "budgets.json")
+REPETITIONS = int(os.getenv("BENCHMARK_REPETITIONS", 5))
+
+with open(BUDGETS_PATH) as budgets_file:
+    BUDGETS = json.load(budgets_file)
+
+
+# The deployed Django cache (Redis) runs no queries; the database cache
+# used without REDIS_URL would count in the budgets
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+)
+class EndpointBenchmarks(TestCase):
+    """
+    Every route is requested REPETITIONS times against the seeded data,
+    with the response cache cleared, and must stay within the budgets
+    committed in budgets.json: the maximum number of queries and the
+    median DB and wall time in milliseconds.
+    """
+
+    results = {}
+
+    @classmethod
+    def setUpTestData(cls):
+        users, posts = seed_benchmark_data()
+        cls.user = users[0]
+        cls.user.following.add(*users[1:51])
+        cls.post = max(posts, key=lambda post: post.id)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        print(f"\n{'Endpoint':<20}{'Queries':>9}{'DB ms':>9}{'Wall ms':>9}")
+
+        for name, (queries, db_ms, wall_ms) in sorted(cls.results.items()):
+            print(f"{name:<20}{queries:>9}{db_ms:>9.1f}{wall_ms:>9.1f}")
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+        # The user of a signed in client is served from the user cache
+        user_cache.set(self.user)
+
+    def measure(self, name, method, url, data=None, authenticated=True):
+        client = self.client if authenticated else APIClient()
+        samples = []
+
+        for repetition in range(REPETITIONS):
+            response_cache.clear()
+            activity_buffer.flush()
+            timer = QueryTimer()
+            payload = data(repetition) if callable(data) else data
+
+            with connection.execute_wrapper(timer):
+                started = time.perf_counter()
+                response = getattr(client, method)(url, payload, format="json")
+                wall = time.perf_counter() - started
+
+            self.assertLess(response.status_code, 400, response.content)
+            samples.append((timer.count, timer.duration, wall))
+
+        queries = max(sample[0] for sample in samples)
+        db_ms = statistics.median(sample[1] for sample in samples) * 1000
+        wall_ms = statistics.median(sample[2] for sample in samples) * 1000
+        self.results[name] = (queries, db_ms, wall_ms)
+        budget = BUDGETS[name]
+
+        self.assertLessEqual(
+            queries, budget["queries"], f"{name}: too many queries"
+        )
+        self.assertLessEqual(db_ms, budget["db_ms"], f"{name}: DB too slow")
+        self.assertLessEqual(wall_ms, budget["wall_ms"], f"{name}: too slow")
+
+    def test_post_list(self):
+        self.measure("post_list", "get", reverse("post:post-list"))
+
+    def test_post_search(self):
+        self.measure(
+            "post_search",
+            "get",
+            reverse("post:post-list") + "?q=benchmark%20content",
+        )
+
+    def test_post_detail(self):
+        self.measure(
+            "post_detail",
+            "get",
+            reverse("post:post-detail", args=[self.post.id]),
+        )
+
+    def test_favorites(self):
+        self.measure(
+            "favorites",
+            "get",
+            reverse("post:post-show-favorite-posts"),
+        )
+
+    def test_feed(self):
+        self.measure("feed", "get", reverse("post:post-show-feed"))
+
+    def test_like_unlike(self):
+        self.measure(
+            "like_unlike",
+            "post",
+            reverse("post:post-like-unlike-post", args=[self.post.id]),
+        )
+
+    def test_add_comment(self):
+        self.measure(
+            "add_comment",
+            "post",
+            reverse("post:post-add-comment", args=[self.post.id]),
+            {"content": "Benchmark comment"},
+        )
+
+    def test_analytics(self):
+        self.measure(
+            "analytics",
+            "get",
+            reverse("post:analytics") + "?date_from={}&date_to={}".format(
+                date.today() - timedelta(days=30), date.today()
+            ),
+        )
+
+    def test_hashtag_list(self):
+        self.measure("hashtag_list", "get", reverse("post:hashtag-list"))
+
+    def test_signup(self):
+        self.measure(
+            "signup",
+            "post",
+            reverse("user:create_user"),
+            lambda repetition: {
+                "username": f"bench_signup_{repetition}",
+                "password": BENCHMARK_PASSWORD,
+            },
+            authenticated=False,
+        )
+
+    def test_token(self):
+        self.measure(
+            "token",
+            "post",
+            reverse("user:token_obtain_pair"),
+            {"username": self.user.username, "password": BENCHMARK_PASSWORD},
+            authenticated=False,
+        )
+
+    def test_activity(self):
+        self.measure(
+            "activity", "get", reverse("user:show_user_activity")
+        )
@@ -0,0 +1,77 @@
+import io
+import random
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.db import connection
+
+from post.models import Comment, Hashtag, Like, Post
+
+BENCHMARK_PASSWORD = "bench_pass"
+
+
+def seed_benchmark_data(
+    users=200,
+    hashtags=50,
+    posts=2000,
+    likes=10000,
+    comments=2000,
+    seed=42,
+):
+    """
+    Insert a deterministic data set with bulk_create, spread the post
+    and like times over the last 30 days and rebuild the counters
+    """
+    rng = random.Random(seed)
+    user_model = get_user_model()
+    password = make_password(BENCHMARK_PASSWORD)
+
+    user_objects = user_model.objects.bulk_create(
+        user_model(username=f"bench_user_{index}", password=password)
+        for index in range(users)
+    )
+    hashtag_objects = Hashtag.objects.bulk_create(
+        Hashtag(name=f"TAG{index}") for index in range(hashtags)
+    )
+    post_objects = Post.objects.bulk_create(
+        Post(
+            author=rng.choice(user_objects),
+            title=f"Benchmark post {index}",
+            content=f"Some benchmark content number {index} " * 10,
+        )
+        for index in range(posts)
+    )
+    Post.hashtags.through.objects.bulk_create(
+        Post.hashtags.through(post_id=post.id, hashtag_id=hashtag.id)
+        for post in post_objects
+        for hashtag in rng.sample(hashtag_objects, rng.randint(0, 3))
+    )
+    like_pairs = {
+        (rng.choice(user_objects).id, rng.choice(post_objects).id)
+        for _ in range(likes)
+    }
+    Like.objects.bulk_create(
+        Like(user_id=user_id, post_id=post_id)
+        for user_id, post_id in sorted(like_pairs)
+    )
+    Comment.objects.bulk_create(
+        Comment(
+            author=rng.choice(user_objects),
+            post=rng.choice(post_objects),
+            content=f"Benchmark comment {index}",
+        )
+        for index in range(comments)
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT setseed(%s)", [seed / 100])
+
+        for model in (Post, Like, Comment):
+            cursor.execute(
+                f'UPDATE "{model._meta.db_table}" SET "created_at" = '
+                f"\"created_at\" - random() * INTERVAL '30 days'"
+            )
+
+    call_command("rebuild_post_counters", stdout=io.StringIO())
+    return user_objects, post_objects
@@ -0,0 +1,158 @@
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from urllib.parse import urlsplit
+
+import requests
+
+from automated_bot.load import LoadStats
+
+DEFAULT_PATHS = ("post/", "post/feed/", "post/favorite/")
+SEND_PIECES = 4
+READ_CHUNK_SIZE = 512
+
+
+def get_access_token(api_base_url) -> str:
+    """Sign up a throwaway user and return its access token"""
+    credentials = {
+        "username": f"slow_client_{uuid.uuid4().hex[:12]}",
+        "password": "password$$$",
+    }
+    requests.post(
+        f"{api_base_url}user/signup/", json=credentials
+    ).raise_for_status()
+    response = requests.post(f"{api_base_url}user/token/", json=credentials)
+    response.raise_for_status()
+    return response.json()["access"]
+
+
+async def slow_request(host, port, path, token, send_time, read_delay):
+    """
+    A GET sent in pieces over ``send_time`` seconds whose response is
+    read in small chunks with ``read_delay`` seconds between them
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+
+    try:
+        head = (
+            f"GET {path} HTTP/1.1\r\n"
+            f"Host: {host}:{port}\r\n"
+            f"Authorization: Bearer {token}\r\n"
+            "Connection: close\r\n\r\n"
+        ).encode()
+        piece_size = -(-len(head) // SEND_PIECES)
+
+        for start in range(0, len(head), piece_size):
+            writer.write(head[start:start + piece_size])
+            await writer.drain()
+            await asyncio.sleep(send_time / SEND_PIECES)
+
+        status_line = await reader.readline()
+
+        while await reader.read(READ_CHUNK_SIZE):
+            await asyncio.sleep(read_delay)
+
+        return int(status_line.split()[1])
+    finally:
+        writer.close()
+
+
+async def run_client(target, token, paths, deadline, stats, args) -> None:
+    url = urlsplit(target)
+
+    while time.monotonic() < deadline:
+        path = random.choice(paths)
+        started = time.perf_counter()
+
+        try:
+            status = await asyncio.wait_for(
+                slow_request(
+                    url.hostname,
+                    url.port or 80,
+                    url.path + path,
+                    token,
+                    args.send_time,
+                    args.read_delay,
+                ),
+                timeout=args.timeout,
+            )
+            ok = 200 <= status < 300
+        except (OSError, ValueError, IndexError, asyncio.TimeoutError):
+            ok = False
+
+        stats.record(path, time.perf_counter() - started, ok)
+
+
+async def run_target(target, token, args) -> LoadStats:
+    stats = LoadStats()
+    deadline = time.monotonic() + args.duration
+    clients = []
+
+    for _ in range(args.clients):
+        clients.append(
+            asyncio.create_task(
+                run_client(target, token, args.paths, deadline, stats, args)
+            )
+        )
+
+        if args.ramp_up:
+            await asyncio.sleep(args.ramp_up / args.clients)
+
+    await asyncio.gather(*clients)
+    return stats
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Compare servers of the API under many concurrent slow "
+                    "clients, e.g. the WSGI runserver against uvicorn serving "
+                    "the ASGI application"
+    )
+    parser.add_argument(
+        "--target",
+        action="append",
+        required=True,
+        metavar="NAME=API_BASE_URL",
+        help="A server to benchmark, e.g. asgi=http://localhost:8000/api/",
+    )
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--ramp-up", type=float, default=5)
+    parser.add_argument(
+        "--send-time",
+        type=float,
+        default=1.0,
+        help="Seconds a client takes to send its request.",
+    )
+    parser.add_argument(
+        "--read-delay",
+        type=float,
+        default=0.05,
+        help=f"Seconds between the {READ_CHUNK_SIZE} byte chunks a client "
+             "reads the response in.",
+    )
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument(
+        "--path",
+        dest="paths",
+        action="append",
+        help="A path below the API base URL, repeatable.",
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    args.paths = args.paths or list(DEFAULT_PATHS)
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    random.seed(args.seed)
+
+    for target in args.target:
+        name, _, api_base_url = target.partition("=")
+        token = get_access_token(api_base_url)
+        stats = asyncio.run(run_target(api_base_url, token, args))
+        print(f"\n{name} ({api_base_url}), {args.clients} clients")
+        print(stats.report(args.duration))
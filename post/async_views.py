@@ -0,0 +1,320 @@
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.db.models.query import aprefetch_related_objects
+from django.http import Http404, HttpResponse
+from rest_framework import status
+from rest_framework.exceptions import (
+    AuthenticationFailed,
+    NotAuthenticated,
+)
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import exception_handler
+
+from post.cache import response_cache
+from post.fast_serializers import FastSerializer
+from post.models import Comment, Like, Post
+from post.serializers import CommentAddSerializer, PostDetailSerializer
+from post.views import PostViewSet, is_conditional
+from social_network.renderers import ORJSONRenderer
+from user.authentication import AsyncJWTAuthentication
+
+
+class AsyncPostViewSet:
+    """
+    Native async versions of the hot PostViewSet actions, routed by the
+    ASGI application (see social_network.asgi_urls). The request waits
+    for the database without holding a thread, so one process can serve
+    many slow clients. The queries, the serializers, the permissions,
+    the throttles and the response cache of PostViewSet are reused; the
+    other methods of a route are handed to the sync PostViewSet.
+    """
+
+    authenticator = AsyncJWTAuthentication()
+    renderer = ORJSONRenderer()
+    parsers = (JSONParser(), FormParser(), MultiPartParser())
+
+    def __init__(self, actions, fallback) -> None:
+        self.actions = actions
+        self.fallback = fallback
+
+    @classmethod
+    def as_view(cls, actions, fallback_actions=None):
+        fallback = (
+            PostViewSet.as_view(fallback_actions) if fallback_actions else None
+        )
+
+        async def view(request, *args, **kwargs):
+            return await cls(actions, fallback).dispatch(
+                request, *args, **kwargs
+            )
+
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        method = request.method.lower()
+
+        if method == "head":
+            method = "get"
+
+        action = self.actions.get(method)
+
+        if action is None:
+            if self.fallback is None:
+                return self.render(
+                    {"detail": f'Method "{request.method}" not allowed.'},
+                    status.HTTP_405_METHOD_NOT_ALLOWED,
+                )
+
+            return await sync_to_async(self.fallback)(
+                request, *args, **kwargs
+            )
+
+        self.viewset = PostViewSet(
+            **getattr(getattr(PostViewSet, action), "kwargs", {}),
+            action=action,
+            args=args,
+            kwargs=kwargs,
+            format_kwarg=None,
+            headers={},
+        )
+        self.viewset.request = Request(request, parsers=self.parsers)
+
+        try:
+            await self.initial(self.viewset.request)
+            response = await getattr(self, action)(self.viewset.request)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        return self.render(response.data, response.status_code, response)
+
+    async def initial(self, request) -> None:
+        authenticated = await self.authenticator.aauthenticate(request)
+
+        if authenticated is None:
+            raise NotAuthenticated
+
+        request.user, request.auth = authenticated
+        self.viewset.check_permissions(request)
+        # The throttle counters are kept in the database
+        await sync_to_async(self.viewset.check_throttles)(request)
+
+    def handle_exception(self, exc):
+        response = exception_handler(
+            exc, {"view": self.viewset, "request": self.viewset.request}
+        )
+
+        if response is None:
+            raise exc
+
+        if isinstance(exc, (NotAuthenticated, AuthenticationFailed)):
+            response.status_code = status.HTTP_401_UNAUTHORIZED
+            response["WWW-Authenticate"] = (
+                self.authenticator.authenticate_header(self.viewset.request)
+            )
+
+        return response
+
+    def render(self, data, status_code, response=None) -> HttpResponse:
+        rendered = HttpResponse(self.renderer.render(data), status=status_code)
+
+        if response is not None:
+            for header, value in response.items():
+                rendered[header] = value
+
+        rendered["Content-Type"] = self.renderer.media_type
+        return rendered
+
+    async def get_cached_response(self, handler, request):
+        cache_key = await response_cache.amake_key(
+            self.viewset.get_response_cache_scopes(), request
+        )
+        cached = await response_cache.aget(cache_key)
+
+        if cached is not None:
+            data, headers = cached
+            response = self.viewset.get_not_modified_response(
+                request, headers
+            ) or Response(data, status=status.HTTP_200_OK, headers=headers)
+            response["X-Cache"] = "HIT"
+            return response
+
+        response = await handler(request)
+
+        if response.status_code == status.HTTP_200_OK:
+            await response_cache.aset(
+                cache_key,
+                (response.data, self.viewset.get_cached_headers(response)),
+            )
+
+        response["X-Cache"] = "MISS"
+        return response
+
+    async def get_validated_response(self, handler, request):
+        viewset = self.viewset
+
+        if is_conditional(request):
+            if viewset.action == "retrieve":
+                posts = [
+                    post async for post in viewset.get_validator_queryset()
+                ]
+            else:
+                posts = await viewset.paginator.apaginate_queryset(
+                    viewset.get_validator_queryset(), request, view=viewset
+                )
+
+            response = viewset.get_not_modified_response(
+                request,
+                viewset.get_validators(viewset.get_validator_data(posts)),
+            )
+
+            if response is not None:
+                return response
+
+        response = await handler(request)
+
+        if response.status_code == status.HTTP_200_OK:
+            validators = viewset.get_validators(
+                viewset.get_validator_data(viewset.shown_posts)
+            )
+
+            for header, value in validators.items():
+                response[header] = value
+
+        return response
+
+    async def serialize(self, instance, **kwargs):
+        serializer = self.viewset.get_serializer(instance, **kwargs)
+
+        if isinstance(serializer, FastSerializer):
+            await serializer.aload()
+
+        return serializer.data
+
+    async def list(self, request):
+        return await self.get_cached_response(
+            partial(self.get_validated_response, self._list), request
+        )
+
+    async def _list(self, request):
+        paginator = self.viewset.paginator
+        page = await paginator.apaginate_queryset(
+            self.viewset.get_queryset(), request, view=self.viewset
+        )
+        self.viewset.shown_posts = page
+        data = await self.serialize(page, many=True)
+        return paginator.get_paginated_response(data)
+
+    async def retrieve(self, request):
+        return await self.get_cached_response(
+            partial(self.get_validated_response, self._retrieve), request
+        )
+
+    async def _retrieve(self, request):
+        try:
+            post = await self.viewset.get_queryset().aget(
+                pk=self.viewset.get_post_id()
+            )
+        except Post.DoesNotExist:
+            raise Http404
+
+        self.viewset.check_object_permissions(request, post)
+        self.viewset.shown_posts = [post]
+
+        if not self.viewset.is_fast():
+            post.likes_preview = [
+                username
+                async for username in (
+                    PostDetailSerializer.get_likes_preview_queryset(post.id)
+                )
+            ]
+
+        return Response(await self.serialize(post))
+
+    async def show_feed(self, request):
+        popular_author_ids = [
+            author_id
+            async for author_id in self.viewset.get_popular_author_ids()
+        ]
+        paginator = self.viewset.paginator
+        page = await paginator.apaginate_querysets(
+            self.viewset.get_feed_sources(popular_author_ids),
+            request,
+            view=self.viewset,
+        )
+        await aprefetch_related_objects(
+            page, *self.viewset.get_prefetched_relations()
+        )
+        data = await self.serialize(page, many=True)
+        return paginator.get_paginated_response(data)
+
+    async def show_favorite_posts(self, request):
+        paginator = self.viewset.paginator
+        likes = await paginator.apaginate_queryset(
+            self.viewset.get_favorite_likes(), request, view=self.viewset
+        )
+        posts = self.viewset.get_favorite_posts(likes)
+        await aprefetch_related_objects(
+            posts, *self.viewset.get_prefetched_relations()
+        )
+        data = await self.serialize(posts, many=True)
+        return paginator.get_paginated_response(data)
+
+    async def like(self, request):
+        post_id = self.viewset.get_post_id()
+
+        if request.method == "PUT":
+            changed = await Like.objects.alike(request.user.id, [post_id])
+            detail = "You have successfully liked the post."
+        else:
+            changed = await Like.objects.aunlike(request.user.id, [post_id])
+            detail = "Your like was successfully removed."
+
+        if not changed and not await Post.objects.filter(pk=post_id).aexists():
+            raise Http404
+
+        return Response({"detail": detail}, status=status.HTTP_200_OK)
+
+    async def like_unlike_post(self, request):
+        post_id = self.viewset.get_post_id()
+
+        if await Like.objects.aunlike(request.user.id, [post_id]):
+            return Response(
+                {"detail": "Your like was successfully removed."},
+                status=status.HTTP_200_OK,
+            )
+
+        if (
+            not await Like.objects.alike(request.user.id, [post_id])
+            and not await Post.objects.filter(pk=post_id).aexists()
+        ):
+            raise Http404
+
+        return Response(
+            {"detail": "You have successfully liked the post."},
+            status=status.HTTP_200_OK,
+        )
+
+    async def add_comment(self, request):
+        post_id = self.viewset.get_post_id()
+
+        if not await Post.objects.filter(pk=post_id).aexists():
+            raise Http404
+
+        serializer = CommentAddSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        await Comment.objects.acreate(
+            author=request.user,
+            post_id=post_id,
+            content=serializer.validated_data["content"],
+        )
+        return Response(
+            {
+                "detail": "Your comment has been successfully "
+                          "added to the post."
+            },
+            status=status.HTTP_200_OK,
+        )
@@ -0,0 +1,272 @@
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+DEFAULT_TIMEOUT = object()
+
+
+class LRUCacheBackend:
+    """In-process cache evicting expired and least recently used entries"""
+
+    def __init__(self, timeout=60, max_entries=1000) -> None:
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                return None
+
+            value, expires_at = entry
+
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    async def aget(self, key):
+        return self.get(key)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT) -> None:
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.timeout
+
+        expires_at = None if timeout is None else time.monotonic() + timeout
+
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def aset(self, key, value, timeout=DEFAULT_TIMEOUT) -> None:
+        self.set(key, value, timeout)
+
+    def delete(self, key) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class DjangoCacheBackend:
+    """
+    Backend on top of a configured Django cache, so that the entries and
+    the versions are shared by all the workers using that cache.
+    """
+
+    def __init__(self, alias="default", timeout=60) -> None:
+        self.alias = alias
+        self.timeout = timeout
+
+    @property
+    def cache(self):
+        # Django cache connections are per thread
+        return caches[self.alias]
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    async def aget(self, key):
+        return await self.cache.aget(key)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT) -> None:
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.timeout
+
+        self.cache.set(key, value, timeout)
+
+    async def aset(self, key, value, timeout=DEFAULT_TIMEOUT) -> None:
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.timeout
+
+        await self.cache.aset(key, value, timeout)
+
+    def delete(self, key) -> None:
+        self.cache.delete(key)
+
+    def clear(self) -> None:
+        self.cache.clear()
+
+
+class ResponseCache:
+    """
+    Cache of serialized response data. Every key embeds the current
+    version of its scopes (like "posts" or "post:42"), so changing the
+    data only needs a new version of the affected scopes.
+    """
+
+    key_prefix = "response"
+
+    def __init__(self) -> None:
+        self._backend = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            config = getattr(settings, "RESPONSE_CACHE", {})
+            backend_class = import_string(
+                config.get("BACKEND", "post.cache.LRUCacheBackend")
+            )
+            self._backend = backend_class(**config.get("OPTIONS", {}))
+
+        return self._backend
+
+    def get_version(self, scope) -> str:
+        version_key = f"{self.key_prefix}:version:{scope}"
+        version = self.backend.get(version_key)
+
+        if version is None:
+            version = uuid.uuid4().hex
+            self.backend.set(version_key, version, timeout=None)
+
+        return version
+
+    async def aget_version(self, scope) -> str:
+        version_key = f"{self.key_prefix}:version:{scope}"
+        version = await self.backend.aget(version_key)
+
+        if version is None:
+            version = uuid.uuid4().hex
+            await self.backend.aset(version_key, version, timeout=None)
+
+        return version
+
+    def bump(self, *scopes) -> None:
+        for scope in scopes:
+            self.backend.set(
+                f"{self.key_prefix}:version:{scope}",
+                uuid.uuid4().hex,
+                timeout=None,
+            )
+
+    def invalidate(self, *scopes) -> None:
+        """
+        Bump the scopes now and once more after the commit, so a response
+        rendered from not yet committed data is not kept under a version
+        that is current after the commit.
+        """
+        self.bump(*scopes)
+        transaction.on_commit(lambda: self.bump(*scopes))
+
+    def build_key(self, versions, request) -> str:
+        query = sorted(
+            (name, value)
+            for name, values in request.query_params.lists()
+            for value in values
+        )
+        digest = hashlib.md5(
+            f"{request.build_absolute_uri(request.path)}|{query}".encode()
+        ).hexdigest()
+        return f"{self.key_prefix}:{','.join(versions)}:{digest}"
+
+    def make_key(self, scopes, request) -> str:
+        return self.build_key(
+            [self.get_version(scope) for scope in scopes], request
+        )
+
+    async def amake_key(self, scopes, request) -> str:
+        return self.build_key(
+            [await self.aget_version(scope) for scope in scopes], request
+        )
+
+    def count(self, data):
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        return data
+
+    def get(self, key):
+        return self.count(self.backend.get(key))
+
+    async def aget(self, key):
+        return self.count(await self.backend.aget(key))
+
+    def set(self, key, data) -> None:
+        self.backend.set(key, data)
+
+    async def aset(self, key, data) -> None:
+        await self.backend.aset(key, data)
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+response_cache = ResponseCache()
+
+
+class HashtagIdCache:
+    """
+    Process-local cache of the hashtag ids by name, so the hashtags of
+    the written posts are mostly resolved without a lookup. It is cleared
+    when a hashtag is changed or deleted in the process (see
+    post.signals); a hashtag renamed or deleted by another process is
+    caught when linking, which checks the cached ids against the names.
+    """
+
+    def __init__(self) -> None:
+        self._backend = None
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = LRUCacheBackend(
+                **getattr(settings, "HASHTAG_ID_CACHE", {})
+            )
+
+        return self._backend
+
+    def get_many(self, names) -> dict:
+        ids = {}
+
+        for name in names:
+            hashtag_id = self.backend.get(name)
+
+            if hashtag_id is not None:
+                ids[name] = hashtag_id
+
+        return ids
+
+    def set_many(self, ids) -> None:
+        for name, hashtag_id in ids.items():
+            self.backend.set(name, hashtag_id)
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+
+hashtag_id_cache = HashtagIdCache()
+
+
+def invalidate_posts(*post_ids) -> None:
+    """Drop the cached post lists and the details of the given posts"""
+    response_cache.invalidate("posts", *[f"post:{pk}" for pk in post_ids])
@@ -0,0 +1,212 @@
+from operator import itemgetter
+
+from asgiref.sync import sync_to_async
+from rest_framework import serializers
+
+from post.models import Comment, ImageAsset, Post
+from post.serializers import (
+    HashtagSerializer,
+    PostDetailSerializer,
+    PostListSerializer,
+    get_sparse_field_names,
+)
+
+
+class FastSerializer:
+    """
+    Read-only counterpart of a model serializer building the same
+    representation from ``.values()`` rows with plain dict operations,
+    without the field machinery of the serializer. The rows hold the
+    ``columns`` of the shown fields; the related data of all the rows is
+    fetched at once by ``load()`` (``aload()`` in the async views).
+    """
+
+    serializer_class = None
+    # The values() columns read by a field, by default the field name
+    field_columns = {}
+
+    def __init__(self, instance=None, many=False, context=None) -> None:
+        self.instance = instance
+        self.many = many
+        self.context = context or {}
+        self.loaded = False
+        field_names = self.serializer_class.Meta.fields
+        request = self.context.get("request")
+        self.field_names = (
+            get_sparse_field_names(field_names, request)
+            if request is not None
+            else list(field_names)
+        )
+
+    @property
+    def columns(self) -> list:
+        return [
+            column
+            for name in self.field_names
+            for column in self.field_columns.get(name, (name,))
+        ]
+
+    @property
+    def rows(self) -> list:
+        if self.many:
+            return self.instance
+
+        return [] if self.instance is None else [self.instance]
+
+    def load(self) -> None:
+        if not self.loaded:
+            self.load_related(self.rows)
+            self.loaded = True
+
+    async def aload(self) -> None:
+        await sync_to_async(self.load)()
+
+    def load_related(self, rows) -> None:
+        pass
+
+    def get_readers(self) -> list:
+        """A function per shown field reading its value from a row"""
+        return [
+            (name, getattr(self, f"read_{name}", itemgetter(name)))
+            for name in self.field_names
+        ]
+
+    @property
+    def data(self):
+        self.load()
+        readers = self.get_readers()
+        data = [
+            {name: read(row) for name, read in readers} for row in self.rows
+        ]
+
+        if self.many:
+            return data
+
+        return data[0] if data else None
+
+
+class FastHashtagSerializer(FastSerializer):
+    serializer_class = HashtagSerializer
+
+
+class FastPostListSerializer(FastSerializer):
+    serializer_class = PostListSerializer
+    field_columns = {
+        "author": ("author__username",),
+        "hashtags": (),
+        "image_variants": (
+            "image_asset__status",
+            *[f"image_asset__{name}" for name in ImageAsset.VARIANTS],
+        ),
+    }
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.read_datetime = serializers.DateTimeField().to_representation
+        self.hashtags = {}
+
+    def load_related(self, rows) -> None:
+        if "hashtags" not in self.field_names or not rows:
+            return
+
+        names = (
+            Post.hashtags.through.objects
+            .filter(post_id__in=[row["id"] for row in rows])
+            .order_by("hashtag__name")
+            .values_list("post_id", "hashtag__name")
+        )
+
+        for post_id, name in names:
+            self.hashtags.setdefault(post_id, []).append(name)
+
+    def build_url(self, field, name):
+        url = field.storage.url(name)
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
+
+    def read_author(self, row):
+        return row["author__username"]
+
+    def read_content(self, row):
+        # The excerpt annotated by the view replaces the content column
+        if "content_excerpt" in row:
+            return row["content_excerpt"]
+
+        return row["content"]
+
+    def read_created_at(self, row):
+        return self.read_datetime(row["created_at"])
+
+    def read_updated_at(self, row):
+        return self.read_datetime(row["updated_at"])
+
+    def read_hashtags(self, row):
+        return self.hashtags.get(row["id"], [])
+
+    def read_image(self, row):
+        if not row["image"]:
+            return None
+
+        return self.build_url(Post._meta.get_field("image"), row["image"])
+
+    def read_image_variants(self, row):
+        if row["image_asset__status"] != ImageAsset.READY:
+            return None
+
+        return {
+            name: self.build_url(
+                ImageAsset._meta.get_field(name),
+                row[f"image_asset__{name}"],
+            )
+            for name in ImageAsset.VARIANTS
+        }
+
+
+class FastPostDetailSerializer(FastPostListSerializer):
+    serializer_class = PostDetailSerializer
+    field_columns = {
+        **FastPostListSerializer.field_columns,
+        "likes_preview": (),
+        "comments": (),
+    }
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.likes_previews = {}
+        self.comments = {}
+
+    def load_related(self, rows) -> None:
+        super().load_related(rows)
+
+        if "likes_preview" in self.field_names:
+            for row in rows:
+                self.likes_previews[row["id"]] = list(
+                    PostDetailSerializer.get_likes_preview_queryset(row["id"])
+                )
+
+        if "comments" in self.field_names and rows:
+            comments = (
+                Comment.objects
+                .filter(post_id__in=[row["id"] for row in rows])
+                .values(
+                    "id",
+                    "post_id",
+                    "author__username",
+                    "content",
+                    "created_at",
+                )
+            )
+
+            for comment in comments:
+                self.comments.setdefault(comment["post_id"], []).append({
+                    "id": comment["id"],
+                    "author": comment["author__username"],
+                    "content": comment["content"],
+                    "created_at": self.read_datetime(comment["created_at"]),
+                })
+
+    def read_likes_preview(self, row):
+        return self.likes_previews[row["id"]]
+
+    def read_comments(self, row):
+        return self.comments.get(row["id"], [])
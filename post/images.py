@@ -0,0 +1,264 @@
+import io
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile, File
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from post.cache import invalidate_posts
+from post.models import ImageAsset, ImageUpload, Post
+
+logger = logging.getLogger(__name__)
+
+# Bounding box of each variant and whether it is cropped to fill it
+IMAGE_VARIANTS = {
+    "thumbnail": ((200, 200), True),
+    "feed": ((640, 640), False),
+    "full": ((1600, 1600), False),
+}
+IMAGE_VARIANT_QUALITY = 85
+
+# Accepted upload types and the (offset, bytes) their files start with
+IMAGE_SIGNATURES = {
+    "image/jpeg": ((0, b"\xff\xd8\xff"),),
+    "image/png": ((0, b"\x89PNG\r\n\x1a\n"),),
+    "image/gif": ((0, b"GIF8"),),
+    "image/webp": ((0, b"RIFF"), (8, b"WEBP")),
+}
+IMAGE_SIGNATURE_SIZE = 12
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.IMAGE_PROCESSING_WORKERS,
+                thread_name_prefix="image-processing",
+            )
+
+        return _executor
+
+
+def schedule_image_processing(asset_id) -> None:
+    """
+    Process the asset in the worker pool once the transaction that
+    created it commits, or right away when no workers are configured
+    """
+    if not settings.IMAGE_PROCESSING_WORKERS:
+        process_image_asset(asset_id)
+        return
+
+    transaction.on_commit(
+        lambda: get_executor().submit(run_in_worker, asset_id)
+    )
+
+
+def run_in_worker(asset_id) -> None:
+    close_old_connections()
+
+    try:
+        process_image_asset(asset_id)
+    except Exception:
+        logger.exception("Failed to process the image asset #%s", asset_id)
+    finally:
+        close_old_connections()
+
+
+def render_variant(image, size, crop) -> bytes:
+    if crop:
+        variant = ImageOps.fit(image, size, Image.LANCZOS)
+    else:
+        variant = image.copy()
+        variant.thumbnail(size, Image.LANCZOS)
+
+    # Nothing of the upload's metadata (EXIF, ICC profile, comments) is kept
+    variant.info = {}
+    buffer = io.BytesIO()
+    variant.save(
+        buffer,
+        "JPEG",
+        quality=IMAGE_VARIANT_QUALITY,
+        optimize=True,
+        progressive=True,
+    )
+    return buffer.getvalue()
+
+
+def attach_image(post, image_file) -> ImageAsset:
+    """
+    Attach the asset of an image file to the post; new content is
+    processed in the background, known content is reused as it is. The
+    previous image is shown until the variants of the asset are ready.
+    """
+    asset, created = ImageAsset.objects.get_or_create_from_upload(image_file)
+    post.image_asset = asset
+
+    if asset.status == ImageAsset.READY:
+        post.image = asset.full.name
+
+    post.save(update_fields=["image_asset", "image", "updated_at"])
+
+    if created:
+        schedule_image_processing(asset.pk)
+        asset.refresh_from_db()
+
+    return asset
+
+
+def matches_signature(head, content_type) -> bool:
+    """Whether the first bytes received so far fit the announced type"""
+    for offset, signature in IMAGE_SIGNATURES[content_type]:
+        received = head[offset:offset + len(signature)]
+
+        if received != signature[:len(received)]:
+            return False
+
+    return True
+
+
+def append_upload_chunk(upload, stream, length) -> int:
+    """
+    Copy up to ``length`` bytes of the request body to the upload file
+    at its offset, without buffering the body in memory, and return the
+    number of bytes received before the body ended
+    """
+    received = 0
+
+    with open(upload.path, "r+b") as upload_file:
+        upload_file.truncate(upload.offset)
+        upload_file.seek(upload.offset)
+
+        while stream is not None and received < length:
+            data = stream.read(min(length - received, UPLOAD_CHUNK_SIZE))
+
+            if not data:
+                break
+
+            upload_file.write(data)
+            received += len(data)
+
+        upload_file.seek(0)
+        head = upload_file.read(IMAGE_SIGNATURE_SIZE)
+
+    if not matches_signature(head, upload.content_type):
+        raise ValueError("The file does not match the announced type.")
+
+    return received
+
+
+def complete_image_upload(upload) -> ImageAsset:
+    """Attach the completely received image to the post of the upload"""
+    try:
+        with open(upload.path, "rb") as upload_file:
+            with Image.open(upload_file) as image:
+                image.verify()
+
+            upload_file.seek(0)
+            return attach_image(
+                upload.post, File(upload_file, name=upload.filename)
+            )
+    except (OSError, ValueError, Image.DecompressionBombError):
+        raise ValueError("The uploaded file is not a valid image.")
+    finally:
+        discard_image_upload(upload)
+
+
+def discard_image_upload(upload) -> None:
+    try:
+        os.remove(upload.path)
+    except FileNotFoundError:
+        pass
+
+    ImageUpload.objects.filter(pk=upload.pk).delete()
+
+
+def purge_stale_uploads() -> int:
+    """
+    Remove the uploads left unfinished for longer than
+    IMAGE_UPLOAD_MAX_AGE with their files, and the files of the uploads
+    already removed
+    """
+    stale_uploads = list(ImageUpload.objects.stale())
+
+    for upload in stale_uploads:
+        discard_image_upload(upload)
+
+    try:
+        names = os.listdir(settings.IMAGE_UPLOAD_TEMP_DIR)
+    except FileNotFoundError:
+        return len(stale_uploads)
+
+    oldest = time.time() - settings.IMAGE_UPLOAD_MAX_AGE
+    upload_ids = {
+        str(upload_id)
+        for upload_id in ImageUpload.objects.values_list("id", flat=True)
+    }
+
+    for name in names:
+        upload_id, extension = os.path.splitext(name)
+        path = os.path.join(settings.IMAGE_UPLOAD_TEMP_DIR, name)
+
+        try:
+            if (
+                extension == ".part"
+                and upload_id not in upload_ids
+                and os.path.getmtime(path) < oldest
+            ):
+                os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    return len(stale_uploads)
+
+
+def process_image_asset(asset_id) -> None:
+    """
+    Render the re-encoded variants of the asset and point the image of
+    its posts to the full size variant
+    """
+    asset = ImageAsset.objects.get(pk=asset_id)
+
+    try:
+        with asset.original.open("rb") as original:
+            with Image.open(original) as image:
+                image = ImageOps.exif_transpose(image)
+
+                if image.mode in ("RGBA", "LA", "P"):
+                    image = image.convert("RGBA")
+                    background = Image.new("RGB", image.size, "white")
+                    background.paste(image, mask=image.getchannel("A"))
+                    image = background
+                elif image.mode != "RGB":
+                    image = image.convert("RGB")
+
+                for name, (size, crop) in IMAGE_VARIANTS.items():
+                    getattr(asset, name).save(
+                        f"{name}.jpg",
+                        ContentFile(render_variant(image, size, crop)),
+                        save=False,
+                    )
+    except (OSError, ValueError, Image.DecompressionBombError):
+        logger.exception("The image asset #%s is not a valid image", asset_id)
+        asset.status = ImageAsset.FAILED
+        asset.save(update_fields=["status"])
+        return
+
+    asset.status = ImageAsset.READY
+    asset.save()
+    post_ids = list(asset.posts.values_list("id", flat=True))
+    Post.objects.filter(pk__in=post_ids).update(
+        image=asset.full.name, updated_at=timezone.now()
+    )
+    invalidate_posts(*post_ids)
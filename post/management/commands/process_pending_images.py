@@ -0,0 +1,58 @@
+import logging
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from post.images import process_image_asset
+from post.models import ImageAsset
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Process the image assets left pending, like the ones queued "
+        "in a worker that was stopped before processing them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-age",
+            type=int,
+            default=600,
+            help="Only process the assets pending for at least this many "
+                 "seconds, leaving the ones a running worker may still "
+                 "process (0 when no worker is running).",
+        )
+
+    def handle(self, *args, **options):
+        asset_ids = list(
+            ImageAsset.objects
+            .filter(
+                status=ImageAsset.PENDING,
+                created_at__lte=(
+                    timezone.now() - timedelta(seconds=options["min_age"])
+                ),
+            )
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+
+        failed = 0
+
+        for asset_id in asset_ids:
+            try:
+                process_image_asset(asset_id)
+            except Exception:
+                logger.exception(
+                    "Failed to process the image asset #%s", asset_id
+                )
+                failed += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Processed {len(asset_ids) - failed} pending image "
+                f"asset(s), {failed} failed!"
+            )
+        )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from post.images import purge_stale_uploads
+
+
+class Command(BaseCommand):
+    help = "Remove the image uploads left unfinished and their files."
+
+    def handle(self, *args, **options):
+        deleted = purge_stale_uploads()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Removed {deleted} image upload(s)!")
+        )
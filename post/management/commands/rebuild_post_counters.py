@@ -0,0 +1,243 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from post.cache import invalidate_posts, response_cache
+from post.models import (
+    Comment,
+    Hashtag,
+    Like,
+    LikeDailyRollup,
+    LikeHourlyRollup,
+    Post,
+    apply_like_rollups,
+)
+
+
+def count_subquery(queryset):
+    return Coalesce(
+        Subquery(
+            queryset
+            .order_by()
+            .values("post")
+            .annotate(total=Count("*"))
+            .values("total"),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def actual_likes_count():
+    return count_subquery(
+        Like.objects.filter(post=OuterRef("pk"))
+    )
+
+
+def actual_comments_count():
+    return count_subquery(Comment.objects.filter(post=OuterRef("pk")))
+
+
+def drifted_posts():
+    return (
+        Post.objects
+        .annotate(
+            actual_likes_count=actual_likes_count(),
+            actual_comments_count=actual_comments_count(),
+        )
+        .filter(
+            ~Q(likes_count=F("actual_likes_count"))
+            | ~Q(comments_count=F("actual_comments_count"))
+        )
+    )
+
+
+def actual_hashtag_posts_count():
+    return Coalesce(
+        Subquery(
+            Post.hashtags.through.objects
+            .filter(hashtag=OuterRef("pk"))
+            .order_by()
+            .values("hashtag")
+            .annotate(total=Count("*"))
+            .values("total"),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild or check the denormalized like, comment and hashtag "
+        "counters and the like rollups."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report drifted counters and rollups.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10000,
+            help="Number of post ids updated per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        if options["check"]:
+            drifted_count = (
+                self.check_counters()
+                + self.check_hashtag_counters()
+                + self.check_rollups()
+            )
+
+            if drifted_count:
+                raise CommandError(
+                    f"{drifted_count} counter(s) or rollup(s) have drifted."
+                )
+
+            self.stdout.write(
+                self.style.SUCCESS("All post counters are correct!")
+            )
+        else:
+            self.rebuild_counters(options["batch_size"])
+            self.rebuild_hashtag_counters()
+            self.rebuild_rollups(options["batch_size"])
+
+    def check_counters(self):
+        drifted = (
+            drifted_posts()
+            .values_list(
+                "id",
+                "likes_count",
+                "actual_likes_count",
+                "comments_count",
+                "actual_comments_count",
+            )
+        )
+        drifted_count = 0
+
+        for post_id, likes, actual_likes, comments, actual_comments in (
+            drifted.iterator()
+        ):
+            drifted_count += 1
+            self.stdout.write(
+                f"Post #{post_id}: likes {likes} != {actual_likes} or "
+                f"comments {comments} != {actual_comments}"
+            )
+
+        return drifted_count
+
+    def check_hashtag_counters(self):
+        drifted = (
+            Hashtag.objects
+            .annotate(actual_posts_count=actual_hashtag_posts_count())
+            .exclude(posts_count=F("actual_posts_count"))
+            .values_list("name", "posts_count", "actual_posts_count")
+        )
+        drifted_count = 0
+
+        for name, posts, actual_posts in drifted.iterator():
+            drifted_count += 1
+            self.stdout.write(
+                f"Hashtag {name}: posts {posts} != {actual_posts}"
+            )
+
+        return drifted_count
+
+    def check_rollups(self):
+        hourly_counts = Like.objects.hourly_counts()
+        drifted_count = 0
+
+        for model in (LikeHourlyRollup, LikeDailyRollup):
+            actual = Counter()
+
+            for hour, total in hourly_counts.items():
+                actual[model.get_bucket(hour)] += total
+
+            stored = Counter(dict(model.objects.totals()))
+
+            for bucket in sorted(actual.keys() | stored.keys()):
+                if actual[bucket] != stored[bucket]:
+                    drifted_count += 1
+                    self.stdout.write(
+                        f"{model.__name__} {bucket}: likes "
+                        f"{stored[bucket]} != {actual[bucket]}"
+                    )
+
+        return drifted_count
+
+    def rebuild_counters(self, batch_size):
+        """
+        Repair the drifted posts only, so the modification time and the
+        cached responses of the others are kept
+        """
+        last_id = (
+            Post.objects.order_by("-id").values_list("id", flat=True).first()
+            or 0
+        )
+        updated = 0
+
+        for start in range(0, last_id, batch_size):
+            with transaction.atomic():
+                post_ids = list(
+                    drifted_posts()
+                    .filter(id__gt=start, id__lte=start + batch_size)
+                    .values_list("id", flat=True)
+                )
+
+                if not post_ids:
+                    continue
+
+                updated += Post.objects.filter(pk__in=post_ids).update(
+                    likes_count=actual_likes_count(),
+                    comments_count=actual_comments_count(),
+                    updated_at=timezone.now(),
+                )
+                invalidate_posts(*post_ids)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt the counters of {updated} post(s)!")
+        )
+
+    def rebuild_hashtag_counters(self):
+        updated = (
+            Hashtag.objects
+            .annotate(actual_posts_count=actual_hashtag_posts_count())
+            .exclude(posts_count=F("actual_posts_count"))
+            .update(posts_count=actual_hashtag_posts_count())
+        )
+
+        if updated:
+            response_cache.invalidate("hashtags")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt the counters of {updated} hashtag(s)!"
+            )
+        )
+
+    def rebuild_rollups(self, batch_size):
+        hourly_counts = sorted(Like.objects.hourly_counts().items())
+
+        with transaction.atomic():
+            LikeHourlyRollup.objects.all().delete()
+            LikeDailyRollup.objects.all().delete()
+
+            for start in range(0, len(hourly_counts), batch_size):
+                apply_like_rollups(
+                    dict(hourly_counts[start:start + batch_size]), shard=0
+                )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt the like rollups of {len(hourly_counts)} hour(s)!"
+            )
+        )
@@ -0,0 +1,56 @@
+from django.contrib.postgres.search import SearchVector
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from post.models import SEARCH_CONFIG, Post
+
+
+def post_search_vector():
+    """Same document as the post_post_search_vector trigger builds"""
+    return (
+        SearchVector("title", weight="A", config=SEARCH_CONFIG)
+        + SearchVector("content", weight="B", config=SEARCH_CONFIG)
+    )
+
+
+class Command(BaseCommand):
+    help = "Build the full-text search vectors of the existing posts."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Rebuild every vector, not only the missing ones.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Number of post ids updated per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        posts = Post.objects.all()
+
+        if not options["all"]:
+            posts = posts.filter(search_vector__isnull=True)
+
+        last_id = (
+            Post.objects.order_by("-id").values_list("id", flat=True).first()
+            or 0
+        )
+        updated = 0
+
+        for start in range(0, last_id, batch_size):
+            with transaction.atomic():
+                updated += posts.filter(
+                    id__gt=start,
+                    id__lte=start + batch_size,
+                ).update(search_vector=post_search_vector())
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Built the search vectors of {updated} post(s)!"
+            )
+        )
@@ -0,0 +1,51 @@
+# Generated by Django 5.0 on 2026-10-18 07:13
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_subquery(queryset):
+    return Coalesce(
+        Subquery(
+            queryset.order_by()
+            .values("post")
+            .annotate(total=Count("*"))
+            .values("total"),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def populate_counters(apps, schema_editor):
+    Post = apps.get_model("post", "Post")
+    Comment = apps.get_model("post", "Comment")
+
+    Post.objects.update(
+        likes_count=count_subquery(
+            Post.likes.through.objects.filter(post=OuterRef("pk"))
+        ),
+        comments_count=count_subquery(Comment.objects.filter(post=OuterRef("pk"))),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("post", "0002_post_created_at_id_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="comments_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="likes_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,137 @@
+# Generated by Django 5.0 on 2026-10-18 07:17
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("post", "0003_post_likes_count_comments_count"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # Turn the auto-created post_post_likes table into the Like model
+        # without copying rows, then rename it and add the timestamp.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name="Like",
+                    fields=[
+                        (
+                            "id",
+                            models.BigAutoField(
+                                auto_created=True,
+                                primary_key=True,
+                                serialize=False,
+                                verbose_name="ID",
+                            ),
+                        ),
+                        (
+                            "post",
+                            models.ForeignKey(
+                                on_delete=django.db.models.deletion.CASCADE,
+                                related_name="post_likes",
+                                to="post.post",
+                            ),
+                        ),
+                        (
+                            "user",
+                            models.ForeignKey(
+                                on_delete=django.db.models.deletion.CASCADE,
+                                related_name="likes",
+                                to=settings.AUTH_USER_MODEL,
+                            ),
+                        ),
+                    ],
+                    options={
+                        "db_table": "post_post_likes",
+                        "unique_together": {("post", "user")},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name="post",
+                    name="likes",
+                    field=models.ManyToManyField(
+                        blank=True,
+                        related_name="posts_likes",
+                        through="post.Like",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AlterModelTable(
+            name="like",
+            table=None,
+        ),
+        migrations.AddField(
+            model_name="like",
+            name="created_at",
+            field=models.DateTimeField(
+                auto_now_add=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+        # The real time of the existing likes is unknown: date them by
+        # their post, which is what the analytics reported so far.
+        migrations.RunSQL(
+            """
+            UPDATE post_like SET created_at = post_post.created_at
+            FROM post_post WHERE post_post.id = post_like.post_id
+            """,
+            migrations.RunSQL.noop,
+        ),
+        migrations.CreateModel(
+            name="LikeDailyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField(unique=True)),
+                ("likes_count", models.IntegerField(default=0)),
+            ],
+            options={
+                "ordering": ["day"],
+            },
+        ),
+        migrations.CreateModel(
+            name="LikeHourlyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("hour", models.DateTimeField(unique=True)),
+                ("likes_count", models.IntegerField(default=0)),
+            ],
+            options={
+                "ordering": ["hour"],
+            },
+        ),
+        migrations.RunSQL(
+            """
+            INSERT INTO post_likehourlyrollup (hour, likes_count)
+            SELECT date_trunc('hour', created_at), COUNT(*)
+            FROM post_like GROUP BY 1;
+            INSERT INTO post_likedailyrollup (day, likes_count)
+            SELECT created_at::date, COUNT(*)
+            FROM post_like GROUP BY 1;
+            """,
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.0 on 2026-10-18 07:18
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("post", "0004_like_rollups"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        # Existing rows are filled by the rebuild_search_vectors command
+        migrations.RunSQL(
+            """
+            CREATE FUNCTION post_post_search_vector_update() RETURNS trigger
+            AS $$
+            BEGIN
+                NEW.search_vector :=
+                    setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A')
+                    || setweight(to_tsvector('english', coalesce(NEW.content, '')), 'B');
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql;
+
+            CREATE TRIGGER post_post_search_vector
+            BEFORE INSERT OR UPDATE OF title, content ON post_post
+            FOR EACH ROW EXECUTE FUNCTION post_post_search_vector_update();
+            """,
+            """
+            DROP TRIGGER post_post_search_vector ON post_post;
+            DROP FUNCTION post_post_search_vector_update();
+            """,
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="post_search_vector_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.0 on 2026-10-18 07:20
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+def populate_posts_count(apps, schema_editor):
+    Hashtag = apps.get_model("post", "Hashtag")
+    Post = apps.get_model("post", "Post")
+
+    Hashtag.objects.update(
+        posts_count=models.functions.Coalesce(
+            models.Subquery(
+                Post.hashtags.through.objects.filter(hashtag=models.OuterRef("pk"))
+                .order_by()
+                .values("hashtag")
+                .annotate(total=models.Count("*"))
+                .values("total"),
+                output_field=models.IntegerField(),
+            ),
+            0,
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("post", "0005_post_search_vector"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name="hashtag",
+            name="posts_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_posts_count, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="hashtag",
+            index=models.Index(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("name"),
+                    name="text_pattern_ops",
+                ),
+                name="hashtag_name_prefix_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="hashtag",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("name"), name="gin_trgm_ops"
+                ),
+                name="hashtag_name_trgm_idx",
+            ),
+        ),
+    ]
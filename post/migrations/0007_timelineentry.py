@@ -0,0 +1,67 @@
+# Generated by Django 5.0 on 2026-10-18 07:23
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("post", "0006_hashtag_autocomplete"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TimelineEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["author", "-created_at", "-id"],
+                name="post_author_created_at_id_idx",
+            ),
+        ),
+        migrations.AddField(
+            model_name="timelineentry",
+            name="post",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="timeline_entries",
+                to="post.post",
+            ),
+        ),
+        migrations.AddField(
+            model_name="timelineentry",
+            name="user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="timeline_entries",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="timelineentry",
+            index=models.Index(
+                fields=["user", "-created_at", "-post"],
+                name="timeline_user_created_at_idx",
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="timelineentry",
+            unique_together={("user", "post")},
+        ),
+    ]
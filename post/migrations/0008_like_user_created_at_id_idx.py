@@ -0,0 +1,22 @@
+# Generated by Django 5.0 on 2026-10-18 07:29
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("post", "0007_timelineentry"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="like",
+            index=models.Index(
+                fields=["user", "-created_at", "-id"],
+                name="like_user_created_at_id_idx",
+            ),
+        ),
+    ]
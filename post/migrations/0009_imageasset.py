@@ -0,0 +1,84 @@
+# Generated by Django 5.0 on 2026-10-18 07:40
+
+import django.db.models.deletion
+import post.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("post", "0008_like_user_created_at_id_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ImageAsset",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("sha256", models.CharField(max_length=64, unique=True)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("ready", "Ready"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "original",
+                    models.ImageField(
+                        upload_to=post.models.create_image_asset_file_path
+                    ),
+                ),
+                (
+                    "thumbnail",
+                    models.ImageField(
+                        blank=True,
+                        null=True,
+                        upload_to=post.models.create_image_asset_file_path,
+                    ),
+                ),
+                (
+                    "feed",
+                    models.ImageField(
+                        blank=True,
+                        null=True,
+                        upload_to=post.models.create_image_asset_file_path,
+                    ),
+                ),
+                (
+                    "full",
+                    models.ImageField(
+                        blank=True,
+                        null=True,
+                        upload_to=post.models.create_image_asset_file_path,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="image_asset",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="posts",
+                to="post.imageasset",
+            ),
+        ),
+    ]
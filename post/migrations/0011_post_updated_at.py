@@ -0,0 +1,30 @@
+# Generated by Django 5.0 on 2026-10-18 08:40
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def populate_updated_at(apps, schema_editor):
+    Post = apps.get_model("post", "Post")
+
+    Post.objects.update(updated_at=F("created_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("post", "0010_imageupload"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+        migrations.RunPython(populate_updated_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-18 08:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("post", "0011_post_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="imageupload",
+            name="receiving_since",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.0 on 2026-10-18 09:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("post", "0012_imageupload_receiving_since"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="likedailyrollup",
+            name="shard",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="likehourlyrollup",
+            name="shard",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="likedailyrollup",
+            name="day",
+            field=models.DateField(),
+        ),
+        migrations.AlterField(
+            model_name="likehourlyrollup",
+            name="hour",
+            field=models.DateTimeField(),
+        ),
+        migrations.AddConstraint(
+            model_name="likedailyrollup",
+            constraint=models.UniqueConstraint(
+                fields=("day", "shard"), name="like_daily_rollup_day_shard"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="likehourlyrollup",
+            constraint=models.UniqueConstraint(
+                fields=("hour", "shard"), name="like_hourly_rollup_hour_shard"
+            ),
+        ),
+    ]
@@ -1,10 +1,30 @@
+import hashlib
 import os
+import random
+import re
 import uuid
+from collections import Counter, defaultdict
+from datetime import timedelta
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from django.db import models
+from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
+from django.db import IntegrityError, connection, models, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncHour, Upper
+from django.utils import timezone
 from django.utils.text import slugify
 
+from post.cache import hashtag_id_cache, invalidate_posts, response_cache
+
+# A #tag: letters, digits and underscores with at least one letter, not
+# preceded by a word character, "&" or "/" (like an HTML entity or an URL
+# fragment)
+HASHTAG_PATTERN = re.compile(r"(?<![\w&#/])#(\w*[^\W\d_]\w*)")
+HASHTAG_MAX_LENGTH = 255
+
 
 def create_custom_image_file_path(instance, filename):
     _, extension = os.path.splitext(filename)
@@ -17,20 +37,315 @@ def create_custom_image_file_path(instance, filename):
     )
 
 
+def create_image_asset_file_path(instance, filename):
+    return os.path.join(
+        "uploads",
+        "images",
+        instance.sha256[:2],
+        instance.sha256,
+        filename,
+    )
+
+
+class ImageAssetManager(models.Manager):
+    def get_or_create_from_upload(self, uploaded_file):
+        """
+        Return the asset of an uploaded image, deduplicated by the SHA-256
+        of its content, and whether it has been created
+        """
+        digest = hashlib.sha256()
+
+        for chunk in uploaded_file.chunks():
+            digest.update(chunk)
+
+        sha256 = digest.hexdigest()
+        asset = self.filter(sha256=sha256).first()
+
+        if asset is not None:
+            return asset, False
+
+        _, extension = os.path.splitext(uploaded_file.name)
+        asset = self.model(sha256=sha256)
+        asset.original.save(
+            f"original{extension.lower()}", uploaded_file, save=False
+        )
+
+        try:
+            with transaction.atomic():
+                asset.save()
+        except IntegrityError:
+            asset.original.delete(save=False)
+            return self.get(sha256=sha256), False
+
+        return asset, True
+
+
+class ImageAsset(models.Model):
+    """
+    An uploaded image stored once per content hash, with the resized
+    and metadata-free variants produced by the background processing
+    """
+
+    PENDING = "pending"
+    READY = "ready"
+    FAILED = "failed"
+    STATUS_CHOICES = (
+        (PENDING, "Pending"),
+        (READY, "Ready"),
+        (FAILED, "Failed"),
+    )
+    VARIANTS = ("thumbnail", "feed", "full")
+
+    sha256 = models.CharField(max_length=64, unique=True)
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=PENDING,
+    )
+    original = models.ImageField(upload_to=create_image_asset_file_path)
+    thumbnail = models.ImageField(
+        upload_to=create_image_asset_file_path,
+        null=True,
+        blank=True,
+    )
+    feed = models.ImageField(
+        upload_to=create_image_asset_file_path,
+        null=True,
+        blank=True,
+    )
+    full = models.ImageField(
+        upload_to=create_image_asset_file_path,
+        null=True,
+        blank=True,
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = ImageAssetManager()
+
+    def __str__(self):
+        return f"Image {self.sha256} ({self.status})"
+
+
+def extract_hashtags(text) -> list:
+    """The names of the #tags of the text, once each, in their order"""
+    return list(
+        dict.fromkeys(
+            name
+            for name in HASHTAG_PATTERN.findall(text or "")
+            if len(name) <= HASHTAG_MAX_LENGTH
+        )
+    )
+
+
+class HashtagManager(models.Manager):
+    def resolve_ids(self, names) -> dict:
+        """
+        The ids of the named hashtags, creating the missing ones. The
+        names not in the name cache are looked up with one query and the
+        remaining ones are inserted together.
+        """
+        names = list(dict.fromkeys(names))
+        ids = hashtag_id_cache.get_many(names)
+        missing = [name for name in names if name not in ids]
+
+        if missing:
+            found = dict(
+                self.filter(name__in=missing).values_list("name", "id")
+            )
+            created = [name for name in missing if name not in found]
+
+            if created:
+                found.update(self.insert_missing(created))
+
+            hashtag_id_cache.set_many(found)
+            ids.update(found)
+
+        return ids
+
+    def insert_missing(self, names) -> dict:
+        """
+        Insert the hashtags with one INSERT ... ON CONFLICT DO NOTHING and
+        return the ids by name, also of the ones inserted meanwhile by a
+        concurrent request
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {self.model._meta.db_table} (name, posts_count)
+                SELECT name, 0 FROM unnest(%s::varchar[]) AS name
+                ORDER BY name
+                ON CONFLICT (name) DO NOTHING
+                RETURNING name, id
+                """,
+                [sorted(names)],
+            )
+            ids = dict(cursor.fetchall())
+
+        if ids:
+            response_cache.invalidate("hashtags")
+
+        if len(ids) < len(names):
+            ids.update(
+                self.filter(
+                    name__in=[name for name in names if name not in ids]
+                ).values_list("name", "id")
+            )
+
+        return ids
+
+
 class Hashtag(models.Model):
-    name = models.CharField(max_length=255, unique=True)
+    name = models.CharField(max_length=HASHTAG_MAX_LENGTH, unique=True)
+    posts_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = HashtagManager()
 
     class Meta:
         ordering = ["name"]
+        indexes = [
+            models.Index(
+                OpClass(Upper("name"), name="text_pattern_ops"),
+                name="hashtag_name_prefix_idx",
+            ),
+            GinIndex(
+                OpClass(Upper("name"), name="gin_trgm_ops"),
+                name="hashtag_name_trgm_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
 
+SEARCH_CONFIG = "english"
+
+
+class PostManager(models.Manager):
+    def add_hashtags(self, post_id, hashtag_ids) -> list:
+        """
+        Link the hashtags, given as their ids by name, to the post with one
+        INSERT ... ON CONFLICT DO NOTHING, doing the work of the
+        m2m_changed signal: the hashtag counters, the post modification
+        time and the cache versions. Only the hashtags still having the
+        given names are linked; returns the names whose id was not found
+        with that name (deleted or renamed since it was cached).
+        """
+        pairs = sorted(hashtag_ids.items(), key=lambda pair: pair[1])
+
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    """
+                    WITH matching AS (
+                        SELECT hashtag.id FROM {hashtag} hashtag
+                        JOIN unnest(%s::varchar[], %s::bigint[])
+                            AS given (name, id)
+                            ON hashtag.id = given.id
+                            AND hashtag.name = given.name
+                    ), inserted AS (
+                        INSERT INTO {link} (post_id, hashtag_id)
+                        SELECT %s, id FROM matching
+                        ORDER BY id
+                        ON CONFLICT (post_id, hashtag_id) DO NOTHING
+                        RETURNING hashtag_id
+                    )
+                    SELECT matching.id, inserted.hashtag_id IS NOT NULL
+                    FROM matching
+                    LEFT JOIN inserted ON inserted.hashtag_id = matching.id
+                    """.format(
+                        link=Post.hashtags.through._meta.db_table,
+                        hashtag=Hashtag._meta.db_table,
+                    ),
+                    [
+                        [name for name, _ in pairs],
+                        [hashtag_id for _, hashtag_id in pairs],
+                        post_id,
+                    ],
+                )
+                rows = cursor.fetchall()
+
+            found = {hashtag_id for hashtag_id, _ in rows}
+            linked = [hashtag_id for hashtag_id, inserted in rows if inserted]
+
+            if linked:
+                Hashtag.objects.filter(pk__in=linked).update(
+                    posts_count=F("posts_count") + 1
+                )
+                self.filter(pk=post_id).update(updated_at=timezone.now())
+
+        if linked:
+            invalidate_posts(post_id)
+
+        return [
+            name
+            for name, hashtag_id in hashtag_ids.items()
+            if hashtag_id not in found
+        ]
+
+    def add_hashtag_names(self, post_id, names) -> None:
+        """
+        Link the named hashtags to the post, creating the missing ones.
+        The names whose cached id now belongs to no hashtag or to another
+        one (deleted or renamed by another process) are resolved once
+        more without the cache.
+        """
+        stale = self.add_hashtags(
+            post_id, Hashtag.objects.resolve_ids(names)
+        )
+
+        if stale:
+            hashtag_id_cache.clear()
+            self.add_hashtags(post_id, Hashtag.objects.resolve_ids(stale))
+
+    def bulk_create_posts(self, posts, hashtag_ids) -> list:
+        """
+        Insert the posts and their hashtag links with bulk_create, doing
+        the work of the post_save and m2m_changed signals for the whole
+        batch: the hashtag counters, the fan-out and the cache versions.
+        ``hashtag_ids`` holds the list of hashtag ids of each post.
+        """
+        if not posts:
+            return []
+
+        hashtag_counts = Counter()
+
+        with transaction.atomic():
+            posts = self.bulk_create(posts)
+            links = []
+
+            for post, post_hashtag_ids in zip(posts, hashtag_ids):
+                for hashtag_id in post_hashtag_ids:
+                    links.append(
+                        Post.hashtags.through(
+                            post_id=post.pk, hashtag_id=hashtag_id
+                        )
+                    )
+                    hashtag_counts[hashtag_id] += 1
+
+            Post.hashtags.through.objects.bulk_create(links)
+            hashtag_ids_by_count = defaultdict(list)
+
+            for hashtag_id, total in hashtag_counts.items():
+                hashtag_ids_by_count[total].append(hashtag_id)
+
+            for total, ids in hashtag_ids_by_count.items():
+                Hashtag.objects.filter(pk__in=ids).update(
+                    posts_count=F("posts_count") + total
+                )
+
+            TimelineEntry.objects.fan_out([post.pk for post in posts])
+
+        invalidate_posts()
+        return posts
+
+
 class Post(models.Model):
     title = models.CharField(max_length=255)
     content = models.TextField(max_length=25000)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Also moved by the likes, the comments, the hashtags and the renames
+    # of the users the post shows, so it validates the cached responses
+    updated_at = models.DateTimeField(auto_now=True)
     author = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -43,6 +358,7 @@ class Post(models.Model):
     )
     likes = models.ManyToManyField(
         settings.AUTH_USER_MODEL,
+        through="Like",
         related_name="posts_likes",
         blank=True,
     )
@@ -51,11 +367,477 @@ class Post(models.Model):
         null=True,
         blank=True,
     )
+    # The image is set to the "full" variant once the asset is processed
+    image_asset = models.ForeignKey(
+        ImageAsset,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="posts",
+    )
+    likes_count = models.PositiveIntegerField(default=0, editable=False)
+    comments_count = models.PositiveIntegerField(default=0, editable=False)
+    # Filled by the post_post_search_vector trigger from title and content
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = PostManager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["-created_at", "-id"],
+                name="post_created_at_id_idx",
+            ),
+            models.Index(
+                fields=["author", "-created_at", "-id"],
+                name="post_author_created_at_id_idx",
+            ),
+            GinIndex(
+                fields=["search_vector"],
+                name="post_search_vector_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"Post '{self.title}' by {self.author}"
 
 
+class ImageUploadManager(models.Manager):
+    def claim(self, upload, offset) -> bool:
+        """
+        Reserve the upload for receiving the chunk starting at the offset,
+        with a conditional UPDATE instead of a row lock held while the
+        chunk is streamed. It fails when other bytes have been received
+        since or another chunk is being received, unless that one has
+        been at it for longer than IMAGE_UPLOAD_CLAIM_TIMEOUT.
+        """
+        now = timezone.now()
+        expired = now - timedelta(seconds=settings.IMAGE_UPLOAD_CLAIM_TIMEOUT)
+        claimed = self.filter(
+            Q(receiving_since__isnull=True) | Q(receiving_since__lt=expired),
+            pk=upload.pk,
+            offset=offset,
+        ).update(receiving_since=now)
+
+        if claimed:
+            upload.offset = offset
+            upload.receiving_since = now
+
+        return bool(claimed)
+
+    def release(self, upload, received) -> bool:
+        """
+        Store the bytes received under the claim and release it, unless
+        it has expired and been taken over. A completed upload stays
+        claimed while the image is attached.
+        """
+        offset = upload.offset + received
+        receiving_since = (
+            upload.receiving_since if offset == upload.size else None
+        )
+        released = self.filter(
+            pk=upload.pk,
+            receiving_since=upload.receiving_since,
+        ).update(offset=offset, receiving_since=receiving_since)
+
+        if released:
+            upload.offset = offset
+            upload.receiving_since = receiving_since
+
+        return bool(released)
+
+    def stale(self):
+        """The uploads started longer than IMAGE_UPLOAD_MAX_AGE ago"""
+        return self.filter(
+            created_at__lt=(
+                timezone.now()
+                - timedelta(seconds=settings.IMAGE_UPLOAD_MAX_AGE)
+            )
+        )
+
+
+class ImageUpload(models.Model):
+    """
+    A resumable upload of a post image. The chunks are appended to a
+    temporary file and the image is attached to the post once all the
+    announced bytes have been received. ``receiving_since`` is set while
+    a chunk is being received (see ImageUploadManager.claim()).
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    post = models.ForeignKey(
+        "Post",
+        on_delete=models.CASCADE,
+        related_name="image_uploads",
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="image_uploads",
+    )
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=50)
+    size = models.PositiveBigIntegerField()
+    offset = models.PositiveBigIntegerField(default=0)
+    receiving_since = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = ImageUploadManager()
+
+    def __str__(self):
+        return f"Upload of {self.filename} ({self.offset}/{self.size})"
+
+    @property
+    def path(self) -> str:
+        return os.path.join(settings.IMAGE_UPLOAD_TEMP_DIR, f"{self.id}.part")
+
+    @property
+    def completed(self) -> bool:
+        return self.offset == self.size
+
+
+class LikeQuerySet(models.QuerySet):
+    def summarize(self) -> tuple[Counter, Counter]:
+        """Number of the likes per post and per hour of their creation"""
+        post_counts = Counter()
+        hourly_counts = Counter()
+
+        for post_id, hour, total in (
+            self
+            .order_by()
+            .annotate(hour=TruncHour("created_at"))
+            .values("post", "hour")
+            .annotate(total=Count("id"))
+            .values_list("post", "hour", "total")
+        ):
+            post_counts[post_id] += total
+            hourly_counts[hour] += total
+
+        return post_counts, hourly_counts
+
+    def hourly_counts(self) -> Counter:
+        """Number of the likes per hour of their creation"""
+        return Counter(dict(
+            self
+            .order_by()
+            .annotate(hour=TruncHour("created_at"))
+            .values("hour")
+            .annotate(total=Count("id"))
+            .values_list("hour", "total")
+        ))
+
+
+class LikeManager(models.Manager.from_queryset(LikeQuerySet)):
+    def _write(self, sql, params, sign) -> list:
+        post_counts = Counter()
+        hourly_counts = Counter()
+        tables = {
+            "like": self.model._meta.db_table,
+            "post": Post._meta.db_table,
+        }
+
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(sql.format(**tables), params)
+
+                for post_id, created_at in cursor.fetchall():
+                    post_counts[post_id] += 1
+                    hourly_counts[
+                        created_at.replace(minute=0, second=0, microsecond=0)
+                    ] += 1
+
+            apply_like_changes(post_counts, hourly_counts, sign)
+
+        invalidate_posts(*post_counts)
+        return sorted(post_counts)
+
+    def like(self, user_id, post_ids) -> list:
+        """
+        Like the existing posts with one INSERT ... ON CONFLICT DO NOTHING
+        and return the ids of the posts that were not liked before
+        """
+        return self._write(
+            """
+            INSERT INTO {like} (user_id, post_id, created_at)
+            SELECT %s, id, %s FROM {post}
+            WHERE id = ANY(%s)
+            ORDER BY id
+            ON CONFLICT (post_id, user_id) DO NOTHING
+            RETURNING post_id, created_at
+            """,
+            [user_id, timezone.now(), list(post_ids)],
+            sign=1,
+        )
+
+    def unlike(self, user_id, post_ids) -> list:
+        """
+        Remove the likes with one DELETE and return the ids of the posts
+        that were liked before
+        """
+        return self._write(
+            """
+            DELETE FROM {like}
+            WHERE user_id = %s AND post_id = ANY(%s)
+            RETURNING post_id, created_at
+            """,
+            [user_id, list(post_ids)],
+            sign=-1,
+        )
+
+    async def alike(self, user_id, post_ids) -> list:
+        return await sync_to_async(self.like)(user_id, post_ids)
+
+    async def aunlike(self, user_id, post_ids) -> list:
+        return await sync_to_async(self.unlike)(user_id, post_ids)
+
+
+class Like(models.Model):
+    """
+    Through model of Post.likes. Likes added and removed through the
+    relation are kept in step with the counters and the rollups by the
+    signals, the like() and unlike() manager methods do it themselves.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="likes",
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name="post_likes",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = LikeManager()
+
+    class Meta:
+        unique_together = ("post", "user")
+        indexes = [
+            models.Index(
+                fields=["user", "-created_at", "-id"],
+                name="like_user_created_at_id_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Like of {self.post_id} by {self.user_id}"
+
+
+class LikeRollupManager(models.Manager):
+    def apply(self, hourly_counts, sign=1, shard=None) -> None:
+        """
+        Add (or subtract) the hourly like counts to the rollup buckets.
+        Every bucket is split in LIKE_ROLLUP_SHARDS rows and the counts
+        go to a random one, so the concurrent likes (even of the same
+        post) seldom wait on the same row.
+        """
+        if shard is None:
+            shard = random.randrange(settings.LIKE_ROLLUP_SHARDS)
+
+        buckets = Counter()
+
+        for hour, total in hourly_counts.items():
+            buckets[self.model.get_bucket(hour)] += sign * total
+
+        buckets = sorted(
+            (bucket, shard, total)
+            for bucket, total in buckets.items()
+            if total
+        )
+
+        if not buckets:
+            return
+
+        table = self.model._meta.db_table
+        field = self.model.bucket_field
+        values = ", ".join(["(%s, %s, %s)"] * len(buckets))
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO "{table}" ("{field}", "shard", "likes_count") '
+                f"VALUES {values} "
+                f'ON CONFLICT ("{field}", "shard") DO UPDATE SET '
+                f'"likes_count" = '
+                f'"{table}"."likes_count" + EXCLUDED."likes_count"',
+                [value for bucket in buckets for value in bucket],
+            )
+
+    def totals(self, **filters):
+        """The (bucket, likes) pairs of the buckets with likes"""
+        field = self.model.bucket_field
+        return (
+            self.filter(**filters)
+            .values(field)
+            .annotate(total=Sum("likes_count"))
+            .filter(total__gt=0)
+            .order_by(field)
+            .values_list(field, "total")
+        )
+
+
+class LikeDailyRollup(models.Model):
+    day = models.DateField()
+    shard = models.PositiveSmallIntegerField(default=0)
+    likes_count = models.IntegerField(default=0)
+
+    bucket_field = "day"
+    objects = LikeRollupManager()
+
+    class Meta:
+        ordering = ["day"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "shard"], name="like_daily_rollup_day_shard"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.likes_count} likes on {self.day}"
+
+    @staticmethod
+    def get_bucket(hour):
+        return hour.date()
+
+
+class LikeHourlyRollup(models.Model):
+    hour = models.DateTimeField()
+    shard = models.PositiveSmallIntegerField(default=0)
+    likes_count = models.IntegerField(default=0)
+
+    bucket_field = "hour"
+    objects = LikeRollupManager()
+
+    class Meta:
+        ordering = ["hour"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["hour", "shard"], name="like_hourly_rollup_hour_shard"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.likes_count} likes at {self.hour}"
+
+    @staticmethod
+    def get_bucket(hour):
+        return hour
+
+
+def apply_like_changes(post_counts, hourly_counts, sign=1) -> None:
+    """Add (or subtract) added likes to the post counters and the rollups"""
+    post_ids_by_count = defaultdict(list)
+
+    for post_id, total in post_counts.items():
+        post_ids_by_count[total].append(post_id)
+
+    for total, post_ids in post_ids_by_count.items():
+        Post.objects.filter(pk__in=post_ids).update(
+            likes_count=F("likes_count") + sign * total,
+            updated_at=timezone.now(),
+        )
+
+    apply_like_rollups(hourly_counts, sign)
+
+
+def apply_like_rollups(hourly_counts, sign=1, shard=None) -> None:
+    LikeHourlyRollup.objects.apply(hourly_counts, sign, shard)
+    LikeDailyRollup.objects.apply(hourly_counts, sign, shard)
+
+
+class TimelineEntryManager(models.Manager):
+    def _execute(self, sql, params) -> int:
+        user_model = get_user_model()
+        tables = {
+            "timeline": self.model._meta.db_table,
+            "post": Post._meta.db_table,
+            "user": user_model._meta.db_table,
+            "following": user_model.following.through._meta.db_table,
+        }
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql.format(**tables), params)
+            return cursor.rowcount
+
+    def fan_out(self, post_ids) -> int:
+        """
+        Push the posts to the home timelines of their authors' followers
+        in one INSERT ... SELECT, skipping authors with too many followers
+        """
+        return self._execute(
+            """
+            INSERT INTO {timeline} (user_id, post_id, created_at)
+            SELECT follow.from_user_id, post.id, post.created_at
+            FROM {post} post
+            JOIN {user} author ON author.id = post.author_id
+            JOIN {following} follow ON follow.to_user_id = author.id
+            WHERE post.id = ANY(%s) AND author.followers_count < %s
+            ON CONFLICT DO NOTHING
+            """,
+            [list(post_ids), settings.FEED_FANOUT_MAX_FOLLOWERS],
+        )
+
+    def backfill(self, user_id, author_ids) -> int:
+        """Push the latest posts of newly followed authors to a timeline"""
+        return self._execute(
+            """
+            INSERT INTO {timeline} (user_id, post_id, created_at)
+            SELECT %s, post.id, post.created_at
+            FROM {user} author
+            CROSS JOIN LATERAL (
+                SELECT id, created_at FROM {post}
+                WHERE author_id = author.id
+                ORDER BY created_at DESC, id DESC
+                LIMIT %s
+            ) post
+            WHERE author.id = ANY(%s) AND author.followers_count < %s
+            ON CONFLICT DO NOTHING
+            """,
+            [
+                user_id,
+                settings.FEED_FOLLOW_BACKFILL_SIZE,
+                list(author_ids),
+                settings.FEED_FANOUT_MAX_FOLLOWERS,
+            ],
+        )
+
+
+class TimelineEntry(models.Model):
+    """
+    A post of a followed author materialized in the home timeline of a
+    user. Posts of authors with FEED_FANOUT_MAX_FOLLOWERS or more
+    followers are not fanned out but merged in when the feed is read.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="timeline_entries",
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name="timeline_entries",
+    )
+    # Copy of Post.created_at, so the timeline is read in index order
+    created_at = models.DateTimeField()
+
+    objects = TimelineEntryManager()
+
+    class Meta:
+        unique_together = ("user", "post")
+        indexes = [
+            models.Index(
+                fields=["user", "-created_at", "-post"],
+                name="timeline_user_created_at_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Post {self.post_id} in the timeline of {self.user_id}"
+
+
 class Comment(models.Model):
     author = models.ForeignKey(
         settings.AUTH_USER_MODEL,
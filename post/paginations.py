@@ -1,4 +1,22 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import json
+from urllib import parse
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def get_item_value(item, field):
+    """A field of a model instance or of a ``.values()`` row"""
+    if isinstance(item, dict):
+        return item[field]
+
+    return getattr(item, field)
 
 
 class HashtagPagination(PageNumberPagination):
@@ -7,7 +25,356 @@ class HashtagPagination(PageNumberPagination):
     max_page_size = 100
 
 
-class PostPagination(PageNumberPagination):
+class PostPageNumberPagination(PageNumberPagination):
+    page_size = 5
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination that seeks on the values of the ordering fields.
+
+    The ordering is taken from the queryset (or ``ordering`` when the
+    queryset is unordered) and its last field must be unique. A page is
+    fetched with a range condition on the ordering columns, so with a
+    matching index every page costs the same and no COUNT is issued.
+    """
+
+    cursor_query_param = "cursor"
+    cursor_query_description = "The pagination cursor value."
+    invalid_cursor_message = "Invalid cursor"
     page_size = 5
     page_size_query_param = "page_size"
+    page_size_query_description = "Number of results to return per page."
     max_page_size = 100
+    ordering = ("-created_at", "-id")
+    legacy_pagination_class = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.legacy_paginator = self.get_legacy_paginator(request)
+
+        if self.legacy_paginator is not None:
+            return self.legacy_paginator.paginate_queryset(
+                queryset, request, view
+            )
+
+        return self.paginate_querysets([queryset], request, view)
+
+    def paginate_querysets(self, querysets, request, view=None):
+        """
+        Paginate several querysets with the same ordering as one result
+        set (merge-on-read): each of them is sought from the cursor, and
+        the fetched rows are merged in Python and deduplicated on the
+        unique last ordering field.
+        """
+        page_querysets = self.get_page_querysets(querysets, request)
+        results = []
+
+        for queryset in page_querysets:
+            results.extend(queryset)
+
+        return self.set_page(results, len(page_querysets) > 1)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.legacy_paginator = self.get_legacy_paginator(request)
+
+        if self.legacy_paginator is not None:
+            return await sync_to_async(
+                self.legacy_paginator.paginate_queryset
+            )(queryset, request, view)
+
+        return await self.apaginate_querysets([queryset], request, view)
+
+    async def apaginate_querysets(self, querysets, request, view=None):
+        page_querysets = self.get_page_querysets(querysets, request)
+        results = []
+
+        for queryset in page_querysets:
+            results.extend([item async for item in queryset])
+
+        return self.set_page(results, len(page_querysets) > 1)
+
+    def get_page_querysets(self, querysets, request):
+        """The querysets sought from the cursor and limited to one page"""
+        self.legacy_paginator = None
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+
+        if querysets[0].query.order_by:
+            self.ordering = tuple(querysets[0].query.order_by)
+
+        assert all(isinstance(field, str) for field in self.ordering), (
+            "KeysetPagination supports ordering by field names only."
+        )
+
+        self.position, self.reverse = self.decode_cursor(request)
+
+        if self.position is not None:
+            self.position = self.parse_position(self.position, querysets[0])
+
+        page_querysets = []
+
+        for queryset in querysets:
+            if not queryset.query.order_by:
+                queryset = queryset.order_by(*self.ordering)
+
+            assert tuple(queryset.query.order_by) == self.ordering, (
+                "Merged querysets must share the same ordering."
+            )
+
+            if self.position is not None:
+                queryset = queryset.filter(
+                    self.get_seek_filter(self.position, self.reverse)
+                )
+
+            if self.reverse:
+                queryset = queryset.reverse()
+
+            page_querysets.append(queryset[:self.page_size + 1])
+
+        return page_querysets
+
+    def set_page(self, results, merged):
+        if merged:
+            results = self.merge(results, self.reverse)
+
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if self.reverse:
+            results.reverse()
+            self.has_next = self.position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.position is not None
+
+        self.page = results
+        return results
+
+    def merge(self, results, reverse):
+        directions = {field.startswith("-") for field in self.ordering}
+
+        assert len(directions) == 1, (
+            "Merged querysets must be ordered in a single direction."
+        )
+
+        fields = [field.lstrip("-") for field in self.ordering]
+        unique = {get_item_value(item, fields[-1]): item for item in results}
+        return sorted(
+            unique.values(),
+            key=lambda item: [
+                get_item_value(item, field) for field in fields
+            ],
+            reverse=directions.pop() != reverse,
+        )
+
+    def get_legacy_paginator(self, request):
+        if self.legacy_pagination_class is None:
+            return None
+
+        legacy_paginator = self.legacy_pagination_class()
+
+        if legacy_paginator.page_query_param not in request.query_params:
+            return None
+
+        return legacy_paginator
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                page_size = int(
+                    request.query_params[self.page_size_query_param]
+                )
+            except (KeyError, ValueError):
+                pass
+            else:
+                if page_size > 0:
+                    return min(page_size, self.max_page_size)
+
+        return self.page_size
+
+    def get_seek_filter(self, position, reverse):
+        """
+        Build ``(a, b) < (x, y)`` as ``a <= x AND (a < x OR a = x AND b < y)``
+        so the planner can use the leading column as an index range.
+        """
+        fields = [field.lstrip("-") for field in self.ordering]
+        lookups = [
+            "lt" if field.startswith("-") != reverse else "gt"
+            for field in self.ordering
+        ]
+        seek_filter = Q()
+
+        for index, (field, lookup) in enumerate(zip(fields, lookups)):
+            equal = dict(zip(fields[:index], position[:index]))
+            equal[f"{field}__{lookup}"] = position[index]
+            seek_filter |= Q(**equal)
+
+        return Q(**{f"{fields[0]}__{lookups[0]}e": position[0]}) & seek_filter
+
+    def get_position(self, instance):
+        position = []
+
+        for field in self.ordering:
+            value = get_item_value(instance, field.lstrip("-"))
+            position.append(
+                value.isoformat() if hasattr(value, "isoformat") else value
+            )
+
+        return position
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+
+        if encoded is None:
+            return None, False
+
+        try:
+            querystring = base64.urlsafe_b64decode(encoded.encode()).decode()
+            tokens = parse.parse_qs(querystring, keep_blank_values=True)
+            position = json.loads(tokens["p"][0])
+            reverse = bool(int(tokens.get("r", ["0"])[0]))
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if (
+            not isinstance(position, list)
+            or len(position) != len(self.ordering)
+        ):
+            raise NotFound(self.invalid_cursor_message)
+
+        return position, reverse
+
+    def parse_position(self, position, queryset) -> list:
+        """
+        The cursor position converted by the fields of the ordering, so
+        a tampered cursor is rejected instead of failing in the query
+        """
+        parsed = []
+
+        for field_name, value in zip(self.ordering, position):
+            field_name = field_name.lstrip("-")
+            annotation = queryset.query.annotations.get(field_name)
+
+            if annotation is not None:
+                field = annotation.output_field
+            else:
+                field = queryset.model._meta.get_field(field_name)
+
+            try:
+                value = field.to_python(value)
+            except (ValidationError, ValueError, TypeError):
+                raise NotFound(self.invalid_cursor_message)
+
+            if value is None:
+                raise NotFound(self.invalid_cursor_message)
+
+            parsed.append(value)
+
+        return parsed
+
+    def encode_cursor(self, position, reverse):
+        tokens = {"p": json.dumps(position)}
+
+        if reverse:
+            tokens["r"] = "1"
+
+        querystring = parse.urlencode(tokens, doseq=True)
+        encoded = base64.urlsafe_b64encode(querystring.encode()).decode()
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded
+        )
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+
+        return self.encode_cursor(self.get_position(self.page[-1]), False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+
+        return self.encode_cursor(self.get_position(self.page[0]), True)
+
+    def get_paginated_response(self, data):
+        if self.legacy_paginator is not None:
+            return self.legacy_paginator.get_paginated_response(data)
+
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {
+                    "type": "string",
+                    "nullable": True,
+                    "format": "uri",
+                },
+                "previous": {
+                    "type": "string",
+                    "nullable": True,
+                    "format": "uri",
+                },
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        parameters = [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": self.cursor_query_description,
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": self.page_size_query_description,
+                "schema": {"type": "integer"},
+            },
+        ]
+
+        if self.legacy_pagination_class is not None:
+            legacy_paginator = self.legacy_pagination_class()
+            parameters.append({
+                "name": legacy_paginator.page_query_param,
+                "required": False,
+                "in": "query",
+                "description": "A page number within the paginated result "
+                               "set (legacy mode, runs a COUNT query).",
+                "schema": {"type": "integer"},
+            })
+
+        return parameters
+
+
+class PostPagination(KeysetPagination):
+    page_size = 5
+    ordering = ("-created_at", "-id")
+    legacy_pagination_class = PostPageNumberPagination
+
+
+class PostLikePagination(KeysetPagination):
+    page_size = 20
+    ordering = ("user_id",)
+
+
+class FeedPagination(KeysetPagination):
+    page_size = 10
+    ordering = ("-feed_created_at", "-id")
@@ -1,18 +1,76 @@
+import os
+
+from django.conf import settings
 from rest_framework import serializers
 
+from post.cache import hashtag_id_cache
+from post.images import IMAGE_SIGNATURES, attach_image
 from post.models import (
     Hashtag,
+    ImageAsset,
+    ImageUpload,
+    Like,
     Post,
     Comment,
+    extract_hashtags,
 )
 
+LIKES_PREVIEW_SIZE = 5
+BULK_LIKE_MAX_POSTS = 100
+BULK_CREATE_MAX_POSTS = 500
+
+
+def get_sparse_field_names(field_names, request) -> list:
+    """
+    The field names chosen by the comma separated ``fields`` query
+    parameter of a read request (all of them without it) less the ones
+    listed in ``exclude``; unknown names are ignored
+    """
+    if request.method not in ("GET", "HEAD"):
+        return list(field_names)
+
+    chosen = request.query_params.get("fields")
+    excluded = request.query_params.get("exclude")
+
+    if chosen:
+        chosen = {name.strip() for name in chosen.split(",")}
+        field_names = [name for name in field_names if name in chosen]
+
+    if excluded:
+        excluded = {name.strip() for name in excluded.split(",")}
+        field_names = [name for name in field_names if name not in excluded]
+
+    return list(field_names)
+
+
+class SparseFieldsMixin:
+    """
+    Model serializer mixin building only the fields chosen by the
+    ``fields`` and ``exclude`` query parameters of a read request
+    """
+
+    def get_field_names(self, declared_fields, info):
+        field_names = super().get_field_names(declared_fields, info)
+        request = self.context.get("request")
+
+        if request is None:
+            return field_names
+
+        return get_sparse_field_names(field_names, request)
 
-class HashtagSerializer(serializers.ModelSerializer):
+
+class HashtagSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Hashtag
         fields = ("id", "name")
 
 
+class HashtagAutocompleteSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Hashtag
+        fields = ("id", "name", "posts_count")
+
+
 class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
@@ -64,8 +122,199 @@ class PostSerializer(serializers.ModelSerializer):
         data["author"] = user
         return data
 
+    def create(self, validated_data):
+        """Link the #tags of the content besides the given hashtags"""
+        post = super().create(validated_data)
+        names = extract_hashtags(post.content)
+
+        if names:
+            Post.objects.add_hashtag_names(post.id, names)
+
+        return post
+
+    def update(self, instance, validated_data):
+        """
+        Link the #tags of the new content. The tags dropped from the
+        content are unlinked, unless the hashtags are given. The tags are
+        left alone when the content is not changed.
+        """
+        if "content" not in validated_data:
+            return super().update(instance, validated_data)
+
+        old_names = extract_hashtags(instance.content)
+        post = super().update(instance, validated_data)
+        names = extract_hashtags(post.content)
+        dropped = set(old_names).difference(names)
+
+        if dropped and "hashtags" not in validated_data:
+            post.hashtags.remove(*Hashtag.objects.filter(name__in=dropped))
+
+        if names:
+            Post.objects.add_hashtag_names(post.id, names)
+
+        return post
+
+
+class ImageVariantsField(serializers.Field):
+    """URLs of the processed variants of the post image, None until ready"""
+
+    def __init__(self, **kwargs) -> None:
+        kwargs["source"] = "image_asset"
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, asset):
+        if asset is None or asset.status != ImageAsset.READY:
+            return None
+
+        request = self.context.get("request")
+        variants = {}
+
+        for name in ImageAsset.VARIANTS:
+            url = getattr(asset, name).url
+            variants[name] = (
+                request.build_absolute_uri(url) if request else url
+            )
+
+        return variants
+
+
+class PostBulkItemSerializer(serializers.ModelSerializer):
+    hashtags = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+    )
+
+    class Meta:
+        model = Post
+        fields = (
+            "title",
+            "content",
+            "hashtags",
+        )
+
+
+class PostBulkCreateSerializer(serializers.Serializer):
+    posts = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False,
+        max_length=BULK_CREATE_MAX_POSTS,
+    )
+
+    def create(self, validated_data):
+        """
+        Validate every post on its own, resolve the #tags of all the
+        contents together, check all the hashtags with one query and
+        insert the valid posts together. Returns one result per post: the
+        id of the created post or the validation errors.
+        """
+        author = self.context["request"].user
+        items = [
+            PostBulkItemSerializer(data=data)
+            for data in validated_data["posts"]
+        ]
+        valid = [item.is_valid() for item in items]
+        names = [
+            extract_hashtags(item.validated_data["content"])
+            if is_valid else []
+            for item, is_valid in zip(items, valid)
+        ]
+        tag_ids = Hashtag.objects.resolve_ids(
+            name for item_names in names for name in item_names
+        )
+        current_names = dict(
+            Hashtag.objects.filter(
+                pk__in={
+                    *tag_ids.values(),
+                    *(
+                        hashtag_id
+                        for item, is_valid in zip(items, valid) if is_valid
+                        for hashtag_id in item.validated_data.get(
+                            "hashtags", []
+                        )
+                    ),
+                }
+            ).values_list("id", "name")
+        )
+        existing_hashtag_ids = set(current_names)
+        stale = [
+            name
+            for name, hashtag_id in tag_ids.items()
+            if current_names.get(hashtag_id) != name
+        ]
+
+        if stale:
+            # Deleted or renamed since they were cached by the process
+            hashtag_id_cache.clear()
+            tag_ids.update(Hashtag.objects.resolve_ids(stale))
+
+        results = []
+        posts = []
+        hashtag_ids = []
+
+        for item, is_valid, item_names in zip(items, valid, names):
+            if not is_valid:
+                results.append({"errors": item.errors})
+                continue
+
+            item_hashtag_ids = list(
+                dict.fromkeys(item.validated_data.pop("hashtags", []))
+            )
+            missing = [
+                hashtag_id
+                for hashtag_id in item_hashtag_ids
+                if hashtag_id not in existing_hashtag_ids
+            ]
+
+            if missing:
+                results.append({
+                    "errors": {
+                        "hashtags": [
+                            f'Invalid pk "{hashtag_id}" - '
+                            f"object does not exist."
+                            for hashtag_id in missing
+                        ]
+                    }
+                })
+                continue
+
+            result = {}
+            results.append(result)
+            posts.append((result, Post(author=author, **item.validated_data)))
+            hashtag_ids.append(
+                list(
+                    dict.fromkeys(
+                        item_hashtag_ids
+                        + [tag_ids[name] for name in item_names]
+                    )
+                )
+            )
+
+        created = Post.objects.bulk_create_posts(
+            [post for _, post in posts], hashtag_ids
+        )
+
+        for (result, _), post in zip(posts, created):
+            result["id"] = post.id
+
+        return results
+
 
-class PostListSerializer(serializers.ModelSerializer):
+class PostContentField(serializers.CharField):
+    """The post content, or its excerpt when the query annotated one"""
+
+    def __init__(self, **kwargs) -> None:
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def get_attribute(self, instance):
+        if hasattr(instance, "content_excerpt"):
+            return instance.content_excerpt
+
+        return super().get_attribute(instance)
+
+
+class PostListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         many=False,
         read_only=True,
@@ -76,8 +325,10 @@ class PostListSerializer(serializers.ModelSerializer):
         read_only=True,
         slug_field="name",
     )
+    content = PostContentField()
     likes_count = serializers.IntegerField(read_only=True)
     comments_count = serializers.IntegerField(read_only=True)
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = Post
@@ -87,14 +338,16 @@ class PostListSerializer(serializers.ModelSerializer):
             "title",
             "content",
             "created_at",
+            "updated_at",
             "hashtags",
             "likes_count",
             "comments_count",
             "image",
+            "image_variants",
         )
 
 
-class PostDetailSerializer(serializers.ModelSerializer):
+class PostDetailSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         many=False,
         read_only=True,
@@ -105,15 +358,13 @@ class PostDetailSerializer(serializers.ModelSerializer):
         read_only=True,
         slug_field="name",
     )
-    likes = serializers.SlugRelatedField(
-        many=True,
-        read_only=True,
-        slug_field="username",
-    )
+    likes_count = serializers.IntegerField(read_only=True)
+    likes_preview = serializers.SerializerMethodField()
     comments = CommentDetailSerializer(
         many=True,
         read_only=True,
     )
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = Post
@@ -123,14 +374,96 @@ class PostDetailSerializer(serializers.ModelSerializer):
             "title",
             "content",
             "created_at",
+            "updated_at",
             "hashtags",
-            "likes",
+            "likes_count",
+            "likes_preview",
             "comments",
             "image",
+            "image_variants",
         )
 
+    @staticmethod
+    def get_likes_preview_queryset(post_id):
+        """Usernames of the first likers, read from the likes index"""
+        return (
+            Like.objects
+            .filter(post_id=post_id)
+            .order_by("user_id")
+            .values_list("user__username", flat=True)[:LIKES_PREVIEW_SIZE]
+        )
+
+    def get_likes_preview(self, obj) -> list[str]:
+        # Loaded in advance by the async views, which cannot query here
+        if hasattr(obj, "likes_preview"):
+            return obj.likes_preview
+
+        return list(self.get_likes_preview_queryset(obj.id))
+
+
+class PostLikeSerializer(serializers.Serializer):
+    id = serializers.IntegerField(source="user_id", read_only=True)
+    username = serializers.CharField(source="user.username", read_only=True)
+
+
+class PostBulkLikeSerializer(serializers.Serializer):
+    posts = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=BULK_LIKE_MAX_POSTS,
+    )
+
 
 class PostImageSerializer(serializers.ModelSerializer):
+    image = serializers.ImageField(write_only=True)
+    image_status = serializers.CharField(
+        source="image_asset.status",
+        read_only=True,
+    )
+    image_variants = ImageVariantsField()
+
     class Meta:
         model = Post
-        fields = ("id", "image")
+        fields = ("id", "image", "image_status", "image_variants")
+
+    def update(self, instance, validated_data):
+        attach_image(instance, validated_data["image"])
+        return instance
+
+
+class ImageUploadSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ImageUpload
+        fields = ("id", "filename", "content_type", "size", "offset")
+        read_only_fields = ("id", "offset")
+
+    def validate_filename(self, value):
+        filename = os.path.basename(value)
+
+        if not filename:
+            raise serializers.ValidationError("The file name is empty.")
+
+        return filename
+
+    def validate_content_type(self, value):
+        if value not in IMAGE_SIGNATURES:
+            raise serializers.ValidationError(
+                "Supported types are: {}.".format(", ".join(IMAGE_SIGNATURES))
+            )
+
+        return value
+
+    def validate_size(self, value):
+        if not 0 < value <= settings.IMAGE_UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(
+                "The image size must be between 1 and "
+                f"{settings.IMAGE_UPLOAD_MAX_SIZE} bytes."
+            )
+
+        return value
+
+    def create(self, validated_data):
+        upload = super().create(validated_data)
+        os.makedirs(settings.IMAGE_UPLOAD_TEMP_DIR, exist_ok=True)
+        open(upload.path, "wb").close()
+        return upload
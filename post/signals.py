@@ -0,0 +1,255 @@
+from django.contrib.auth import get_user_model
+from django.db.models import F, Q
+from django.db.models.query import QuerySet
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from post.cache import hashtag_id_cache, invalidate_posts, response_cache
+from post.models import (
+    Comment,
+    Hashtag,
+    Like,
+    Post,
+    TimelineEntry,
+    apply_like_changes,
+    apply_like_rollups,
+)
+
+
+def is_deletion_of(origin, model) -> bool:
+    """Whether the delete() that sends the signal was started on a model"""
+    return isinstance(origin, model) or (
+        isinstance(origin, QuerySet) and origin.model is model
+    )
+
+
+@receiver(m2m_changed, sender=Post.likes.through)
+def update_likes_count(sender, instance, action, reverse, pk_set, **kwargs):
+    """Keep Post.likes_count and the like rollups in step with the likes"""
+    if action not in ("post_add", "pre_remove", "pre_clear"):
+        return
+
+    if reverse:
+        likes = Like.objects.filter(user=instance)
+    else:
+        likes = Like.objects.filter(post=instance)
+
+    if action != "pre_clear":
+        likes = likes.filter(**{"post__in" if reverse else "user__in": pk_set})
+
+    post_counts, hourly_counts = likes.summarize()
+    apply_like_changes(
+        post_counts,
+        hourly_counts,
+        sign=1 if action == "post_add" else -1,
+    )
+    invalidate_posts(*post_counts)
+
+
+@receiver(pre_delete, sender=get_user_model())
+def release_user_likes(sender, instance, **kwargs):
+    """Likes of a deleted user are removed by cascade without m2m signals"""
+    post_counts, hourly_counts = Like.objects.filter(user=instance).summarize()
+    apply_like_changes(post_counts, hourly_counts, sign=-1)
+    invalidate_posts(*post_counts)
+
+
+@receiver(pre_delete, sender=Post)
+def release_post_likes(sender, instance, origin=None, **kwargs):
+    likes = Like.objects.filter(post=instance)
+    user_model = get_user_model()
+
+    if isinstance(origin, user_model):
+        likes = likes.exclude(user=origin)
+    elif is_deletion_of(origin, user_model):
+        likes = likes.exclude(user__in=origin)
+
+    apply_like_rollups(likes.hourly_counts(), sign=-1)
+
+
+@receiver(m2m_changed, sender=Post.hashtags.through)
+def update_hashtag_posts_count(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    """Keep Hashtag.posts_count in step with the hashtags relation"""
+    if action == "post_add":
+        if reverse:
+            Hashtag.objects.filter(pk=instance.pk).update(
+                posts_count=F("posts_count") + len(pk_set)
+            )
+        else:
+            Hashtag.objects.filter(pk__in=pk_set).update(
+                posts_count=F("posts_count") + 1
+            )
+
+    elif action == "pre_remove":
+        if reverse:
+            removed = sender.objects.filter(
+                hashtag=instance, post__in=pk_set
+            ).count()
+            Hashtag.objects.filter(pk=instance.pk).update(
+                posts_count=F("posts_count") - removed
+            )
+        else:
+            Hashtag.objects.filter(pk__in=pk_set, posts=instance).update(
+                posts_count=F("posts_count") - 1
+            )
+
+    elif action == "pre_clear":
+        if reverse:
+            Hashtag.objects.filter(pk=instance.pk).update(posts_count=0)
+        else:
+            Hashtag.objects.filter(posts=instance).update(
+                posts_count=F("posts_count") - 1
+            )
+
+    if action in ("post_add", "pre_remove", "pre_clear"):
+        if reverse:
+            post_ids = pk_set or list(
+                instance.posts.values_list("id", flat=True)
+            )
+        else:
+            post_ids = [instance.pk]
+
+        Post.objects.filter(pk__in=post_ids).update(
+            updated_at=timezone.now()
+        )
+        invalidate_posts(*post_ids)
+
+
+@receiver(pre_delete, sender=Post)
+def release_post_hashtags(sender, instance, **kwargs):
+    Hashtag.objects.filter(posts=instance).update(
+        posts_count=F("posts_count") - 1
+    )
+
+
+@receiver(post_save, sender=Post)
+def fan_out_post(sender, instance, created, **kwargs):
+    if created:
+        TimelineEntry.objects.fan_out([instance.pk])
+
+
+@receiver(m2m_changed, sender=get_user_model().following.through)
+def update_timelines(sender, instance, action, reverse, pk_set, **kwargs):
+    """Add or drop the posts of followed or unfollowed authors"""
+    if action == "post_add":
+        if reverse:
+            for follower_id in pk_set:
+                TimelineEntry.objects.backfill(follower_id, [instance.pk])
+        else:
+            TimelineEntry.objects.backfill(instance.pk, pk_set)
+
+    elif action == "pre_remove":
+        if reverse:
+            entries = TimelineEntry.objects.filter(
+                user__in=pk_set, post__author=instance
+            )
+        else:
+            entries = TimelineEntry.objects.filter(
+                user=instance, post__author__in=pk_set
+            )
+
+        entries.delete()
+
+    elif action == "pre_clear":
+        if reverse:
+            TimelineEntry.objects.filter(post__author=instance).delete()
+        else:
+            TimelineEntry.objects.filter(user=instance).delete()
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_responses(sender, instance, **kwargs):
+    invalidate_posts(instance.pk)
+
+
+@receiver(post_save, sender=Hashtag)
+@receiver(post_delete, sender=Hashtag)
+def invalidate_hashtag_responses(sender, instance, created=False, **kwargs):
+    """A renamed or deleted hashtag also changes the posts showing it"""
+    response_cache.invalidate("hashtags")
+
+    if not created:
+        response_cache.invalidate("posts", "post-details")
+
+
+@receiver(post_save, sender=Hashtag)
+@receiver(post_delete, sender=Hashtag)
+def forget_hashtag_ids(sender, instance, created=False, **kwargs):
+    """A renamed or deleted hashtag may be cached under its old name"""
+    if not created:
+        hashtag_id_cache.clear()
+
+
+@receiver(post_save, sender=Hashtag)
+@receiver(pre_delete, sender=Hashtag)
+def touch_hashtag_posts(sender, instance, created=False, **kwargs):
+    if not created:
+        Post.objects.filter(hashtags=instance).update(
+            updated_at=timezone.now()
+        )
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidate_user_responses(
+    sender, instance, created=False, update_fields=None, **kwargs
+):
+    """The posts and comments show the username of their authors"""
+    if created or (
+        update_fields is not None and "username" not in update_fields
+    ):
+        return
+
+    response_cache.invalidate("posts", "post-details")
+
+
+@receiver(post_save, sender=get_user_model())
+def touch_user_posts(
+    sender, instance, created=False, update_fields=None, **kwargs
+):
+    """The posts showing the username: authored, commented on or liked"""
+    if created or (
+        update_fields is not None and "username" not in update_fields
+    ):
+        return
+
+    Post.objects.filter(
+        Q(author=instance)
+        | Q(pk__in=Comment.objects.filter(author=instance).values("post"))
+        | Q(pk__in=Like.objects.filter(user=instance).values("post"))
+    ).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_responses(sender, instance, **kwargs):
+    invalidate_posts(instance.post_id)
+
+
+@receiver(post_save, sender=Comment)
+def update_commented_post(sender, instance, created, **kwargs):
+    """Count a new comment; an edited one changes the post as well"""
+    changes = {"comments_count": F("comments_count") + 1} if created else {}
+    Post.objects.filter(pk=instance.post_id).update(
+        updated_at=timezone.now(), **changes
+    )
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comments_count(sender, instance, origin=None, **kwargs):
+    if is_deletion_of(origin, Post):
+        return
+
+    Post.objects.filter(pk=instance.post_id).update(
+        comments_count=F("comments_count") - 1,
+        updated_at=timezone.now(),
+    )
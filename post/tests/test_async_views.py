@@ -0,0 +1,235 @@
+from unittest import mock
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient, TestCase, override_settings
+from django.urls import resolve, reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from post.cache import DjangoCacheBackend, response_cache
+from post.models import Comment, Hashtag, Like, Post, TimelineEntry
+from user.activity import activity_buffer
+
+ASYNC_URLCONF = "social_network.asgi_urls"
+
+
+def auth_headers(user):
+    return {"Authorization": f"Bearer {AccessToken.for_user(user)}"}
+
+
+def async_url(name, *args):
+    return reverse(f"post:{name}", args=args, urlconf=ASYNC_URLCONF)
+
+
+@override_settings(ROOT_URLCONF=ASYNC_URLCONF)
+class AsyncPostApiTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            username="test_user",
+            password="test_pass",
+        )
+        self.author = get_user_model().objects.create_user(
+            username="test_author",
+            password="test_pass",
+        )
+        self.hashtag = Hashtag.objects.create(name="ASYNC")
+        self.posts = [
+            Post.objects.create(
+                author=self.author,
+                title=f"Title {i}",
+                content=f"Content {i}",
+            )
+            for i in range(3)
+        ]
+        self.posts[0].hashtags.add(self.hashtag)
+        self.client = AsyncClient()
+        self.headers = auth_headers(self.user)
+        response_cache.clear()
+        activity_buffer.clear()
+
+    def tearDown(self) -> None:
+        activity_buffer.clear()
+
+    def get(self, url):
+        return self.client.get(url, headers=self.headers)
+
+    def test_hot_routes_are_async_views(self):
+        for url in (
+            async_url("post-list"),
+            async_url("post-detail", 1),
+            async_url("post-show-feed"),
+            async_url("post-like", 1),
+            async_url("post-add-comment", 1),
+        ):
+            self.assertTrue(iscoroutinefunction(resolve(url).func), url)
+
+    async def test_auth_required(self):
+        res = await self.client.get(async_url("post-list"))
+
+        self.assertEquals(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEquals(res["WWW-Authenticate"], 'Bearer realm="api"')
+
+    async def test_invalid_token_rejected(self):
+        res = await self.client.get(
+            async_url("post-list"),
+            headers={"Authorization": "Bearer invalid"},
+        )
+
+        self.assertEquals(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def get_sync_response(self, name):
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        with override_settings(ROOT_URLCONF="social_network.urls"):
+            return client.get(reverse(f"post:{name}"))
+
+    async def test_list_matches_sync_view(self):
+        res = await self.get(async_url("post-list"))
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(res["X-Cache"], "MISS")
+
+        response_cache.clear()
+        sync_res = await sync_to_async(self.get_sync_response)("post-list")
+
+        self.assertEquals(res.json(), sync_res.json())
+
+        res = await self.get(async_url("post-list"))
+
+        self.assertEquals(res["X-Cache"], "HIT")
+
+    async def test_list_cached_in_django_cache(self):
+        # The default Django cache is in the database, which cannot be
+        # queried synchronously from the event loop
+        with mock.patch.object(
+            response_cache, "_backend", DjangoCacheBackend()
+        ):
+            res = await self.get(async_url("post-list"))
+
+            self.assertEquals(res.status_code, status.HTTP_200_OK)
+            self.assertEquals(res["X-Cache"], "MISS")
+
+            res = await self.get(async_url("post-list"))
+
+            self.assertEquals(res.status_code, status.HTTP_200_OK)
+            self.assertEquals(res["X-Cache"], "HIT")
+
+    async def test_retrieve_post(self):
+        await Like.objects.alike(self.user.id, [self.posts[0].id])
+
+        res = await self.get(async_url("post-detail", self.posts[0].id))
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(res.json()["hashtags"], ["ASYNC"])
+        self.assertEquals(res.json()["likes_preview"], ["test_user"])
+
+    async def test_list_not_modified(self):
+        res = await self.get(async_url("post-list"))
+        response_cache.clear()
+
+        res = await self.client.get(
+            async_url("post-list"),
+            headers={**self.headers, "If-None-Match": res["ETag"]},
+        )
+
+        self.assertEquals(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEquals(res.content, b"")
+
+    async def test_list_sparse_fields_and_excerpt(self):
+        res = await self.get(
+            async_url("post-list") + "?fields=id,content&excerpt=4"
+        )
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(
+            res.json()["results"][0],
+            {"id": self.posts[2].id, "content": "Cont"},
+        )
+        self.assertIn("ETag", res)
+
+    async def test_retrieve_missing_post(self):
+        res = await self.get(async_url("post-detail", 999999))
+
+        self.assertEquals(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_like_and_unlike(self):
+        url = async_url("post-like", self.posts[1].id)
+
+        res = await self.client.put(url, headers=self.headers)
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(
+            await Like.objects.filter(
+                user=self.user, post=self.posts[1]
+            ).aexists()
+        )
+
+        res = await self.client.delete(url, headers=self.headers)
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(
+            await Like.objects.filter(
+                user=self.user, post=self.posts[1]
+            ).aexists()
+        )
+
+    async def test_add_comment(self):
+        res = await self.client.post(
+            async_url("post-add-comment", self.posts[2].id),
+            {"content": "Async comment"},
+            content_type="application/json",
+            headers=self.headers,
+        )
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        comment = await Comment.objects.aget(post=self.posts[2])
+        self.assertEquals(comment.content, "Async comment")
+        self.assertEquals(comment.author_id, self.user.id)
+
+    async def test_add_comment_validated(self):
+        res = await self.client.post(
+            async_url("post-add-comment", self.posts[2].id),
+            {},
+            content_type="application/json",
+            headers=self.headers,
+        )
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("content", res.json())
+
+    async def test_feed(self):
+        await TimelineEntry.objects.acreate(
+            user=self.user,
+            post=self.posts[1],
+            created_at=self.posts[1].created_at,
+        )
+
+        res = await self.get(async_url("post-show-feed"))
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(
+            [post["id"] for post in res.json()["results"]],
+            [self.posts[1].id],
+        )
+
+    async def test_update_handed_to_sync_view(self):
+        res = await self.client.patch(
+            async_url("post-detail", self.posts[0].id),
+            {"title": "New title"},
+            content_type="application/json",
+            headers=auth_headers(self.author),
+        )
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        post = await Post.objects.aget(pk=self.posts[0].id)
+        self.assertEquals(post.title, "New title")
+
+    async def test_request_time_and_metrics_recorded(self):
+        res = await self.get(async_url("post-list"))
+
+        self.assertIsNotNone(activity_buffer.get(self.user.id))
+        self.assertGreater(int(res["X-DB-Queries"]), 0)
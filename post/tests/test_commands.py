@@ -0,0 +1,115 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from post.cache import response_cache
+from post.models import Comment, Hashtag, LikeDailyRollup, Post
+
+
+class RebuildPostCountersCommandTests(TestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            username="test_user",
+            password="test_pass",
+        )
+        self.post = Post.objects.create(
+            author=self.user,
+            title="Title",
+            content="Content",
+        )
+        self.post.likes.add(self.user)
+        Comment.objects.create(
+            author=self.user,
+            post=self.post,
+            content="Comment",
+        )
+
+    def test_check_passes_for_consistent_counters(self):
+        out = StringIO()
+
+        call_command("rebuild_post_counters", "--check", stdout=out)
+
+        self.assertIn("All post counters are correct!", out.getvalue())
+
+    def test_rebuild_repairs_drifted_counters(self):
+        Post.objects.update(likes_count=10, comments_count=0)
+        LikeDailyRollup.objects.update(likes_count=5)
+        hashtag = Hashtag.objects.create(name="drifted")
+        Hashtag.objects.filter(pk=hashtag.pk).update(posts_count=3)
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_post_counters", "--check", stdout=StringIO())
+
+        call_command("rebuild_post_counters", stdout=StringIO())
+        self.post.refresh_from_db()
+
+        self.assertEquals(self.post.likes_count, 1)
+        self.assertEquals(self.post.comments_count, 1)
+        self.assertEquals(LikeDailyRollup.objects.get().likes_count, 1)
+        hashtag.refresh_from_db()
+        self.assertEquals(hashtag.posts_count, 0)
+
+    def test_rebuild_only_touches_drifted_posts(self):
+        other_post = Post.objects.create(
+            author=self.user,
+            title="Other title",
+            content="Other content",
+        )
+        Post.objects.filter(pk=self.post.pk).update(likes_count=10)
+        updated_at = other_post.updated_at
+        versions = [
+            response_cache.get_version(scope)
+            for scope in ("posts", f"post:{self.post.id}")
+        ]
+
+        call_command("rebuild_post_counters", stdout=StringIO())
+        other_post.refresh_from_db()
+
+        self.assertEquals(other_post.updated_at, updated_at)
+        self.assertNotEquals(response_cache.get_version("posts"), versions[0])
+        self.assertNotEquals(
+            response_cache.get_version(f"post:{self.post.id}"), versions[1]
+        )
+
+    def test_counters_stay_consistent_after_cascading_deletes(self):
+        liker = get_user_model().objects.create_user(
+            username="liker",
+            password="test_pass",
+        )
+        liker_post = Post.objects.create(
+            author=liker,
+            title="Title",
+            content="Content",
+        )
+        liker_post.likes.add(liker, self.user)
+        self.post.likes.add(liker)
+
+        liker.delete()
+        out = StringIO()
+        call_command("rebuild_post_counters", "--check", stdout=out)
+
+        self.assertIn("All post counters are correct!", out.getvalue())
+
+
+class RebuildSearchVectorsCommandTests(TestCase):
+    def test_rebuild_fills_missing_search_vectors(self):
+        user = get_user_model().objects.create_user(
+            username="test_user",
+            password="test_pass",
+        )
+        post = Post.objects.create(
+            author=user,
+            title="Searchable title",
+            content="Content",
+        )
+        Post.objects.update(search_vector=None)
+
+        call_command("rebuild_search_vectors", stdout=StringIO())
+
+        self.assertQuerySetEqual(
+            Post.objects.filter(search_vector="searchable"),
+            [post],
+        )
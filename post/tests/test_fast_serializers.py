@@ -0,0 +1,133 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from post.cache import response_cache
+from post.models import Comment, Hashtag, ImageAsset, Like, Post
+from social_network.renderers import ORJSONRenderer
+
+POST_LIST_URL = reverse("post:post-list")
+FEED_URL = reverse("post:post-show-feed")
+FAVORITE_URL = reverse("post:post-show-favorite-posts")
+HASHTAG_LIST_URL = reverse("post:hashtag-list")
+
+
+def detail_url(post_id):
+    return reverse("post:post-detail", args=[post_id])
+
+
+class FastSerializerTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="test_user",
+            password="test_pass",
+        )
+        self.author = get_user_model().objects.create_user(
+            username="test_author",
+            password="test_pass",
+        )
+        self.client.force_authenticate(self.user)
+        self.client.post(reverse("user:follow_user", args=[self.author.id]))
+        hashtags = [
+            Hashtag.objects.create(name=name) for name in ("zeta", "alpha")
+        ]
+        asset = ImageAsset.objects.create(
+            sha256="0" * 64,
+            status=ImageAsset.READY,
+            original="assets/original.jpg",
+            thumbnail="assets/thumbnail.jpg",
+            feed="assets/feed.jpg",
+            full="assets/full.jpg",
+        )
+        self.posts = [
+            Post.objects.create(
+                author=self.author,
+                title=f"Title {i}",
+                content=f"Ünïcode content \"{i}\" " * 20,
+            )
+            for i in range(4)
+        ]
+        self.posts[0].hashtags.add(*hashtags)
+        Post.objects.filter(pk=self.posts[1].pk).update(
+            image="uploads/post/image.jpg",
+            image_asset=asset,
+        )
+        Comment.objects.create(
+            author=self.user, post=self.posts[0], content="Comment"
+        )
+        Like.objects.like(self.user.id, [post.id for post in self.posts[:3]])
+
+    def get(self, url, params, fast):
+        response_cache.clear()
+
+        with override_settings(FAST_SERIALIZATION=fast):
+            return self.client.get(url, params)
+
+    def test_same_bytes_as_model_serializers(self):
+        requests = [
+            (url, params)
+            for url in (
+                POST_LIST_URL,
+                FEED_URL,
+                FAVORITE_URL,
+                detail_url(self.posts[0].id),
+                detail_url(self.posts[1].id),
+            )
+            for params in (
+                {},
+                {"page_size": 2},
+                {"fields": "id,hashtags,image_variants"},
+                {"exclude": "content", "excerpt": 5},
+                {"excerpt": 7},
+            )
+        ] + [
+            (HASHTAG_LIST_URL, {}),
+            (HASHTAG_LIST_URL, {"fields": "name"}),
+            (POST_LIST_URL, {"q": "content"}),
+            (POST_LIST_URL, {"page": 2, "page_size": 3}),
+        ]
+
+        for url, params in requests:
+            res = self.get(url, params, fast=False)
+            fast_res = self.get(url, params, fast=True)
+
+            self.assertEquals(fast_res.status_code, res.status_code)
+            self.assertEquals(fast_res.content, res.content, (url, params))
+            self.assertEquals(fast_res.get("ETag"), res.get("ETag"))
+
+    def test_next_page_with_fast_rows(self):
+        res = self.get(FEED_URL, {"page_size": 3}, fast=True)
+        next_res = self.get(res.data["next"], {}, fast=True)
+
+        self.assertEquals(
+            [post["id"] for post in res.data["results"]]
+            + [post["id"] for post in next_res.data["results"]],
+            [post.id for post in reversed(self.posts)],
+        )
+
+
+class ORJSONRendererTests(TestCase):
+    def test_same_bytes_as_json_renderer(self):
+        data = {
+            "text": "quote \" backslash \\ \x00\x1f\x7f é 😀   ",
+            "numbers": [0, -1, 2**53, 0.1, 2.5],
+            "nested": {"list": [None, True, False, {}], 1: "key"},
+        }
+
+        self.assertEquals(
+            ORJSONRenderer().render(data), JSONRenderer().render(data)
+        )
+
+    def test_indented_output(self):
+        data = {"key": ["value"]}
+
+        self.assertEquals(
+            ORJSONRenderer().render(
+                data, "application/json; indent=2", {}
+            ),
+            JSONRenderer().render(data, "application/json; indent=2", {}),
+        )
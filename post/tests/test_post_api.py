@@ -1,17 +1,50 @@
+import base64
+import io
+import os
+import shutil
+import tempfile
+import time
+from datetime import date, datetime
+from io import StringIO
+from urllib import parse
+
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils.http import http_date
 
+from PIL import Image
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from post.models import Post
+from post.cache import LRUCacheBackend, hashtag_id_cache, response_cache
+from post.models import (
+    Hashtag,
+    ImageAsset,
+    ImageUpload,
+    LikeDailyRollup,
+    Post,
+    extract_hashtags,
+)
 from post.serializers import (
+    LIKES_PREVIEW_SIZE,
     PostListSerializer,
     PostDetailSerializer,
 )
+from user.activity import activity_buffer
 
 POST_LIST_URL = reverse("post:post-list")
+ANALYTICS_URL = reverse("post:analytics")
+HASHTAG_AUTOCOMPLETE_URL = reverse("post:hashtag-autocomplete")
+FEED_URL = reverse("post:post-show-feed")
+BULK_LIKE_URL = reverse("post:post-bulk-like")
+FAVORITE_URL = reverse("post:post-show-favorite-posts")
+BULK_CREATE_URL = reverse("post:post-bulk-create-posts")
 NUMBER_OF_POSTS = 5
 PAGINATION_COUNT = 5
 
@@ -35,6 +68,36 @@ def like_unlike_url(post_id):
     return reverse("post:post-like-unlike-post", args=[post_id])
 
 
+def likes_url(post_id):
+    return reverse("post:post-show-likes", args=[post_id])
+
+
+def like_url(post_id):
+    return reverse("post:post-like", args=[post_id])
+
+
+def upload_image_url(post_id):
+    return reverse("post:post-upload-image", args=[post_id])
+
+
+def image_uploads_url(post_id):
+    return reverse("post:post-create-image-upload", args=[post_id])
+
+
+def image_upload_url(upload_id):
+    return reverse("post:image-upload", args=[upload_id])
+
+
+def create_image_file(size=(1200, 800), color="red"):
+    exif = Image.Exif()
+    exif[0x010E] = "Secret description"
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, "JPEG", exif=exif.tobytes())
+    return SimpleUploadedFile(
+        "photo.jpg", buffer.getvalue(), content_type="image/jpeg"
+    )
+
+
 class UnauthenticatedPostApiTests(TestCase):
     def setUp(self) -> None:
         self.client = APIClient()
@@ -56,6 +119,7 @@ class AuthenticatedPostApiTests(TestCase):
             password="test_pass",
         )
         self.client.force_authenticate(self.user)
+        response_cache.clear()
 
     def test_list_posts(self):
         create_posts(self.user)
@@ -123,3 +187,1358 @@ class AuthenticatedPostApiTests(TestCase):
             "{'detail': 'Your comment has been successfully added to the post.'}",
             str(res.data),
         )
+
+    def test_list_posts_cursor_pagination(self):
+        create_posts(self.user)
+        create_posts(self.user)
+
+        res = self.client.get(POST_LIST_URL, {"page_size": 4})
+        ids = [post["id"] for post in res.data["results"]]
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", res.data)
+        self.assertIsNone(res.data["previous"])
+
+        while res.data["next"]:
+            res = self.client.get(res.data["next"])
+            ids.extend(post["id"] for post in res.data["results"])
+
+        expected_ids = list(
+            Post.objects.order_by("-created_at", "-id")
+            .values_list("id", flat=True)
+        )
+        self.assertEquals(ids, expected_ids)
+
+        res = self.client.get(res.data["previous"])
+        self.assertEquals(
+            [post["id"] for post in res.data["results"]],
+            expected_ids[4:8],
+        )
+
+    def test_list_posts_cursor_pagination_skips_count_query(self):
+        create_posts(self.user)
+
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(POST_LIST_URL)
+
+        self.assertFalse(
+            any("COUNT(*)" in query["sql"] for query in context.captured_queries)
+        )
+
+    def test_list_posts_legacy_page_number_pagination(self):
+        create_posts(self.user)
+        create_posts(self.user)
+
+        res = self.client.get(POST_LIST_URL, {"page": 2})
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(res.data["count"], NUMBER_OF_POSTS * 2)
+        self.assertEquals(len(res.data["results"]), PAGINATION_COUNT)
+
+    def test_list_posts_invalid_cursor(self):
+        res = self.client.get(POST_LIST_URL, {"cursor": "invalid"})
+
+        self.assertEquals(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_posts_malformed_cursor_position(self):
+        for position in (
+            '["abc", 1]',
+            '["2024-01-01T00:00:00", "x"]',
+            '[{"a": 1}, 1]',
+            '[null, 1]',
+        ):
+            cursor = base64.urlsafe_b64encode(
+                parse.urlencode({"p": position}).encode()
+            ).decode()
+
+            for url in (POST_LIST_URL, FEED_URL):
+                res = self.client.get(url, {"cursor": cursor})
+
+                self.assertEquals(
+                    res.status_code, status.HTTP_404_NOT_FOUND, position
+                )
+
+    def test_like_unlike_post_updates_likes_count(self):
+        post = create_posts(self.user)[0]
+        url = like_unlike_url(post.id)
+
+        self.client.post(url)
+        post.refresh_from_db()
+        self.assertEquals(post.likes_count, 1)
+
+        self.client.post(url)
+        post.refresh_from_db()
+        self.assertEquals(post.likes_count, 0)
+
+    def test_like_and_unlike_are_idempotent(self):
+        post = create_posts(self.user)[0]
+        url = like_url(post.id)
+
+        for _ in range(2):
+            res = self.client.put(url)
+            self.assertEquals(res.status_code, status.HTTP_200_OK)
+
+        post.refresh_from_db()
+        self.assertEquals(post.likes_count, 1)
+        self.assertEquals(post.post_likes.get().user, self.user)
+
+        for _ in range(2):
+            res = self.client.delete(url)
+            self.assertEquals(res.status_code, status.HTTP_200_OK)
+
+        post.refresh_from_db()
+        self.assertEquals(post.likes_count, 0)
+        self.assertFalse(post.post_likes.exists())
+
+    def test_like_does_not_load_the_post(self):
+        post = create_posts(self.user)[0]
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.put(like_url(post.id))
+
+        self.assertFalse(
+            any(
+                query["sql"].startswith("SELECT")
+                and "post_post" in query["sql"]
+                for query in queries
+            )
+        )
+
+    def test_like_missing_post(self):
+        res = self.client.put(like_url(0))
+
+        self.assertEquals(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_bulk_like_and_unlike(self):
+        posts = create_posts(self.user)
+        self.client.put(like_url(posts[0].id))
+
+        res = self.client.put(
+            BULK_LIKE_URL,
+            {"posts": [post.id for post in posts[:3]] + [posts[-1].id + 1]},
+            format="json",
+        )
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(res.data["posts"], [posts[1].id, posts[2].id])
+        self.assertEquals(
+            list(
+                Post.objects.filter(likes=self.user)
+                .order_by("id")
+                .values_list("likes_count", flat=True)
+            ),
+            [1, 1, 1],
+        )
+
+        res = self.client.delete(
+            BULK_LIKE_URL,
+            {"posts": [posts[0].id, posts[3].id]},
+            format="json",
+        )
+
+        self.assertEquals(res.data["posts"], [posts[0].id])
+        posts[0].refresh_from_db()
+        self.assertEquals(posts[0].likes_count, 0)
+
+    def test_bulk_like_requires_posts(self):
+        res = self.client.put(BULK_LIKE_URL, {"posts": []}, format="json")
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_favorite_posts_ordered_by_like_time(self):
+        posts = create_posts(self.user)
+        liked = [posts[3], posts[0], posts[4]]
+
+        for post in liked:
+            self.client.put(like_url(post.id))
+
+        res = self.client.get(FAVORITE_URL, {"page_size": 2})
+        next_res = self.client.get(res.data["next"])
+
+        self.assertEquals(
+            [post["id"] for post in res.data["results"]]
+            + [post["id"] for post in next_res.data["results"]],
+            [post.id for post in reversed(liked)],
+        )
+        self.assertIsNone(next_res.data["next"])
+
+    def test_favorite_posts_query_count_does_not_grow(self):
+        other_user = get_user_model().objects.create_user(
+            username="other_user",
+            password="test_pass",
+        )
+        hashtag = Hashtag.objects.create(name="TAG")
+
+        for post in create_posts(other_user):
+            post.hashtags.add(hashtag)
+            self.client.put(like_url(post.id))
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(FAVORITE_URL)
+
+        self.assertEquals(len(res.data["results"]), PAGINATION_COUNT)
+        self.assertLessEqual(
+            len([query for query in queries if "post_" in query["sql"]]),
+            2,
+        )
+
+    def test_bulk_create_posts(self):
+        hashtag = Hashtag.objects.create(name="TAG")
+        payload = {
+            "posts": [
+                {
+                    "title": f"Title {i}",
+                    "content": f"Content {i}",
+                    "hashtags": [hashtag.id],
+                }
+                for i in range(3)
+            ]
+        }
+
+        res = self.client.post(BULK_CREATE_URL, payload, format="json")
+
+        self.assertEquals(res.status_code, status.HTTP_201_CREATED)
+        ids = [result["id"] for result in res.data["results"]]
+        posts = Post.objects.filter(pk__in=ids).order_by("id")
+        self.assertEquals(
+            [post.title for post in posts],
+            ["Title 0", "Title 1", "Title 2"],
+        )
+        self.assertTrue(all(post.author == self.user for post in posts))
+        hashtag.refresh_from_db()
+        self.assertEquals(hashtag.posts_count, 3)
+        self.assertEquals(hashtag.posts.count(), 3)
+
+    def test_bulk_create_posts_reports_invalid_items(self):
+        payload = {
+            "posts": [
+                {"title": "Title", "content": "Content"},
+                {"content": "Content"},
+                {"title": "Title", "content": "Content", "hashtags": [999]},
+            ]
+        }
+
+        res = self.client.post(BULK_CREATE_URL, payload, format="json")
+
+        self.assertEquals(res.status_code, status.HTTP_207_MULTI_STATUS)
+        results = res.data["results"]
+        self.assertEquals(
+            list(Post.objects.values_list("id", flat=True)),
+            [results[0]["id"]],
+        )
+        self.assertIn("title", results[1]["errors"])
+        self.assertIn("hashtags", results[2]["errors"])
+
+    def test_bulk_create_posts_fans_out_to_followers(self):
+        follower = get_user_model().objects.create_user(
+            username="follower",
+            password="test_pass",
+        )
+        follower.following.add(self.user)
+
+        res = self.client.post(
+            BULK_CREATE_URL,
+            {"posts": [{"title": "Title", "content": "Content"}]},
+            format="json",
+        )
+
+        self.assertEquals(
+            list(follower.timeline_entries.values_list("post", flat=True)),
+            [res.data["results"][0]["id"]],
+        )
+
+    def test_add_and_delete_comment_updates_comments_count(self):
+        post = create_posts(self.user)[0]
+
+        self.client.post(
+            reverse("post:post-add-comment", args=[post.id]),
+            {"content": "Test Content"},
+        )
+        post.refresh_from_db()
+        self.assertEquals(post.comments_count, 1)
+
+        post.comments.get().delete()
+        post.refresh_from_db()
+        self.assertEquals(post.comments_count, 0)
+
+    def test_retrieve_post_detail_bounds_likes(self):
+        post = create_posts(self.user)[0]
+        likers = [
+            get_user_model().objects.create_user(
+                username=f"liker_{i}",
+                password="test_pass",
+            )
+            for i in range(LIKES_PREVIEW_SIZE + 2)
+        ]
+        post.likes.add(*likers)
+
+        res = self.client.get(detail_url(post.id))
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn("likes", res.data)
+        self.assertEquals(res.data["likes_count"], len(likers))
+        self.assertEquals(
+            res.data["likes_preview"],
+            [liker.username for liker in likers[:LIKES_PREVIEW_SIZE]],
+        )
+
+    def test_show_likes(self):
+        post = create_posts(self.user)[0]
+        likers = [
+            get_user_model().objects.create_user(
+                username=f"liker_{i}",
+                password="test_pass",
+            )
+            for i in range(3)
+        ]
+        post.likes.add(*likers)
+
+        res = self.client.get(likes_url(post.id), {"page_size": 2})
+        usernames = [like["username"] for like in res.data["results"]]
+        res = self.client.get(res.data["next"])
+        usernames.extend(like["username"] for like in res.data["results"])
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(usernames, [liker.username for liker in likers])
+        self.assertIsNone(res.data["next"])
+
+    def test_show_likes_of_missing_post(self):
+        res = self.client.get(likes_url(0))
+
+        self.assertEquals(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_show_likes_of_non_numeric_post_id(self):
+        res = self.client.get(likes_url("abc"))
+
+        self.assertEquals(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_likes_analytics_reads_like_time_rollups(self):
+        post = create_posts(self.user)[0]
+        Post.objects.filter(pk=post.pk).update(
+            created_at=datetime(2020, 1, 1)
+        )
+        today = date.today().strftime("%Y-%m-%d")
+
+        self.client.post(like_unlike_url(post.id))
+        res = self.client.get(
+            ANALYTICS_URL, {"date_from": today, "date_to": today}
+        )
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(res.data, [{"date": today, "likes_count": 1}])
+
+        res = self.client.get(
+            ANALYTICS_URL,
+            {"date_from": today, "date_to": today, "granularity": "hour"},
+        )
+
+        self.assertEquals(len(res.data), 1)
+        self.assertEquals(res.data[0]["likes_count"], 1)
+
+        self.client.post(like_unlike_url(post.id))
+        res = self.client.get(
+            ANALYTICS_URL, {"date_from": today, "date_to": today}
+        )
+
+        self.assertEquals(res.data, [])
+
+    def test_likes_analytics_sums_rollup_shards(self):
+        day = date(2024, 5, 1)
+        LikeDailyRollup.objects.bulk_create(
+            LikeDailyRollup(day=day, shard=shard, likes_count=likes_count)
+            for shard, likes_count in ((0, 2), (3, 5), (7, -1))
+        )
+
+        res = self.client.get(
+            ANALYTICS_URL,
+            {"date_from": "2024-05-01", "date_to": "2024-05-01"},
+        )
+
+        self.assertEquals(
+            res.data, [{"date": "2024-05-01", "likes_count": 6}]
+        )
+
+    def test_likes_analytics_requires_dates(self):
+        res = self.client.get(ANALYTICS_URL)
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_search_posts_ranked_by_relevance(self):
+        create_posts(self.user)
+        title_match = Post.objects.create(
+            author=self.user,
+            title="Running with Django",
+            content="Some content",
+        )
+        content_match = Post.objects.create(
+            author=self.user,
+            title="Another title",
+            content="The runner runs Django tests",
+        )
+
+        res = self.client.get(POST_LIST_URL, {"q": "django running"})
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(
+            [post["id"] for post in res.data["results"]],
+            [title_match.id, content_match.id],
+        )
+
+    def test_search_posts_cursor_pagination(self):
+        posts = create_posts(self.user)
+
+        res = self.client.get(POST_LIST_URL, {"q": "content", "page_size": 2})
+        ids = [post["id"] for post in res.data["results"]]
+
+        while res.data["next"]:
+            res = self.client.get(res.data["next"])
+            ids.extend(post["id"] for post in res.data["results"])
+
+        self.assertEquals(sorted(ids), sorted(post.id for post in posts))
+        self.assertEquals(len(ids), len(set(ids)))
+
+
+class HashtagApiTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="test_user",
+            password="test_pass",
+        )
+        self.client.force_authenticate(self.user)
+        cache.clear()
+        response_cache.clear()
+
+    def test_autocomplete_ranks_prefix_matches_by_popularity(self):
+        rare, popular, inner = (
+            Hashtag.objects.create(name=name)
+            for name in ("freedom", "freelance", "carefree")
+        )
+        for i in range(3):
+            post = Post.objects.create(
+                author=self.user,
+                title=f"Title {i}",
+                content=f"Content {i}",
+            )
+            post.hashtags.add(popular, inner)
+
+        res = self.client.get(HASHTAG_AUTOCOMPLETE_URL, {"q": "#FRE"})
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(
+            [hashtag["name"] for hashtag in res.data],
+            [popular.name, rare.name, inner.name],
+        )
+        self.assertEquals(res.data[0]["posts_count"], 3)
+
+    def test_autocomplete_caches_repeated_prefixes(self):
+        Hashtag.objects.create(name="freedom")
+
+        self.client.get(HASHTAG_AUTOCOMPLETE_URL, {"q": "fre"})
+
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.get(HASHTAG_AUTOCOMPLETE_URL, {"q": "FRE"})
+
+        self.assertEquals(len(res.data), 1)
+        self.assertFalse(
+            any(
+                "post_hashtag" in query["sql"]
+                for query in context.captured_queries
+            )
+        )
+
+    def test_autocomplete_ignores_too_short_queries(self):
+        Hashtag.objects.create(name="freedom")
+
+        for query in ("f", "#fr"):
+            res = self.client.get(HASHTAG_AUTOCOMPLETE_URL, {"q": query})
+
+            self.assertEquals(res.data, [])
+
+    def test_posts_count_follows_post_hashtags(self):
+        hashtag = Hashtag.objects.create(name="freedom")
+        post = Post.objects.create(
+            author=self.user,
+            title="Title",
+            content="Content",
+        )
+
+        post.hashtags.add(hashtag)
+        hashtag.refresh_from_db()
+        self.assertEquals(hashtag.posts_count, 1)
+
+        post.delete()
+        hashtag.refresh_from_db()
+        self.assertEquals(hashtag.posts_count, 0)
+
+
+class PostResponseCacheApiTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="test_user",
+            password="test_pass",
+        )
+        self.client.force_authenticate(self.user)
+        self.post = Post.objects.create(
+            author=self.user,
+            title="Title",
+            content="Content",
+        )
+        response_cache.clear()
+
+    def test_repeated_list_is_served_from_cache(self):
+        first = self.client.get(POST_LIST_URL)
+
+        with CaptureQueriesContext(connection) as queries:
+            second = self.client.get(POST_LIST_URL)
+
+        self.assertEquals(first["X-Cache"], "MISS")
+        self.assertEquals(second["X-Cache"], "HIT")
+        self.assertEquals(second.data, first.data)
+        self.assertFalse(
+            any("post_post" in query["sql"] for query in queries)
+        )
+        self.assertEquals(response_cache.stats(), {"hits": 1, "misses": 1})
+
+    def test_query_params_are_part_of_the_key(self):
+        self.client.get(POST_LIST_URL, {"title": "Title", "page_size": 2})
+        res = self.client.get(POST_LIST_URL, {"page_size": 2, "title": "x"})
+        same = self.client.get(
+            POST_LIST_URL, {"page_size": 2, "title": "Title"}
+        )
+
+        self.assertEquals(res["X-Cache"], "MISS")
+        self.assertEquals(res.data["results"], [])
+        self.assertEquals(same["X-Cache"], "HIT")
+
+    def test_like_invalidates_list_and_detail(self):
+        self.client.get(POST_LIST_URL)
+        self.client.get(detail_url(self.post.id))
+
+        self.client.post(like_unlike_url(self.post.id))
+        list_res = self.client.get(POST_LIST_URL)
+        detail_res = self.client.get(detail_url(self.post.id))
+
+        self.assertEquals(list_res["X-Cache"], "MISS")
+        self.assertEquals(list_res.data["results"][0]["likes_count"], 1)
+        self.assertEquals(detail_res["X-Cache"], "MISS")
+        self.assertEquals(detail_res.data["likes_count"], 1)
+
+    def test_comment_invalidates_only_its_post_detail(self):
+        other_post = Post.objects.create(
+            author=self.user,
+            title="Other title",
+            content="Other content",
+        )
+        self.client.get(detail_url(self.post.id))
+        self.client.get(detail_url(other_post.id))
+
+        self.client.post(
+            reverse("post:post-add-comment", args=[self.post.id]),
+            {"content": "Comment"},
+        )
+        res = self.client.get(detail_url(self.post.id))
+        other_res = self.client.get(detail_url(other_post.id))
+
+        self.assertEquals(res["X-Cache"], "MISS")
+        self.assertEquals(len(res.data["comments"]), 1)
+        self.assertEquals(other_res["X-Cache"], "HIT")
+
+    def test_deleted_post_is_not_served(self):
+        self.client.get(detail_url(self.post.id))
+
+        self.client.delete(detail_url(self.post.id))
+        res = self.client.get(detail_url(self.post.id))
+
+        self.assertEquals(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_lru_backend_evicts_least_recently_used(self):
+        backend = LRUCacheBackend(max_entries=2)
+        backend.set("a", 1)
+        backend.set("b", 2)
+        backend.get("a")
+        backend.set("c", 3)
+
+        self.assertEquals(backend.get("a"), 1)
+        self.assertIsNone(backend.get("b"))
+        self.assertEquals(backend.get("c"), 3)
+
+    def test_lru_backend_expires_entries(self):
+        backend = LRUCacheBackend(timeout=0)
+        backend.set("a", 1)
+
+        self.assertIsNone(backend.get("a"))
+
+
+class PostConditionalGetApiTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="test_user",
+            password="test_pass",
+        )
+        self.client.force_authenticate(self.user)
+        self.post = Post.objects.create(
+            author=self.user,
+            title="Title",
+            content="Content",
+        )
+        response_cache.clear()
+
+    def get_etag(self, url):
+        return self.client.get(url)["ETag"]
+
+    def test_validators_sent(self):
+        for url in (POST_LIST_URL, detail_url(self.post.id)):
+            res = self.client.get(url)
+
+            self.assertEquals(res.status_code, status.HTTP_200_OK)
+            self.assertTrue(res["ETag"].startswith('"'))
+
+        self.assertIn("GMT", res["Last-Modified"])
+
+    def test_list_modified_after_delete(self):
+        other_post = Post.objects.create(
+            author=self.user,
+            title="Other title",
+            content="Other content",
+        )
+        res = self.client.get(POST_LIST_URL)
+
+        self.assertNotIn("Last-Modified", res)
+
+        other_post.delete()
+        res = self.client.get(
+            POST_LIST_URL,
+            HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 3600),
+        )
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(len(res.data["results"]), 1)
+
+    def test_matching_etag_not_modified_with_one_lookup(self):
+        for url in (POST_LIST_URL, detail_url(self.post.id)):
+            etag = self.get_etag(url)
+            response_cache.clear()
+
+            with CaptureQueriesContext(connection) as queries:
+                res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+            post_queries = [
+                query for query in queries if "post_" in query["sql"]
+            ]
+
+            self.assertEquals(res.status_code, status.HTTP_304_NOT_MODIFIED)
+            self.assertEquals(res["ETag"], etag)
+            self.assertEquals(len(post_queries), 1)
+
+    def test_cached_response_not_modified_without_queries(self):
+        etag = self.get_etag(detail_url(self.post.id))
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(
+                detail_url(self.post.id), HTTP_IF_NONE_MATCH=etag
+            )
+
+        self.assertEquals(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEquals(res["X-Cache"], "HIT")
+        self.assertFalse(
+            any("post_" in query["sql"] for query in queries)
+        )
+
+    def test_if_modified_since(self):
+        last_modified = self.client.get(detail_url(self.post.id))[
+            "Last-Modified"
+        ]
+
+        res = self.client.get(
+            detail_url(self.post.id), HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+
+        self.assertEquals(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_like_comment_and_hashtag_change_etag(self):
+        hashtag = Hashtag.objects.create(name="old")
+        changes = (
+            lambda: self.client.post(like_unlike_url(self.post.id)),
+            lambda: self.client.post(
+                reverse("post:post-add-comment", args=[self.post.id]),
+                {"content": "Comment"},
+            ),
+            lambda: self.post.hashtags.add(hashtag),
+            lambda: Hashtag.objects.filter(pk=hashtag.pk).get().save(),
+            lambda: self.user.save(),
+        )
+
+        for change in changes:
+            etags = [
+                self.get_etag(url)
+                for url in (POST_LIST_URL, detail_url(self.post.id))
+            ]
+
+            change()
+
+            self.assertNotEquals(
+                [
+                    self.get_etag(url)
+                    for url in (POST_LIST_URL, detail_url(self.post.id))
+                ],
+                etags,
+            )
+
+    def test_deleted_post_changes_list_etag(self):
+        other_post = Post.objects.create(
+            author=self.user,
+            title="Other title",
+            content="Other content",
+        )
+        etag = self.get_etag(POST_LIST_URL)
+
+        other_post.delete()
+        res = self.client.get(POST_LIST_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(len(res.data["results"]), 1)
+
+    def test_missing_post_has_no_validators(self):
+        res = self.client.get(detail_url(999999))
+
+        self.assertEquals(res.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(res.has_header("ETag"))
+
+
+class PostHashtagExtractionApiTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="test_user",
+            password="test_pass",
+        )
+        self.client.force_authenticate(self.user)
+        hashtag_id_cache.clear()
+
+    def create_post(self, content, **data):
+        return self.client.post(
+            POST_LIST_URL,
+            {"title": "Title", "content": content, **data},
+            format="json",
+        )
+
+    def get_hashtag_names(self, post_id):
+        return sorted(
+            Post.objects.get(pk=post_id).hashtags.values_list(
+                "name", flat=True
+            )
+        )
+
+    def test_extract_hashtags(self):
+        self.assertEquals(
+            extract_hashtags(
+                "#python and #Django_5, #python again; #2024 "
+                "http://example.com/#anchor &#35; mail#tag"
+            ),
+            ["python", "Django_5"],
+        )
+
+    def test_create_post_links_content_hashtags(self):
+        existing = Hashtag.objects.create(name="python")
+        given = Hashtag.objects.create(name="given")
+
+        res = self.create_post(
+            "Learning #python with #asyncio", hashtags=[given.id]
+        )
+
+        self.assertEquals(res.status_code, status.HTTP_201_CREATED)
+        self.assertEquals(
+            self.get_hashtag_names(res.data["id"]),
+            ["asyncio", "given", "python"],
+        )
+        self.assertEquals(
+            sorted(res.data["hashtags"]),
+            sorted(Hashtag.objects.values_list("id", flat=True)),
+        )
+        existing.refresh_from_db()
+        self.assertEquals(existing.posts_count, 1)
+        self.assertEquals(Hashtag.objects.get(name="asyncio").posts_count, 1)
+
+    def test_number_of_hashtags_costs_no_queries(self):
+        def count_queries(content):
+            # Without a due flush of the users' last request times
+            activity_buffer.clear()
+
+            with CaptureQueriesContext(connection) as queries:
+                self.create_post(content)
+
+            return len(queries)
+
+        one_tag = count_queries("#tag")
+        many_tags = count_queries(" ".join(f"#tag{i}" for i in range(30)))
+
+        self.assertEquals(many_tags, one_tag)
+        self.assertEquals(Hashtag.objects.count(), 31)
+
+    def test_cached_hashtags_resolved_without_lookup(self):
+        self.create_post("#cached")
+
+        with CaptureQueriesContext(connection) as queries:
+            self.create_post("#cached")
+
+        self.assertFalse(
+            any(
+                '"post_hashtag"."name" IN' in query["sql"]
+                for query in queries
+            )
+        )
+        self.assertEquals(
+            Hashtag.objects.get(name="cached").posts_count, 2
+        )
+
+    def test_deleted_cached_hashtag_created_again(self):
+        self.create_post("#gone")
+        hashtag_id_cache.set_many(
+            {"gone": Hashtag.objects.get(name="gone").id}
+        )
+        Hashtag.objects.filter(name="gone").delete()
+
+        res = self.create_post("#gone again")
+
+        self.assertEquals(self.get_hashtag_names(res.data["id"]), ["gone"])
+
+    def test_renamed_cached_hashtag_not_linked(self):
+        self.create_post("#before")
+        renamed = Hashtag.objects.get(name="before")
+        hashtag_id_cache.set_many({"before": renamed.id})
+        # Renamed by another process, which cleared only its own cache
+        Hashtag.objects.filter(pk=renamed.pk).update(name="after")
+
+        res = self.create_post("#before again")
+
+        self.assertEquals(self.get_hashtag_names(res.data["id"]), ["before"])
+        self.assertNotEquals(
+            Hashtag.objects.get(name="before").id, renamed.id
+        )
+
+    def test_bulk_create_renamed_cached_hashtag_not_linked(self):
+        self.create_post("#before")
+        renamed = Hashtag.objects.get(name="before")
+        hashtag_id_cache.set_many({"before": renamed.id})
+        Hashtag.objects.filter(pk=renamed.pk).update(name="after")
+
+        res = self.client.post(
+            BULK_CREATE_URL,
+            {"posts": [{"title": "Title", "content": "#before"}]},
+            format="json",
+        )
+
+        self.assertEquals(res.status_code, status.HTTP_201_CREATED)
+        self.assertEquals(
+            self.get_hashtag_names(res.data["results"][0]["id"]), ["before"]
+        )
+
+    def test_update_relinks_content_hashtags(self):
+        given = Hashtag.objects.create(name="given")
+        res = self.create_post("#old and #kept", hashtags=[given.id])
+        post_id = res.data["id"]
+
+        res = self.client.patch(
+            detail_url(post_id), {"content": "#kept and #new"}
+        )
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(
+            self.get_hashtag_names(post_id), ["given", "kept", "new"]
+        )
+        self.assertEquals(Hashtag.objects.get(name="old").posts_count, 0)
+        self.assertEquals(Hashtag.objects.get(name="kept").posts_count, 1)
+
+    def test_title_update_does_not_relink_hashtags(self):
+        post_id = self.create_post("#kept").data["id"]
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.patch(detail_url(post_id), {"title": "New"})
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(
+            any(
+                "INSERT INTO post_post_hashtags" in query["sql"]
+                for query in queries
+            )
+        )
+        self.assertEquals(self.get_hashtag_names(post_id), ["kept"])
+
+    def test_bulk_create_links_content_hashtags(self):
+        payload = {
+            "posts": [
+                {"title": f"Title {i}", "content": f"#bulk #post{i}"}
+                for i in range(3)
+            ]
+        }
+
+        res = self.client.post(BULK_CREATE_URL, payload, format="json")
+
+        self.assertEquals(res.status_code, status.HTTP_201_CREATED)
+        self.assertEquals(
+            self.get_hashtag_names(res.data["results"][1]["id"]),
+            ["bulk", "post1"],
+        )
+        self.assertEquals(Hashtag.objects.get(name="bulk").posts_count, 3)
+
+
+class PostSparseFieldsApiTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="test_user",
+            password="test_pass",
+        )
+        self.client.force_authenticate(self.user)
+        self.hashtag = Hashtag.objects.create(name="sparse")
+        self.post = Post.objects.create(
+            author=self.user,
+            title="Title",
+            content="Long content " * 100,
+        )
+        self.post.hashtags.add(self.hashtag)
+        response_cache.clear()
+
+    def test_fields_chosen(self):
+        res = self.client.get(POST_LIST_URL, {"fields": "id,title,unknown"})
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(
+            res.data["results"], [{"id": self.post.id, "title": "Title"}]
+        )
+
+    def test_fields_excluded(self):
+        res = self.client.get(
+            detail_url(self.post.id), {"exclude": "content,comments"}
+        )
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn("content", res.data)
+        self.assertNotIn("comments", res.data)
+        self.assertEquals(res.data["hashtags"], ["sparse"])
+
+    def test_left_out_columns_and_relations_not_fetched(self):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(POST_LIST_URL, {"fields": "id,title"})
+
+        post_queries = [
+            query["sql"] for query in queries if "post_post" in query["sql"]
+        ]
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(len(post_queries), 1)
+        self.assertNotIn('"content"', post_queries[0])
+        self.assertNotIn("user_user", post_queries[0])
+        self.assertFalse(
+            any("post_hashtag" in query["sql"] for query in queries)
+        )
+
+    def test_content_excerpt(self):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(POST_LIST_URL, {"excerpt": 20})
+
+        self.assertEquals(
+            res.data["results"][0]["content"], self.post.content[:20]
+        )
+        self.assertTrue(
+            any("SUBSTRING" in query["sql"] for query in queries)
+        )
+
+    def test_excerpt_in_feed_and_favorites(self):
+        follower = get_user_model().objects.create_user(
+            username="follower",
+            password="test_pass",
+        )
+        self.client.force_authenticate(follower)
+        self.client.post(reverse("user:follow_user", args=[self.user.id]))
+        self.client.post(like_unlike_url(self.post.id))
+        Post.objects.create(
+            author=self.user, title="Followed", content="Followed content"
+        )
+
+        for url in (FEED_URL, FAVORITE_URL):
+            res = self.client.get(url, {"excerpt": 8, "fields": "content"})
+
+            self.assertEquals(res.status_code, status.HTTP_200_OK)
+            self.assertEquals(
+                [post["content"] for post in res.data["results"]][-1],
+                "Long con",
+            )
+
+    def test_sparse_responses_have_own_etag(self):
+        etags = {
+            self.client.get(detail_url(self.post.id), params)["ETag"]
+            for params in ({}, {"fields": "id"}, {"fields": "title"})
+        }
+
+        self.assertEquals(len(etags), 3)
+
+    def test_hashtag_fields(self):
+        res = self.client.get(
+            reverse("post:hashtag-list"), {"fields": "name"}
+        )
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(res.data["results"], [{"name": "sparse"}])
+
+    def test_fields_ignored_when_writing(self):
+        res = self.client.patch(
+            f"{detail_url(self.post.id)}?fields=id",
+            {"title": "New title"},
+        )
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(res.data["title"], "New title")
+
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, IMAGE_PROCESSING_WORKERS=0)
+class PostImageApiTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="test_user",
+            password="test_pass",
+        )
+        self.client.force_authenticate(self.user)
+        self.post = Post.objects.create(
+            author=self.user,
+            title="Title",
+            content="Content",
+        )
+        response_cache.clear()
+
+    def upload(self, post, image_file):
+        return self.client.post(
+            upload_image_url(post.id),
+            {"image": image_file},
+            format="multipart",
+        )
+
+    def test_upload_image_creates_stripped_variants(self):
+        res = self.upload(self.post, create_image_file())
+
+        self.assertEquals(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEquals(res.data["image_status"], ImageAsset.READY)
+        asset = ImageAsset.objects.get()
+
+        for name, bounds in (
+            ("thumbnail", (200, 200)),
+            ("feed", (640, 427)),
+            ("full", (1200, 800)),
+        ):
+            with Image.open(getattr(asset, name).path) as variant:
+                self.assertEquals(variant.size, bounds)
+                self.assertEquals(variant.format, "JPEG")
+                self.assertEquals(len(variant.getexif()), 0)
+
+        self.post.refresh_from_db()
+        self.assertEquals(self.post.image.name, asset.full.name)
+
+    def test_identical_uploads_are_deduplicated(self):
+        other_post = Post.objects.create(
+            author=self.user,
+            title="Other title",
+            content="Other content",
+        )
+
+        self.upload(self.post, create_image_file())
+        self.upload(other_post, create_image_file())
+
+        asset = ImageAsset.objects.get()
+        self.assertEquals(
+            sorted(asset.posts.values_list("id", flat=True)),
+            [self.post.id, other_post.id],
+        )
+
+    def test_list_exposes_variant_urls(self):
+        self.upload(self.post, create_image_file())
+
+        res = self.client.get(POST_LIST_URL)
+
+        variants = res.data["results"][0]["image_variants"]
+        self.assertEquals(sorted(variants), ["feed", "full", "thumbnail"])
+        self.assertTrue(variants["thumbnail"].startswith("http://testserver"))
+
+    def test_previous_image_is_kept_until_processed(self):
+        self.upload(self.post, create_image_file())
+        self.post.refresh_from_db()
+        previous_image = self.post.image.name
+
+        # Processing in the pool is deferred past the test transaction,
+        # like the work left behind by a stopped worker
+        with self.settings(IMAGE_PROCESSING_WORKERS=2):
+            res = self.upload(self.post, create_image_file(color="blue"))
+
+        self.assertEquals(res.data["image_status"], ImageAsset.PENDING)
+        self.post.refresh_from_db()
+        self.assertEquals(self.post.image.name, previous_image)
+
+        call_command(
+            "process_pending_images", "--min-age", "0", stdout=StringIO()
+        )
+
+        self.post.refresh_from_db()
+        self.assertEquals(self.post.image_asset.status, ImageAsset.READY)
+        self.assertEquals(
+            self.post.image.name, self.post.image_asset.full.name
+        )
+
+    def test_invalid_image_is_rejected(self):
+        res = self.upload(
+            self.post,
+            SimpleUploadedFile("photo.jpg", b"not an image"),
+        )
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(ImageAsset.objects.exists())
+
+
+class FeedApiTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user, self.author, self.other_author = (
+            get_user_model().objects.create_user(
+                username=username,
+                password="test_pass",
+            )
+            for username in ("test_user", "author", "other_author")
+        )
+        self.client.force_authenticate(self.user)
+
+    def follow(self, author):
+        return self.client.post(
+            reverse("user:follow_user", args=[author.id])
+        )
+
+    def test_feed_shows_posts_of_followed_authors(self):
+        old_posts = create_posts(self.author)
+        create_posts(self.other_author)
+
+        self.follow(self.author)
+        new_posts = create_posts(self.author)
+        res = self.client.get(FEED_URL, {"page_size": 4})
+        ids = [post["id"] for post in res.data["results"]]
+
+        while res.data["next"]:
+            res = self.client.get(res.data["next"])
+            ids.extend(post["id"] for post in res.data["results"])
+
+        self.assertEquals(
+            ids,
+            [post.id for post in reversed(old_posts + new_posts)],
+        )
+
+    def test_feed_merges_posts_of_popular_authors_on_read(self):
+        self.follow(self.author)
+        self.follow(self.other_author)
+
+        with self.settings(FEED_FANOUT_MAX_FOLLOWERS=1):
+            posts = create_posts(self.author) + create_posts(
+                self.other_author
+            )
+            res = self.client.get(FEED_URL, {"page_size": 20})
+
+        self.assertFalse(self.user.timeline_entries.exists())
+        self.assertEquals(
+            [post["id"] for post in res.data["results"]],
+            [post.id for post in reversed(posts)],
+        )
+
+    def test_unfollow_removes_posts_from_feed(self):
+        self.follow(self.author)
+        create_posts(self.author)
+
+        self.client.delete(reverse("user:follow_user", args=[self.author.id]))
+        res = self.client.get(FEED_URL)
+
+        self.assertEquals(res.data["results"], [])
+        self.author.refresh_from_db()
+        self.assertEquals(self.author.followers_count, 0)
+
+    def test_follow_yourself_is_not_allowed(self):
+        res = self.follow(self.user)
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+UPLOAD_TEMP_DIR = tempfile.mkdtemp()
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    IMAGE_PROCESSING_WORKERS=0,
+    IMAGE_UPLOAD_TEMP_DIR=UPLOAD_TEMP_DIR,
+)
+class PostImageUploadApiTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        shutil.rmtree(UPLOAD_TEMP_DIR, ignore_errors=True)
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="test_user",
+            password="test_pass",
+        )
+        self.client.force_authenticate(self.user)
+        self.post = Post.objects.create(
+            author=self.user,
+            title="Title",
+            content="Content",
+        )
+        self.content = create_image_file().read()
+        response_cache.clear()
+
+    def start_upload(self, size=None, content_type="image/jpeg"):
+        return self.client.post(
+            image_uploads_url(self.post.id),
+            {
+                "filename": "photo.jpg",
+                "content_type": content_type,
+                "size": len(self.content) if size is None else size,
+            },
+            format="json",
+        )
+
+    def send_chunk(self, upload_id, offset, chunk):
+        return self.client.patch(
+            image_upload_url(upload_id),
+            chunk,
+            content_type="application/offset+octet-stream",
+            HTTP_UPLOAD_OFFSET=str(offset),
+        )
+
+    def test_chunked_upload_attaches_image(self):
+        upload_id = self.start_upload().data["id"]
+        middle = len(self.content) // 2
+
+        res = self.send_chunk(upload_id, 0, self.content[:middle])
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(res.data["offset"], middle)
+        self.assertFalse(ImageAsset.objects.exists())
+
+        res = self.send_chunk(upload_id, middle, self.content[middle:])
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(res.data["image_status"], ImageAsset.READY)
+        self.post.refresh_from_db()
+        self.assertEquals(
+            self.post.image.name, ImageAsset.objects.get().full.name
+        )
+        self.assertFalse(ImageUpload.objects.exists())
+        self.assertNotIn(f"{upload_id}.part", os.listdir(UPLOAD_TEMP_DIR))
+
+    def test_upload_resumes_from_stored_offset(self):
+        upload_id = self.start_upload().data["id"]
+        self.send_chunk(upload_id, 0, self.content[:100])
+
+        res = self.send_chunk(upload_id, 50, self.content[50:])
+
+        self.assertEquals(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEquals(res.data["offset"], 100)
+
+        res = self.client.get(image_upload_url(upload_id))
+        offset = int(res["Upload-Offset"])
+        res = self.send_chunk(upload_id, offset, self.content[offset:])
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(res.data["image_status"], ImageAsset.READY)
+
+    def test_content_not_matching_type_is_rejected_early(self):
+        upload_id = self.start_upload(content_type="image/png").data["id"]
+
+        res = self.send_chunk(upload_id, 0, self.content[:100])
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(ImageUpload.objects.exists())
+
+    def test_chunk_beyond_announced_size_is_rejected(self):
+        upload_id = self.start_upload(size=100).data["id"]
+
+        res = self.send_chunk(upload_id, 0, self.content[:101])
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEquals(ImageUpload.objects.get().offset, 0)
+
+    @override_settings(IMAGE_UPLOAD_MAX_SIZE=1000)
+    def test_too_large_upload_is_refused(self):
+        res = self.start_upload(size=1001)
+
+        self.assertEquals(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(ImageUpload.objects.exists())
+
+    def test_chunk_of_claimed_upload_is_refused(self):
+        upload_id = self.start_upload().data["id"]
+        upload = ImageUpload.objects.get()
+        self.assertTrue(ImageUpload.objects.claim(upload, 0))
+
+        res = self.send_chunk(upload_id, 0, self.content)
+
+        self.assertEquals(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEquals(res.data["offset"], 0)
+
+        ImageUpload.objects.filter(pk=upload_id).update(
+            receiving_since=datetime(2000, 1, 1)
+        )
+        res = self.send_chunk(upload_id, 0, self.content)
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(res.data["image_status"], ImageAsset.READY)
+
+    def test_chunk_is_not_stored_when_claim_was_taken_over(self):
+        upload_id = self.start_upload().data["id"]
+        upload = ImageUpload.objects.get()
+        self.assertTrue(ImageUpload.objects.claim(upload, 0))
+        ImageUpload.objects.filter(pk=upload_id).update(
+            receiving_since=datetime(2100, 1, 1)
+        )
+
+        self.assertFalse(ImageUpload.objects.release(upload, 100))
+        self.assertEquals(ImageUpload.objects.get().offset, 0)
+
+    def test_purge_removes_stale_uploads_and_files(self):
+        upload_id = self.start_upload().data["id"]
+        self.send_chunk(upload_id, 0, self.content[:100])
+        recent_id = self.start_upload().data["id"]
+        orphan_path = os.path.join(UPLOAD_TEMP_DIR, "orphan.part")
+        open(orphan_path, "wb").close()
+        os.utime(orphan_path, (0, 0))
+        ImageUpload.objects.filter(pk=upload_id).update(
+            created_at=datetime(2000, 1, 1)
+        )
+        out = StringIO()
+
+        call_command("purge_image_uploads", stdout=out)
+
+        self.assertIn("Removed 1 image upload(s)!", out.getvalue())
+        self.assertEquals(str(ImageUpload.objects.get().id), recent_id)
+        names = os.listdir(UPLOAD_TEMP_DIR)
+        self.assertNotIn(f"{upload_id}.part", names)
+        self.assertNotIn("orphan.part", names)
+        self.assertIn(f"{recent_id}.part", names)
+
+    def test_upload_of_other_user_is_not_found(self):
+        upload_id = self.start_upload().data["id"]
+        other_user = get_user_model().objects.create_user(
+            username="other_user",
+            password="test_pass",
+        )
+        self.client.force_authenticate(other_user)
+
+        res = self.send_chunk(upload_id, 0, self.content)
+
+        self.assertEquals(res.status_code, status.HTTP_404_NOT_FOUND)
@@ -1,10 +1,12 @@
-from django.urls import path
+from django.urls import path, re_path
 from rest_framework import routers
 
+from post.async_views import AsyncPostViewSet
 from post.views import (
     HashtagViewSet,
     PostViewSet,
     LikesAnalyticsView,
+    ImageUploadView,
 )
 
 router = routers.DefaultRouter()
@@ -13,6 +15,58 @@ router.register("", PostViewSet)
 
 urlpatterns = [
     path("analytics/", LikesAnalyticsView.as_view(), name="analytics"),
+    path(
+        "image-uploads/<uuid:pk>/",
+        ImageUploadView.as_view(),
+        name="image-upload",
+    ),
 ] + router.urls
 
+# Routes of the ASGI application: the hot post actions are served by the
+# async views in front of the same routes of the router
+async_urlpatterns = [
+    re_path(
+        r"^$",
+        AsyncPostViewSet.as_view({"get": "list"}, {"post": "create"}),
+        name="post-list",
+    ),
+    re_path(
+        r"^feed/$",
+        AsyncPostViewSet.as_view({"get": "show_feed"}),
+        name="post-show-feed",
+    ),
+    re_path(
+        r"^favorite/$",
+        AsyncPostViewSet.as_view({"get": "show_favorite_posts"}),
+        name="post-show-favorite-posts",
+    ),
+    re_path(
+        r"^(?P<pk>[0-9]+)/$",
+        AsyncPostViewSet.as_view(
+            {"get": "retrieve"},
+            {
+                "put": "update",
+                "patch": "partial_update",
+                "delete": "destroy",
+            },
+        ),
+        name="post-detail",
+    ),
+    re_path(
+        r"^(?P<pk>[0-9]+)/like/$",
+        AsyncPostViewSet.as_view({"put": "like", "delete": "like"}),
+        name="post-like",
+    ),
+    re_path(
+        r"^(?P<pk>[0-9]+)/like-unlike/$",
+        AsyncPostViewSet.as_view({"post": "like_unlike_post"}),
+        name="post-like-unlike-post",
+    ),
+    re_path(
+        r"^(?P<pk>[0-9]+)/add-comment/$",
+        AsyncPostViewSet.as_view({"post": "add_comment"}),
+        name="post-add-comment",
+    ),
+] + urlpatterns
+
 app_name = "post"
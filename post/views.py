@@ -1,40 +1,109 @@
+import hashlib
+import json
 from datetime import datetime, timedelta
+from functools import partial
 
-from django.db.models import Count
-from django.db.models.functions import TruncDate
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.core.cache import cache
+from django.db.models import F, FloatField, prefetch_related_objects
+from django.db.models.functions import Cast, Substr
+from django.http import Http404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date, quote_etag
 from drf_spectacular.utils import extend_schema, OpenApiParameter
-from rest_framework import status, viewsets
+from rest_framework import serializers, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from post.cache import response_cache
+from post.fast_serializers import (
+    FastHashtagSerializer,
+    FastPostDetailSerializer,
+    FastPostListSerializer,
+)
+from post.images import (
+    append_upload_chunk,
+    complete_image_upload,
+    discard_image_upload,
+)
 from post.models import (
+    SEARCH_CONFIG,
     Hashtag,
+    ImageUpload,
+    Like,
+    LikeDailyRollup,
+    LikeHourlyRollup,
     Post,
 )
 from post.paginations import (
+    FeedPagination,
     HashtagPagination,
     PostPagination,
+    PostLikePagination,
+    get_item_value,
 )
 from post.permissions import (
     IsPostOwnerOrReadOnly,
 )
 from post.serializers import (
     HashtagSerializer,
+    HashtagAutocompleteSerializer,
     PostSerializer,
     PostListSerializer,
     PostDetailSerializer,
     PostImageSerializer,
+    ImageUploadSerializer,
+    PostLikeSerializer,
+    PostBulkLikeSerializer,
+    PostBulkCreateSerializer,
     CommentAddSerializer,
+    get_sparse_field_names,
 )
 
+# Shorter prefixes match most of the hashtags, all sorted by popularity
+HASHTAG_AUTOCOMPLETE_MIN_LENGTH = 3
+HASHTAG_AUTOCOMPLETE_LIMIT = 10
+HASHTAG_AUTOCOMPLETE_MAX_LIMIT = 50
+HASHTAG_AUTOCOMPLETE_CACHE_TIMEOUT = 30
+POST_EXCERPT_MAX_LENGTH = 1000
+
+
+SPARSE_FIELDS_PARAMETERS = [
+    OpenApiParameter(
+        name="fields",
+        type=str,
+        description="Comma separated fields to return (ex. ?fields=id,title)",
+        required=False,
+    ),
+    OpenApiParameter(
+        name="exclude",
+        type=str,
+        description="Comma separated fields to leave out "
+                    "(ex. ?exclude=content,hashtags)",
+        required=False,
+    ),
+]
+
+
+def is_conditional(request) -> bool:
+    return (
+        "HTTP_IF_NONE_MATCH" in request.META
+        or "HTTP_IF_MODIFIED_SINCE" in request.META
+    )
+
 
 class UploadImageMixin:
+    throttle_scope = None
+
     @action(
         methods=["POST"],
         detail=True,
         url_path="upload-image",
+        throttle_scope="image_upload",
     )
     def upload_image(self, request, pk=None):
         """Endpoint for uploading the image to the specific instance"""
@@ -43,15 +112,138 @@ class UploadImageMixin:
 
         serializer.is_valid(raise_exception=True)
         serializer.save()
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
+    @action(
+        methods=["POST"],
+        detail=True,
+        url_path="image-uploads",
+        throttle_scope="image_upload",
+    )
+    def create_image_upload(self, request, pk=None):
+        """Endpoint for starting a resumable upload of the instance image"""
+        instance = self.get_object()
+        serializer = self.get_serializer(data=request.data)
+
+        serializer.is_valid(raise_exception=True)
+        upload = serializer.save(post=instance, user=request.user)
+        return Response(
+            serializer.data,
+            status=status.HTTP_201_CREATED,
+            headers={
+                "Location": reverse("post:image-upload", args=[upload.id]),
+                "Upload-Offset": str(upload.offset),
+            },
+        )
+
+
+class CachedResponseMixin:
+    # Response cache scopes whose new version drops the cached responses
+    response_cache_scopes = ()
+    # Response headers cached with the data, like the validators
+    cached_headers = ()
+
+    def get_response_cache_scopes(self):
+        return self.response_cache_scopes
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        """
+        Serve the response from the response cache, or build it with the
+        handler and cache it when it succeeds. The key is made before the
+        data is read, so it never holds data older than its scopes.
+        """
+        cache_key = response_cache.make_key(
+            self.get_response_cache_scopes(), request
+        )
+        cached = response_cache.get(cache_key)
+
+        if cached is not None:
+            data, headers = cached
+            response = self.get_not_modified_response(
+                request, headers
+            ) or Response(data, status=status.HTTP_200_OK, headers=headers)
+            response["X-Cache"] = "HIT"
+            return response
+
+        response = handler(request, *args, **kwargs)
+
+        if response.status_code == status.HTTP_200_OK:
+            response_cache.set(
+                cache_key,
+                (response.data, self.get_cached_headers(response)),
+            )
+
+        response["X-Cache"] = "MISS"
+        return response
+
+    def get_cached_headers(self, response) -> dict:
+        return {
+            header: response[header]
+            for header in self.cached_headers
+            if response.has_header(header)
+        }
+
+    def get_not_modified_response(self, request, headers):
+        """
+        The 304 (or 412) response to a conditional request matching the
+        ETag and Last-Modified headers of the current response
+        """
+        if not headers:
+            return None
+
+        last_modified = headers.get("Last-Modified")
+        response = get_conditional_response(
+            request,
+            etag=headers.get("ETag"),
+            last_modified=last_modified and parse_http_date(last_modified),
+        )
+
+        if response is None:
+            return None
+
+        return Response(status=response.status_code, headers=headers)
+
+
+class FastSerializerMixin:
+    """
+    Serve the read actions of ``fast_serializer_classes`` with a fast
+    serializer building the response from ``.values()`` rows (the
+    queryset of the action has to fetch them), unless the
+    FAST_SERIALIZATION setting is off
+    """
+
+    fast_serializer_classes = {}
+
+    def is_fast(self) -> bool:
+        return (
+            settings.FAST_SERIALIZATION
+            and self.action in self.fast_serializer_classes
+            and not getattr(self, "swagger_fake_view", False)
+        )
+
+    def get_serializer(self, *args, **kwargs):
+        if not self.is_fast():
+            return super().get_serializer(*args, **kwargs)
+
+        kwargs.setdefault("context", self.get_serializer_context())
+        return self.fast_serializer_classes[self.action](*args, **kwargs)
 
 
 @extend_schema(tags=["Hashtags"])
-class HashtagViewSet(viewsets.ModelViewSet):
+class HashtagViewSet(
+    CachedResponseMixin,
+    FastSerializerMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Hashtag.objects.all()
     serializer_class = HashtagSerializer
     permission_classes = (IsAuthenticated,)
     pagination_class = HashtagPagination
+    response_cache_scopes = ("hashtags",)
+    fast_serializer_classes = {
+        "list": FastHashtagSerializer,
+        "retrieve": FastHashtagSerializer,
+    }
 
     def get_queryset(self):
         queryset = self.queryset
@@ -62,6 +254,15 @@ class HashtagViewSet(viewsets.ModelViewSet):
             if name:
                 queryset = queryset.filter(name__icontains=name)
 
+        if self.is_fast():
+            queryset = queryset.values(*self.get_serializer().columns)
+        elif self.action in ("list", "retrieve"):
+            queryset = queryset.only(
+                *get_sparse_field_names(
+                    self.get_serializer_class().Meta.fields, self.request
+                )
+            )
+
         return queryset
 
     @extend_schema(
@@ -72,52 +273,272 @@ class HashtagViewSet(viewsets.ModelViewSet):
                 description="Filter by name (ex. ?name=FREEDOM)",
                 required=False,
             ),
+            *SPARSE_FIELDS_PARAMETERS,
         ]
     )
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        return self.get_cached_response(
+            super().list, request, *args, **kwargs
+        )
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="q",
+                type=str,
+                description="Prefix or part of the name, at least "
+                            f"{HASHTAG_AUTOCOMPLETE_MIN_LENGTH} characters "
+                            "(ex. ?q=free)",
+                required=True,
+            ),
+            OpenApiParameter(
+                name="limit",
+                type=int,
+                description="Maximum number of suggestions (ex. ?limit=5)",
+                required=False,
+            ),
+        ],
+        responses=HashtagAutocompleteSerializer(many=True),
+    )
+    @action(
+        methods=["GET"],
+        detail=False,
+        url_path="autocomplete",
+        pagination_class=None,
+    )
+    def autocomplete(self, request):
+        """
+        Endpoint for suggesting hashtags: prefix matches come first, then
+        the other matches, each ranked by the number of posts
+        """
+        query = request.query_params.get("q", "").strip().lstrip("#")
+
+        try:
+            limit = int(request.query_params.get("limit", ""))
+        except ValueError:
+            limit = HASHTAG_AUTOCOMPLETE_LIMIT
+
+        limit = max(1, min(limit, HASHTAG_AUTOCOMPLETE_MAX_LIMIT))
+
+        if len(query) < HASHTAG_AUTOCOMPLETE_MIN_LENGTH:
+            return Response([], status=status.HTTP_200_OK)
+
+        cache_key = "hashtag-autocomplete:{}:{}".format(
+            limit,
+            hashlib.md5(query.upper().encode()).hexdigest(),
+        )
+        data = cache.get(cache_key)
+
+        if data is None:
+            ranking = ("-posts_count", "name")
+            hashtags = list(
+                Hashtag.objects
+                .filter(name__istartswith=query)
+                .order_by(*ranking)[:limit]
+            )
+
+            if len(hashtags) < limit:
+                hashtags.extend(
+                    Hashtag.objects
+                    .filter(name__icontains=query)
+                    .exclude(name__istartswith=query)
+                    .order_by(*ranking)[:limit - len(hashtags)]
+                )
+
+            data = HashtagAutocompleteSerializer(hashtags, many=True).data
+            cache.set(cache_key, data, HASHTAG_AUTOCOMPLETE_CACHE_TIMEOUT)
+
+        return Response(data, status=status.HTTP_200_OK)
 
 
 @extend_schema(tags=["Posts"])
-class PostViewSet(UploadImageMixin, viewsets.ModelViewSet):
+class PostViewSet(
+    CachedResponseMixin,
+    FastSerializerMixin,
+    UploadImageMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Post.objects.all()
     serializer_class = PostSerializer
     permission_classes = (IsAuthenticated, IsPostOwnerOrReadOnly)
     pagination_class = PostPagination
+    response_cache_scopes = ("posts",)
+    cached_headers = ("ETag", "Last-Modified")
+    fast_serializer_classes = {
+        "list": FastPostListSerializer,
+        "retrieve": FastPostDetailSerializer,
+        "show_favorite_posts": FastPostListSerializer,
+        "show_feed": FastPostListSerializer,
+    }
 
-    def get_queryset(self):
+    # Actions whose queryset loads only the fields shown by the response
+    sparse_actions = ("list", "retrieve", "show_favorite_posts", "show_feed")
+    # Post columns read by a single field of the post serializers, not
+    # loaded when the field is left out
+    sparse_columns = {
+        "title": "title",
+        "content": "content",
+        "image": "image",
+        "likes_count": "likes_count",
+        "comments_count": "comments_count",
+    }
+
+    def get_filtered_queryset(self):
+        """The posts of the action, filtered and ordered"""
         queryset = self.queryset
+        ordering = ("-created_at", "-id")
 
         if self.action == "list":
+            search = self.request.query_params.get("q")
             title = self.request.query_params.get("title")
             author = self.request.query_params.get("author")
 
+            if search:
+                query = SearchQuery(
+                    search,
+                    config=SEARCH_CONFIG,
+                    search_type="websearch",
+                )
+                queryset = queryset.filter(search_vector=query).annotate(
+                    rank=Cast(
+                        SearchRank(F("search_vector"), query),
+                        FloatField(),
+                    )
+                )
+                ordering = ("-rank", "-id")
+
             if title:
                 queryset = queryset.filter(title__icontains=title)
 
             if author:
                 queryset = queryset.filter(author__username__icontains=author)
 
-        queryset = (
-            queryset
-            .select_related("author")
-            .prefetch_related(
-                "hashtags",
-                "comments__author",
+        return queryset.order_by(*ordering)
+
+    def get_queryset(self):
+        queryset = self.get_filtered_queryset()
+
+        if self.action in self.sparse_actions:
+            return self.get_sparse_queryset(queryset).prefetch_related(
+                *self.get_prefetched_relations()
             )
-            .annotate(
-                likes_count=Count("likes", distinct=True),
-                comments_count=Count("comments", distinct=True),
+
+        return (
+            queryset
+            .defer("search_vector")
+            .select_related("author", "image_asset")
+            .prefetch_related("hashtags")
+        )
+
+    def get_shown_fields(self) -> set:
+        """The post fields chosen by ``?fields=`` and ``?exclude=``"""
+        return set(
+            get_sparse_field_names(
+                self.get_serializer_class().Meta.fields,
+                self.request,
             )
-            .order_by("-created_at")
         )
 
+    def get_excerpt_length(self):
+        """
+        The number of characters the content of a listed post is cut to
+        by ``?excerpt=``, None to show the whole content
+        """
+        if self.action == "retrieve":
+            return None
+
+        try:
+            length = int(self.request.query_params["excerpt"])
+        except (KeyError, ValueError):
+            return None
+
+        return min(max(length, 1), POST_EXCERPT_MAX_LENGTH)
+
+    def get_sparse_queryset(self, queryset, prefix=""):
+        """
+        Load only what the shown fields read: the columns of the other
+        fields are deferred and their relations are not joined. With an
+        excerpt the content is cut in SQL and the column is not loaded.
+        The posts are related to the queryset model by ``prefix``.
+        """
+        fields = self.get_shown_fields()
+        deferred = ["search_vector"] + [
+            column
+            for field, column in self.sparse_columns.items()
+            if field not in fields
+        ]
+        related = []
+        excerpt_length = self.get_excerpt_length()
+
+        if "content" in fields and excerpt_length:
+            deferred.append("content")
+            queryset = queryset.annotate(
+                content_excerpt=Substr(f"{prefix}content", 1, excerpt_length)
+            )
+
+        if self.is_fast():
+            return self.get_values_queryset(queryset, prefix)
+
+        if "author" in fields:
+            related.append("author")
+
+        if "image_variants" in fields:
+            related.append("image_asset")
+
+        queryset = queryset.defer(*[prefix + column for column in deferred])
+
+        if related:
+            queryset = queryset.select_related(
+                *[prefix + relation for relation in related]
+            )
+
         return queryset
 
+    def get_values_queryset(self, queryset, prefix=""):
+        """
+        The rows of the fast serializer: the columns of the shown fields
+        (with the excerpt in place of the content) and the ones read by
+        the pagination and the validators
+        """
+        columns = ["id", "created_at", "updated_at"]
+        excerpt = []
+        ordering = [field.lstrip("-") for field in queryset.query.order_by]
+
+        for column in self.get_serializer().columns:
+            if column == "content" and "content_excerpt" in (
+                queryset.query.annotations
+            ):
+                excerpt.append("content_excerpt")
+            else:
+                columns.append(column)
+
+        return queryset.values(
+            *dict.fromkeys(
+                [prefix + column for column in columns] + excerpt + ordering
+            )
+        )
+
+    def get_prefetched_relations(self) -> list:
+        # The fast serializers fetch the related data of the rows
+        if self.is_fast():
+            return []
+
+        fields = self.get_shown_fields()
+        relations = []
+
+        if "hashtags" in fields:
+            relations.append("hashtags")
+
+        if "comments" in fields:
+            relations.append("comments__author")
+
+        return relations
+
     def get_serializer_class(self):
         if self.action in (
             "list",
             "show_favorite_posts",
+            "show_feed",
         ):
             return PostListSerializer
 
@@ -127,11 +548,210 @@ class PostViewSet(UploadImageMixin, viewsets.ModelViewSet):
         if self.action == "upload_image":
             return PostImageSerializer
 
+        if self.action == "create_image_upload":
+            return ImageUploadSerializer
+
         if self.action == "add_comment":
             return CommentAddSerializer
 
+        if self.action == "show_likes":
+            return PostLikeSerializer
+
+        if self.action == "bulk_like":
+            return PostBulkLikeSerializer
+
+        if self.action == "bulk_create_posts":
+            return PostBulkCreateSerializer
+
         return PostSerializer
 
+    def get_response_cache_scopes(self):
+        if self.action == "retrieve":
+            return ("post-details", f"post:{self.kwargs['pk']}")
+
+        return super().get_response_cache_scopes()
+
+    def get_favorite_likes(self):
+        return self.get_sparse_queryset(
+            Like.objects
+            .filter(user=self.request.user)
+            .select_related("post")
+            .order_by("-created_at", "-id"),
+            prefix="post__",
+        )
+
+    def get_favorite_posts(self, likes) -> list:
+        """The liked posts, with the content excerpts made for the likes"""
+        if self.is_fast():
+            return [
+                {
+                    column.removeprefix("post__"): value
+                    for column, value in like.items()
+                    if column.startswith("post__")
+                    or column == "content_excerpt"
+                }
+                for like in likes
+            ]
+
+        posts = []
+
+        for like in likes:
+            if hasattr(like, "content_excerpt"):
+                like.post.content_excerpt = like.content_excerpt
+
+            posts.append(like.post)
+
+        return posts
+
+    def get_popular_author_ids(self):
+        """The followed authors whose posts are not fanned out"""
+        return (
+            self.request.user.following
+            .filter(followers_count__gte=settings.FEED_FANOUT_MAX_FOLLOWERS)
+            .values_list("id", flat=True)
+        )
+
+    def get_feed_sources(self, popular_author_ids):
+        """
+        The materialized timeline of the user and the posts of the
+        popular authors, ordered for the merge of the feed pages
+        """
+        ordering = ("-feed_created_at", "-id")
+        sources = [
+            Post.objects
+            .filter(timeline_entries__user=self.request.user)
+            .annotate(feed_created_at=F("timeline_entries__created_at"))
+        ]
+
+        if popular_author_ids:
+            sources.append(
+                Post.objects
+                .filter(author_id__in=popular_author_ids)
+                .annotate(feed_created_at=F("created_at"))
+            )
+
+        return [
+            self.get_sparse_queryset(source.order_by(*ordering))
+            for source in sources
+        ]
+
+    def get_post_id(self):
+        """The post id from the URL, without fetching the post"""
+        try:
+            return int(self.kwargs["pk"])
+        except ValueError:
+            raise Http404
+
+    def get_validator_queryset(self):
+        """
+        The shown posts with only the columns the validators are made of:
+        the ordering ones and the modification time
+        """
+        queryset = self.get_filtered_queryset().only(
+            "id", "created_at", "updated_at"
+        )
+
+        if self.action == "retrieve":
+            return queryset.filter(pk=self.get_post_id())[:1]
+
+        return queryset
+
+    def get_validator_data(self, posts):
+        """The ids and modification times of the posts as response data"""
+        updated_at = serializers.DateTimeField()
+        data = [
+            {
+                "id": get_item_value(post, "id"),
+                "updated_at": updated_at.to_representation(
+                    get_item_value(post, "updated_at")
+                ),
+            }
+            for post in posts
+        ]
+
+        if self.action == "retrieve":
+            return data[0] if data else None
+
+        return self.paginator.get_paginated_response(data).data
+
+    def get_validators(self, data) -> dict:
+        """
+        ETag and Last-Modified headers of the response data, made of the
+        ids and the modification times of its posts; a list page also
+        changes with its links, so they are part of its ETag. The query
+        string chooses the shown fields, so it is part of it as well. A
+        list only gets the ETag: the latest modification of its posts
+        does not change when a post is deleted or leaves the page.
+        """
+        if data is None:
+            return {}
+
+        query = self.request.query_params.urlencode()
+
+        if self.action != "retrieve":
+            state = {
+                **data,
+                "results": [
+                    [post["id"], post["updated_at"]]
+                    for post in data["results"]
+                ],
+                "query": query,
+            }
+            etag = hashlib.md5(json.dumps(state).encode()).hexdigest()
+            return {"ETag": quote_etag(etag)}
+
+        state = [data["id"], data["updated_at"], query]
+        etag = hashlib.md5(json.dumps(state).encode()).hexdigest()
+        last_modified = datetime.fromisoformat(data["updated_at"])
+        return {
+            "ETag": quote_etag(etag),
+            "Last-Modified": http_date(last_modified.timestamp()),
+        }
+
+    def get_validated_response(self, handler, request, *args, **kwargs):
+        """
+        Answer a conditional GET missing from the response cache with 304
+        when the shown posts have not changed, checked with one lookup of
+        their modification times instead of building the response
+        """
+        if is_conditional(request):
+            if self.action == "retrieve":
+                posts = list(self.get_validator_queryset())
+            else:
+                posts = self.paginator.paginate_queryset(
+                    self.get_validator_queryset(), request, view=self
+                )
+
+            response = self.get_not_modified_response(
+                request, self.get_validators(self.get_validator_data(posts))
+            )
+
+            if response is not None:
+                return response
+
+        response = handler(request, *args, **kwargs)
+
+        if response.status_code == status.HTTP_200_OK:
+            validators = self.get_validators(
+                self.get_validator_data(self.shown_posts)
+            )
+
+            for header, value in validators.items():
+                response[header] = value
+
+        return response
+
+    def paginate_queryset(self, queryset):
+        # The shown posts are kept for the validators, as the response
+        # data may leave out the fields they are made of
+        self.shown_posts = super().paginate_queryset(queryset)
+        return self.shown_posts
+
+    def get_object(self):
+        post = super().get_object()
+        self.shown_posts = [post]
+        return post
+
     @action(
         methods=["POST"],
         detail=True,
@@ -140,22 +760,98 @@ class PostViewSet(UploadImageMixin, viewsets.ModelViewSet):
     )
     def like_unlike_post(self, request, pk=None):
         """Endpoint for liking/unliking posts feature"""
-        post = self.get_object()
+        post_id = self.get_post_id()
         user = self.request.user
 
-        if user not in post.likes.all():
-            post.likes.add(user)
+        if Like.objects.unlike(user.id, [post_id]):
             return Response(
-                {"detail": "You have successfully liked the post."},
+                {"detail": "Your like was successfully removed."},
                 status=status.HTTP_200_OK,
             )
 
-        post.likes.remove(user)
+        if (
+            not Like.objects.like(user.id, [post_id])
+            and not Post.objects.filter(pk=post_id).exists()
+        ):
+            raise Http404
+
         return Response(
-            {"detail": "Your like was successfully removed."},
+            {"detail": "You have successfully liked the post."},
             status=status.HTTP_200_OK,
         )
 
+    @extend_schema(request=None)
+    @action(
+        methods=["PUT", "DELETE"],
+        detail=True,
+        url_path="like",
+        permission_classes=[IsAuthenticated],
+    )
+    def like(self, request, pk=None):
+        """Endpoint for liking (PUT) or unliking (DELETE) the post"""
+        post_id = self.get_post_id()
+        user = self.request.user
+
+        if request.method == "PUT":
+            changed = Like.objects.like(user.id, [post_id])
+            detail = "You have successfully liked the post."
+        else:
+            changed = Like.objects.unlike(user.id, [post_id])
+            detail = "Your like was successfully removed."
+
+        if not changed and not Post.objects.filter(pk=post_id).exists():
+            raise Http404
+
+        return Response({"detail": detail}, status=status.HTTP_200_OK)
+
+    @action(
+        methods=["PUT", "DELETE"],
+        detail=False,
+        url_path="bulk-like",
+        permission_classes=[IsAuthenticated],
+    )
+    def bulk_like(self, request):
+        """
+        Endpoint for liking (PUT) or unliking (DELETE) several posts at
+        once, returning the posts whose like state has changed
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        post_ids = serializer.validated_data["posts"]
+        user = self.request.user
+
+        if request.method == "PUT":
+            changed = Like.objects.like(user.id, post_ids)
+        else:
+            changed = Like.objects.unlike(user.id, post_ids)
+
+        return Response({"posts": changed}, status=status.HTTP_200_OK)
+
+    @action(
+        methods=["GET"],
+        detail=True,
+        url_path="likes",
+        permission_classes=[IsAuthenticated],
+        pagination_class=PostLikePagination,
+    )
+    def show_likes(self, request, pk=None):
+        """Endpoint for showing a paginated list of the post likers"""
+        post_id = self.get_post_id()
+
+        if not Post.objects.filter(pk=post_id).exists():
+            raise Http404
+
+        likes = (
+            Like.objects
+            .filter(post_id=post_id)
+            .select_related("user")
+            .only("id", "user_id", "user__username")
+            .order_by("user_id")
+        )
+        page = self.paginate_queryset(likes)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
     @action(
         methods=["GET"],
         detail=False,
@@ -163,11 +859,60 @@ class PostViewSet(UploadImageMixin, viewsets.ModelViewSet):
         permission_classes=[IsAuthenticated],
     )
     def show_favorite_posts(self, request):
-        """Endpoint for showing a list of the favorite posts"""
-        user = self.request.user
-        posts = Post.objects.filter(likes=user)
+        """Endpoint for showing the favorite posts, the last liked first"""
+        likes = self.paginate_queryset(self.get_favorite_likes())
+        posts = self.get_favorite_posts(likes)
+        prefetch_related_objects(posts, *self.get_prefetched_relations())
         serializer = self.get_serializer(posts, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return self.get_paginated_response(serializer.data)
+
+    @action(
+        methods=["GET"],
+        detail=False,
+        url_path="feed",
+        permission_classes=[IsAuthenticated],
+        pagination_class=FeedPagination,
+    )
+    def show_feed(self, request):
+        """
+        Endpoint for showing the posts of the followed authors: the
+        materialized timeline merged with the posts of the authors
+        who have too many followers to be fanned out
+        """
+        popular_author_ids = list(self.get_popular_author_ids())
+        page = self.paginator.paginate_querysets(
+            self.get_feed_sources(popular_author_ids),
+            request,
+            view=self,
+        )
+        prefetch_related_objects(page, *self.get_prefetched_relations())
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(
+        methods=["POST"],
+        detail=False,
+        url_path="bulk",
+        permission_classes=[IsAuthenticated],
+    )
+    def bulk_create_posts(self, request):
+        """
+        Endpoint for creating many posts in one request: the valid posts
+        are created and the results list the id or the errors of each post
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = serializer.save()
+        created = sum("id" in result for result in results)
+
+        if created == len(results):
+            response_status = status.HTTP_201_CREATED
+        elif created:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+
+        return Response({"results": results}, status=response_status)
 
     @action(
         methods=["POST"],
@@ -197,6 +942,13 @@ class PostViewSet(UploadImageMixin, viewsets.ModelViewSet):
 
     @extend_schema(
         parameters=[
+            OpenApiParameter(
+                name="q",
+                type=str,
+                description="Full-text search in the title and content, "
+                            "ranked by relevance (ex. ?q=python async)",
+                required=False,
+            ),
             OpenApiParameter(
                 name="title",
                 type=str,
@@ -209,14 +961,38 @@ class PostViewSet(UploadImageMixin, viewsets.ModelViewSet):
                 description="Filter by author (ex. ?author=Jack)",
                 required=False,
             ),
+            OpenApiParameter(
+                name="excerpt",
+                type=int,
+                description="Cut the content to this many characters "
+                            f"(at most {POST_EXCERPT_MAX_LENGTH}, "
+                            "ex. ?excerpt=200)",
+                required=False,
+            ),
+            *SPARSE_FIELDS_PARAMETERS,
         ]
     )
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        return self.get_cached_response(
+            partial(self.get_validated_response, super().list),
+            request,
+            *args,
+            **kwargs,
+        )
+
+    @extend_schema(parameters=SPARSE_FIELDS_PARAMETERS)
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            partial(self.get_validated_response, super().retrieve),
+            request,
+            *args,
+            **kwargs,
+        )
 
 
 class LikesAnalyticsView(APIView):
     permission_classes = (IsAuthenticated,)
+    throttle_scope = "analytics"
 
     @extend_schema(
         tags=["Likes Analytics"],
@@ -233,11 +1009,19 @@ class LikesAnalyticsView(APIView):
                 description="End date for analytics (YYYY-MM-DD)",
                 required=True,
             ),
+            OpenApiParameter(
+                name="granularity",
+                type=str,
+                enum=["day", "hour"],
+                description="Size of the buckets (ex. ?granularity=hour)",
+                required=False,
+            ),
         ],
     )
     def get(self, request, *args, **kwargs):
         date_from_param = request.GET.get("date_from", "")
         date_to_param = request.GET.get("date_to", "")
+        granularity = request.GET.get("granularity", "day")
 
         if not date_from_param or not date_to_param:
             return Response(
@@ -245,6 +1029,12 @@ class LikesAnalyticsView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        if granularity not in ("day", "hour"):
+            return Response(
+                {"error": "Granularity must be either day or hour"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
         try:
             date_from = datetime.strptime(date_from_param, "%Y-%m-%d")
             date_to = (datetime.strptime(date_to_param, "%Y-%m-%d")
@@ -255,23 +1045,125 @@ class LikesAnalyticsView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        analytics_data = Post.objects.filter(
-            likes__isnull=False,
-            created_at__range=(date_from, date_to)
-        ).annotate(
-            day=TruncDate("created_at")
-        ).values(
-            "day"
-        ).annotate(
-            likes_count=Count("likes")
+        if granularity == "hour":
+            analytics_data = LikeHourlyRollup.objects.totals(
+                hour__gte=date_from,
+                hour__lt=date_to,
+            )
+            response_data = [
+                {
+                    "hour": hour.strftime("%Y-%m-%dT%H:%M"),
+                    "likes_count": likes_count,
+                }
+                for hour, likes_count in analytics_data
+            ]
+        else:
+            analytics_data = LikeDailyRollup.objects.totals(
+                day__gte=date_from.date(),
+                day__lt=date_to.date(),
+            )
+            response_data = [
+                {
+                    "date": day.strftime("%Y-%m-%d"),
+                    "likes_count": likes_count,
+                }
+                for day, likes_count in analytics_data
+            ]
+
+        return Response(response_data, status=status.HTTP_200_OK)
+
+
+class ImageUploadView(APIView):
+    """
+    Chunks of a resumable image upload. Every PATCH appends its body,
+    streamed to the disk in small pieces, at the offset given in the
+    Upload-Offset header, which must be the number of bytes received so
+    far (returned by GET after an interruption). The offset is claimed
+    before the body is read, so no row lock or transaction is held while
+    it is streamed. The image is attached to the post once the announced
+    size is reached.
+    """
+
+    permission_classes = (IsAuthenticated,)
+
+    def get_upload(self, pk):
+        try:
+            return ImageUpload.objects.get(user=self.request.user, pk=pk)
+        except ImageUpload.DoesNotExist:
+            raise Http404
+
+    def get_response(self, upload, **extra):
+        return Response(
+            {**ImageUploadSerializer(upload).data, **extra},
+            headers={"Upload-Offset": str(upload.offset)},
+        )
+
+    def get_conflict_response(self, upload, error):
+        return Response(
+            {"error": error, "offset": upload.offset},
+            status=status.HTTP_409_CONFLICT,
+            headers={"Upload-Offset": str(upload.offset)},
         )
 
-        response_data = [
-            {
-                "date": item["day"].strftime("%Y-%m-%d"),
-                "likes_count": item["likes_count"],
-            }
-            for item in analytics_data
-        ]
+    def get(self, request, pk):
+        return self.get_response(self.get_upload(pk))
 
-        return Response(response_data, status=status.HTTP_200_OK)
+    def patch(self, request, pk):
+        try:
+            offset = int(request.headers["Upload-Offset"])
+            length = int(request.headers.get("Content-Length") or 0)
+        except (KeyError, ValueError):
+            return Response(
+                {"error": "The Upload-Offset header must be a number."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        upload = self.get_upload(pk)
+
+        if offset != upload.offset:
+            return self.get_conflict_response(
+                upload, "The offset does not match the bytes received so far."
+            )
+
+        if length > upload.size - upload.offset:
+            return Response(
+                {"error": "The chunk exceeds the announced size."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if not ImageUpload.objects.claim(upload, offset):
+            return self.get_conflict_response(
+                self.get_upload(pk),
+                "Another chunk of the upload is being received.",
+            )
+
+        try:
+            received = append_upload_chunk(upload, request.stream, length)
+        except ValueError as error:
+            discard_image_upload(upload)
+            return Response(
+                {"error": str(error)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except Exception:
+            ImageUpload.objects.release(upload, 0)
+            raise
+
+        if not ImageUpload.objects.release(upload, received):
+            return self.get_conflict_response(
+                self.get_upload(pk),
+                "The upload was resumed by another request.",
+            )
+
+        if not upload.completed:
+            return self.get_response(upload)
+
+        try:
+            asset = complete_image_upload(upload)
+        except ValueError as error:
+            return Response(
+                {"error": str(error)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return self.get_response(upload, image_status=asset.status)
@@ -9,8 +9,28 @@ https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+from django.conf import settings
+from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
+from django.core.handlers.asgi import ASGIHandler
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "social_network.settings")
 
-application = get_asgi_application()
+
+class AsyncViewsASGIHandler(ASGIHandler):
+    """Resolves the requests with the URLconf of the async views"""
+
+    def create_request(self, scope, body_file):
+        request, error_response = super().create_request(scope, body_file)
+
+        if request is not None:
+            request.urlconf = settings.ASGI_ROOT_URLCONF
+
+        return request, error_response
+
+
+django.setup(set_prefix=False)
+application = AsyncViewsASGIHandler()
+
+if settings.DEBUG:
+    application = ASGIStaticFilesHandler(application)
@@ -0,0 +1,17 @@
+"""
+URL configuration of the ASGI application (see social_network.asgi):
+the routes of social_network.urls, with the hot post routes served by
+native async views.
+"""
+from django.urls import include, path
+
+from post.urls import async_urlpatterns
+from social_network.urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = [
+    path("api/post/", include((async_urlpatterns, "post"), namespace="post")),
+] + [
+    pattern
+    for pattern in sync_urlpatterns
+    if getattr(pattern, "namespace", None) != "post"
+]
@@ -0,0 +1,249 @@
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpResponse, HttpResponseForbidden
+
+from post.cache import response_cache
+
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+QUERY_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+# The method label of the other methods, which the clients choose freely
+HTTP_METHODS = frozenset(
+    ("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS")
+)
+
+
+class QueryTimer:
+    """Database execute wrapper counting the queries and their time"""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+
+
+request_timer = ContextVar("request_timer", default=None)
+
+
+def time_request_queries(execute, sql, params, many, context):
+    """
+    Execute wrapper installed on every connection, passing the queries
+    to the timer of the request handled in the current context. Under
+    ASGI the queries run in other threads than the middleware, with
+    their own connections, but in a copy of the request's context.
+    """
+    timer = request_timer.get()
+
+    if timer is None:
+        return execute(sql, params, many, context)
+
+    return timer(execute, sql, params, many, context)
+
+
+@receiver(connection_created)
+def install_query_timer(sender, connection, **kwargs) -> None:
+    if time_request_queries not in connection.execute_wrappers:
+        # First, so the wrappers pushed and popped around it stay last
+        connection.execute_wrappers.insert(0, time_request_queries)
+
+
+class Histogram:
+    def __init__(self, buckets) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self):
+        """The cumulative (le, count) pairs ending with +Inf"""
+        total = 0
+
+        for bound, count in zip(self.buckets + ("+Inf",), self.counts):
+            total += count
+            yield bound, total
+
+
+class MetricsRegistry:
+    """
+    Per-process histograms of the request time, the DB time and the
+    number of queries, labelled by the resolved view name and method
+    """
+
+    metrics = (
+        (
+            "http_request_duration_seconds",
+            "Time spent processing the request.",
+            DURATION_BUCKETS,
+        ),
+        (
+            "http_request_db_duration_seconds",
+            "Time spent in database queries for the request.",
+            DURATION_BUCKETS,
+        ),
+        (
+            "http_request_db_queries",
+            "Number of database queries for the request.",
+            QUERY_BUCKETS,
+        ),
+    )
+
+    def __init__(self) -> None:
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, view, method, duration, db_duration, queries) -> None:
+        with self._lock:
+            histograms = self._histograms.get((view, method))
+
+            if histograms is None:
+                histograms = self._histograms[(view, method)] = [
+                    Histogram(buckets) for _, _, buckets in self.metrics
+                ]
+
+            for histogram, value in zip(
+                histograms, (duration, db_duration, queries)
+            ):
+                histogram.observe(value)
+
+    def render(self) -> str:
+        """The histograms in the Prometheus text exposition format"""
+        lines = []
+
+        with self._lock:
+            items = sorted(self._histograms.items())
+
+            for index, (name, description, _) in enumerate(self.metrics):
+                lines.append(f"# HELP {name} {description}")
+                lines.append(f"# TYPE {name} histogram")
+
+                for (view, method), histograms in items:
+                    histogram = histograms[index]
+                    labels = f'view="{view}",method="{method}"'
+
+                    for bound, total in histogram.samples():
+                        lines.append(
+                            f'{name}_bucket{{{labels},le="{bound}"}} {total}'
+                        )
+
+                    lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+                    lines.append(
+                        f"{name}_count{{{labels}}} {histogram.count}"
+                    )
+
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+
+registry = MetricsRegistry()
+
+
+class RequestMetricsMiddleware:
+    """
+    Counts the queries and the DB time of every request with a database
+    execute wrapper, returns them in the X-DB-Queries and Server-Timing
+    headers and adds them to the histograms served by /metrics. Works
+    in both the sync and the async request paths.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+        for connection in connections.all(initialized_only=True):
+            install_query_timer(None, connection)
+
+    def __call__(self, request) -> HttpResponse:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        timer = QueryTimer()
+        token = request_timer.set(timer)
+        started = time.perf_counter()
+
+        try:
+            response = self.get_response(request)
+        finally:
+            request_timer.reset(token)
+
+        return self.process_metrics(request, response, timer, started)
+
+    async def __acall__(self, request) -> HttpResponse:
+        timer = QueryTimer()
+        token = request_timer.set(timer)
+        started = time.perf_counter()
+
+        try:
+            response = await self.get_response(request)
+        finally:
+            request_timer.reset(token)
+
+        return self.process_metrics(request, response, timer, started)
+
+    def process_metrics(self, request, response, timer, started):
+        duration = time.perf_counter() - started
+        resolver_match = getattr(request, "resolver_match", None)
+        view = resolver_match.view_name if resolver_match else "unresolved"
+        method = request.method if request.method in HTTP_METHODS else "OTHER"
+
+        registry.observe(
+            view, method, duration, timer.duration, timer.count
+        )
+        response["X-DB-Queries"] = str(timer.count)
+        response["Server-Timing"] = (
+            f"db;dur={timer.duration * 1000:.1f}, "
+            f"total;dur={duration * 1000:.1f}"
+        )
+        return response
+
+
+def render_response_cache_stats() -> str:
+    """The hits and misses of the response cache of the process"""
+    lines = []
+
+    for result, total in response_cache.stats().items():
+        name = f"response_cache_{result}_total"
+        lines.append(f"# HELP {name} Response cache lookups ({result}).")
+        lines.append(f"# TYPE {name} counter")
+        lines.append(f"{name} {total}")
+
+    return "\n".join(lines) + "\n"
+
+
+def metrics_view(request) -> HttpResponse:
+    if request.META.get("REMOTE_ADDR") not in settings.METRICS_ALLOWED_IPS:
+        return HttpResponseForbidden()
+
+    return HttpResponse(
+        registry.render() + render_response_cache_stats(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -41,17 +41,17 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "rest_framework_simplejwt",
-    "debug_toolbar",
     "drf_spectacular",
     "user",
     "post",
 ]
 
 MIDDLEWARE = [
+    "social_network.metrics.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -61,7 +61,14 @@ MIDDLEWARE = [
     "user.middlewares.UserLastRequestTimeMiddleware",
 ]
 
+# The toolbar middleware is sync only: under ASGI it moves the requests
+# to a thread, so it is left out unless the toolbar can be shown at all
+if DEBUG:
+    INSTALLED_APPS.append("debug_toolbar")
+    MIDDLEWARE.insert(2, "debug_toolbar.middleware.DebugToolbarMiddleware")
+
 ROOT_URLCONF = "social_network.urls"
+ASGI_ROOT_URLCONF = "social_network.asgi_urls"
 
 TEMPLATES = [
     {
@@ -95,6 +102,25 @@ DATABASES = {
     }
 }
 
+# Django cache shared by all the workers: Redis when REDIS_URL is set (as
+# with docker-compose), otherwise a table of the database created by
+# "createcachetable". A per-process cache would keep serving the entries
+# another worker has invalidated, like the cached authenticated users.
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": "django_cache",
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -148,16 +174,25 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "user.throttling.AnonRateThrottle",
+        "user.throttling.UserRateThrottle",
+        "user.throttling.ScopedRateThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {
-        "anon": "100/day",
-        "user": "1000/day",
+        "anon": os.getenv("DJANGO_ANON_THROTTLE_RATE", "100/day"),
+        "user": os.getenv("DJANGO_USER_THROTTLE_RATE", "1000/day"),
+        "analytics": os.getenv("DJANGO_ANALYTICS_THROTTLE_RATE", "60/hour"),
+        "image_upload": os.getenv(
+            "DJANGO_IMAGE_UPLOAD_THROTTLE_RATE", "30/hour"
+        ),
     },
+    "DEFAULT_RENDERER_CLASSES": [
+        "social_network.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.CachedJWTAuthentication",
     ),
 }
 
@@ -174,6 +209,80 @@ SPECTACULAR_SETTINGS = {
     },
 }
 
+# Rows each hourly and daily like rollup is split in, summed when read,
+# so that concurrent likes do not all update the same row
+LIKE_ROLLUP_SHARDS = 16
+
+# Seconds between the batched writes of the users' last request times
+USER_ACTIVITY_FLUSH_INTERVAL = 10
+
+# Flush them from a thread of each serving worker and at its exit; the
+# test runner turns it off, as the thread would outlive the test database
+USER_ACTIVITY_FLUSH_THREAD = True
+
+TEST_RUNNER = "social_network.test_runner.TestRunner"
+
+# Authors with at least this many followers are not fanned out to the
+# home timelines; their posts are merged in when a feed is read
+FEED_FANOUT_MAX_FOLLOWERS = 10000
+
+# Number of the latest posts of an author pushed to a new follower
+FEED_FOLLOW_BACKFILL_SIZE = 50
+
+# Threads processing the uploaded images after the request; with 0 the
+# images are processed synchronously in the request
+IMAGE_PROCESSING_WORKERS = 2
+
+# Resumable image uploads: the largest accepted image in bytes and the
+# directory (outside of MEDIA_ROOT) the unfinished uploads are written to
+IMAGE_UPLOAD_MAX_SIZE = 20 * 1024 * 1024
+IMAGE_UPLOAD_TEMP_DIR = "/vol/web/uploads"
+
+# Seconds a chunk of an upload may take to be received before another
+# request may resume the upload instead, and seconds an unfinished
+# upload is kept before purge_image_uploads removes it
+IMAGE_UPLOAD_CLAIM_TIMEOUT = 10 * 60
+IMAGE_UPLOAD_MAX_AGE = 24 * 60 * 60
+
+# Addresses allowed to scrape the request metrics from /metrics
+METRICS_ALLOWED_IPS = os.getenv("METRICS_ALLOWED_IPS", "127.0.0.1").split(",")
+
+# Cache of the post and hashtag list/detail responses. The default backend
+# is per process; "post.cache.DjangoCacheBackend" (with an "alias" option)
+# shares the entries between the workers through a Django cache.
+RESPONSE_CACHE = {
+    "BACKEND": "post.cache.LRUCacheBackend",
+    "OPTIONS": {
+        "timeout": 60,
+        "max_entries": 1000,
+    },
+}
+
+# Process-local cache of the hashtag ids by name, used to resolve the
+# #tags of the written posts
+HASHTAG_ID_CACHE = {
+    "timeout": 300,
+    "max_entries": 10000,
+}
+
+# Build the post and hashtag list/detail responses from .values() rows
+# with the fast serializers (see post.fast_serializers) instead of the
+# model serializers; off unless DJANGO_FAST_SERIALIZATION=1
+FAST_SERIALIZATION = os.getenv("DJANGO_FAST_SERIALIZATION") == "1"
+
+# Cache of the users authenticated by an access token, dropped when a user
+# is saved or deleted. The entries and the invalidations go through the
+# default Django cache (see CACHES), so they are shared by the workers;
+# the timeout bounds how long a change made without save() (like a
+# queryset update) goes unnoticed. It only saves queries with Redis: on
+# the database cache, reading the entry replaces the user query.
+AUTH_USER_CACHE = {
+    "BACKEND": "post.cache.DjangoCacheBackend",
+    "OPTIONS": {
+        "timeout": 30,
+    },
+}
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=10),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=5),
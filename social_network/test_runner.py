@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+
+class TestRunner(DiscoverRunner):
+    """
+    DiscoverRunner without the background flush of the user activity,
+    whose thread and exit flush would write to the database configured
+    once the test database is dropped
+    """
+
+    def setup_test_environment(self, **kwargs) -> None:
+        super().setup_test_environment(**kwargs)
+        settings.USER_ACTIVITY_FLUSH_THREAD = False
@@ -0,0 +1,79 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from post.cache import response_cache
+from social_network.metrics import registry
+
+POST_LIST_URL = reverse("post:post-list")
+METRICS_URL = reverse("metrics")
+
+
+class RequestMetricsTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            username="test_user",
+            password="test_pass",
+        )
+        self.client.force_authenticate(self.user)
+        registry.clear()
+        response_cache.clear()
+
+    def test_response_reports_queries_and_timing(self):
+        res = self.client.get(POST_LIST_URL)
+
+        self.assertGreater(int(res["X-DB-Queries"]), 0)
+        self.assertIn("db;dur=", res["Server-Timing"])
+        self.assertIn("total;dur=", res["Server-Timing"])
+
+    def test_metrics_aggregated_per_view(self):
+        self.client.get(POST_LIST_URL)
+        self.client.get(POST_LIST_URL)
+
+        res = self.client.get(METRICS_URL)
+        body = res.content.decode()
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertIn("# TYPE http_request_duration_seconds histogram", body)
+        self.assertIn(
+            'http_request_duration_seconds_count{view="post:post-list",'
+            'method="GET"} 2',
+            body,
+        )
+        self.assertIn(
+            'http_request_db_queries_bucket{view="post:post-list",'
+            'method="GET",le="+Inf"} 2',
+            body,
+        )
+
+    def test_unknown_methods_share_one_label(self):
+        for method in ("BREW", "PROPFIND"):
+            self.client.generic(method, POST_LIST_URL)
+
+        body = self.client.get(METRICS_URL).content.decode()
+
+        self.assertIn(
+            'http_request_duration_seconds_count{view="post:post-list",'
+            'method="OTHER"} 2',
+            body,
+        )
+        self.assertNotIn('method="BREW"', body)
+
+    def test_response_cache_stats_exported(self):
+        self.client.get(POST_LIST_URL)
+        self.client.get(POST_LIST_URL)
+
+        body = self.client.get(METRICS_URL).content.decode()
+
+        self.assertIn("# TYPE response_cache_hits_total counter", body)
+        self.assertIn("response_cache_hits_total 1", body)
+        self.assertIn("response_cache_misses_total 1", body)
+
+    def test_metrics_restricted_to_allowed_ips(self):
+        res = self.client.get(METRICS_URL, REMOTE_ADDR="10.0.0.1")
+
+        self.assertEquals(res.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,141 @@
+import atexit
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, connections
+from django.db.models import Case, DateTimeField, Value, When
+from django.db.models.functions import Greatest
+
+logger = logging.getLogger(__name__)
+
+
+class UserActivityBuffer:
+    """
+    Collects the last request time of each user in memory and writes
+    the whole batch with a single UPDATE once the flush interval passes.
+    Repeated requests of a user within the interval are merged. Once
+    started (by the first request a worker serves, see
+    user.middlewares), a thread of the process flushes the due batch
+    without waiting for a request and the rest is flushed at exit, so at
+    most one interval of activity is lost if the worker is killed.
+    """
+
+    def __init__(self) -> None:
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._flusher_pid = None
+        self._stopped = threading.Event()
+
+    @property
+    def flush_interval(self) -> float:
+        return settings.USER_ACTIVITY_FLUSH_INTERVAL
+
+    def start(self) -> None:
+        """
+        Start the periodic flush of the process, once per process (a
+        forked worker does not inherit the thread), and the flush at exit
+        """
+        if self._flusher_pid == os.getpid() and not self._stopped.is_set():
+            return
+
+        with self._lock:
+            if (
+                self._flusher_pid == os.getpid()
+                and not self._stopped.is_set()
+            ):
+                return
+
+            first_start = self._flusher_pid is None
+            self._flusher_pid = os.getpid()
+            self._stopped.clear()
+
+        threading.Thread(
+            target=self._flush_periodically,
+            name="user-activity-flush",
+            daemon=True,
+        ).start()
+
+        if first_start:
+            atexit.register(self.stop)
+
+    def stop(self) -> None:
+        """Stop the periodic flush and write the pending times"""
+        self._stopped.set()
+        self.flush()
+
+    def _flush_periodically(self) -> None:
+        while True:
+            remaining = (
+                self._last_flush + self.flush_interval - time.monotonic()
+            )
+
+            if self._stopped.wait(
+                remaining if remaining > 0 else self.flush_interval
+            ):
+                return
+
+            if self.should_flush():
+                try:
+                    self.flush()
+                finally:
+                    # The connection of the thread would be left open
+                    connections.close_all()
+
+    def record(self, user_id, timestamp) -> None:
+        with self._lock:
+            previous = self._pending.get(user_id)
+
+            if previous is None or previous < timestamp:
+                self._pending[user_id] = timestamp
+
+    def get(self, user_id):
+        return self._pending.get(user_id)
+
+    def clear(self) -> None:
+        """Drop the pending times without writing them, like a flush"""
+        with self._lock:
+            self._pending = {}
+            self._last_flush = time.monotonic()
+
+    def should_flush(self) -> bool:
+        return (
+            bool(self._pending)
+            and time.monotonic() - self._last_flush >= self.flush_interval
+        )
+
+    def flush(self) -> int:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+
+        if not pending:
+            return 0
+
+        try:
+            return get_user_model().objects.filter(pk__in=pending).update(
+                last_request_time=Greatest(
+                    "last_request_time",
+                    Case(
+                        *[
+                            When(pk=user_id, then=Value(timestamp))
+                            for user_id, timestamp in pending.items()
+                        ],
+                        output_field=DateTimeField(),
+                    ),
+                )
+            )
+        except DatabaseError:
+            logger.exception("Failed to flush the users' last request times")
+
+            for user_id, timestamp in pending.items():
+                self.record(user_id, timestamp)
+
+            return 0
+
+
+activity_buffer = UserActivityBuffer()
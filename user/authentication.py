@@ -0,0 +1,100 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from user.cache import user_cache
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication resolving the user of the token through the user
+    cache, so a warm request runs no authentication query. The cached
+    user is still checked against the token like a fetched one.
+    """
+
+    def get_user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            )
+
+    def get_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        user = user_cache.get(user_id)
+
+        if user is None:
+            try:
+                user = self.user_model.objects.get(
+                    **{api_settings.USER_ID_FIELD: user_id}
+                )
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(
+                    _("User not found"), code="user_not_found"
+                )
+
+            user_cache.set(user)
+
+        self.check_user(user, validated_token)
+        return user
+
+    def check_user(self, user, validated_token) -> None:
+        if not user.is_active:
+            raise AuthenticationFailed(
+                _("User is inactive"), code="user_inactive"
+            )
+
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(
+                _("The user's password has been changed."),
+                code="password_changed",
+            )
+
+
+class AsyncJWTAuthentication(CachedJWTAuthentication):
+    """
+    JWT authentication for the async views: the token is validated in
+    the event loop and a user missing from the cache is fetched with the
+    async ORM.
+    """
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        user = await user_cache.aget(user_id)
+
+        if user is None:
+            try:
+                user = await self.user_model.objects.aget(
+                    **{api_settings.USER_ID_FIELD: user_id}
+                )
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(
+                    _("User not found"), code="user_not_found"
+                )
+
+            await user_cache.aset(user)
+
+        self.check_user(user, validated_token)
+        return user
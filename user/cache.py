@@ -0,0 +1,79 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+
+class UserCache:
+    """
+    Short-lived cache of the authenticated users by id, so a request
+    with a valid access token is authenticated without a query. The
+    field values are cached rather than the instance: every request
+    gets its own user, whatever the backend. Saving or deleting a user
+    drops its entry (see user.signals).
+    """
+
+    key_prefix = "auth-user"
+
+    def __init__(self) -> None:
+        self._backend = None
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            config = getattr(settings, "AUTH_USER_CACHE", {})
+            backend_class = import_string(
+                config.get("BACKEND", "post.cache.LRUCacheBackend")
+            )
+            self._backend = backend_class(**config.get("OPTIONS", {}))
+
+        return self._backend
+
+    def make_key(self, user_id) -> str:
+        return f"{self.key_prefix}:{user_id}"
+
+    def to_user(self, values):
+        if values is None:
+            return None
+
+        user_model = get_user_model()
+        return user_model.from_db(
+            None,
+            [field.attname for field in user_model._meta.concrete_fields],
+            values,
+        )
+
+    def to_values(self, user) -> list:
+        return [
+            getattr(user, field.attname)
+            for field in user._meta.concrete_fields
+        ]
+
+    def get(self, user_id):
+        return self.to_user(self.backend.get(self.make_key(user_id)))
+
+    async def aget(self, user_id):
+        return self.to_user(await self.backend.aget(self.make_key(user_id)))
+
+    def set(self, user) -> None:
+        self.backend.set(self.make_key(user.pk), self.to_values(user))
+
+    async def aset(self, user) -> None:
+        await self.backend.aset(self.make_key(user.pk), self.to_values(user))
+
+    def delete(self, user_id) -> None:
+        self.backend.delete(self.make_key(user_id))
+
+    def invalidate(self, user_id) -> None:
+        """
+        Drop the user now and once more after the commit, so a request
+        authenticated meanwhile does not keep the old row cached.
+        """
+        self.delete(user_id)
+        transaction.on_commit(lambda: self.delete(user_id))
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+
+user_cache = UserCache()
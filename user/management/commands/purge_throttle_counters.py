@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from user.models import ThrottleCounter
+
+
+class Command(BaseCommand):
+    help = "Remove the throttle counters of the clients not seen recently."
+
+    def handle(self, *args, **options):
+        deleted = ThrottleCounter.objects.purge_expired()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Removed {deleted} throttle counter(s)!")
+        )
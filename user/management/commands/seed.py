@@ -0,0 +1,372 @@
+import itertools
+import math
+import random
+from array import array
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from post.models import Comment, Hashtag, Like, Post
+
+SEED_PASSWORD = "password$$$"
+WORDS = (
+    "python", "django", "database", "index", "query", "cache", "latency",
+    "scaling", "server", "feed", "timeline", "social", "network", "post",
+    "like", "comment", "hashtag", "user", "follow", "content", "morning",
+    "coffee", "weekend", "travel", "music", "photo", "city", "friends",
+)
+
+
+def zipf_cum_weights(size, exponent):
+    """Cumulative weights of the ranks 1..size of a Zipf distribution"""
+    return array(
+        "d",
+        itertools.accumulate(
+            1 / rank ** exponent for rank in range(1, size + 1)
+        ),
+    )
+
+
+def rank_permutation(size, seed):
+    """
+    Map the popularity ranks to row indexes in a pseudo-random order, so
+    the most popular rows are not simply the first ones
+    """
+    step = 1_000_003 + seed
+
+    while math.gcd(step, size) != 1:
+        step += 1
+
+    return lambda rank: rank * step % size
+
+
+def encode_value(value) -> str:
+    if value is None:
+        return "\\N"
+
+    if isinstance(value, bool):
+        return "t" if value else "f"
+
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+class CopyStream:
+    """File-like object producing rows in the COPY text format lazily"""
+
+    def __init__(self, rows) -> None:
+        self.rows = iter(rows)
+        self.buffer = bytearray()
+        self.count = 0
+
+    def read(self, size=-1) -> bytes:
+        while size < 0 or len(self.buffer) < size:
+            row = next(self.rows, None)
+
+            if row is None:
+                break
+
+            self.count += 1
+            self.buffer += (
+                "\t".join(encode_value(value) for value in row) + "\n"
+            ).encode()
+
+        if size < 0:
+            size = len(self.buffer)
+
+        chunk = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        return chunk
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate users, hashtags, posts, post hashtags, comments and likes "
+        "with Zipf-skewed popularity and stream them into the database with "
+        "COPY. The same seed gives the same data set; the ids are the same "
+        "too when the database is empty."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10000)
+        parser.add_argument("--hashtags", type=int, default=1000)
+        parser.add_argument("--posts", type=int, default=100000)
+        parser.add_argument("--comments", type=int, default=100000)
+        parser.add_argument("--likes", type=int, default=1000000)
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=365,
+            help="Number of days the posts and likes are spread over.",
+        )
+        parser.add_argument(
+            "--until",
+            type=lambda value: datetime.strptime(value, "%Y-%m-%d"),
+            default=None,
+            help="Last day of the generated activity (YYYY-MM-DD), "
+                 "yesterday by default.",
+        )
+        parser.add_argument(
+            "--zipf",
+            type=float,
+            default=1.1,
+            help="Exponent of the Zipf distributions of the popularity.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        if min(options["users"], options["posts"], options["hashtags"]) < 1:
+            raise CommandError(
+                "At least one user, post and hashtag must be generated."
+            )
+
+        self.rng = random.Random(options["seed"])
+        self.options = options
+
+        if options["until"]:
+            self.until = options["until"] + timedelta(days=1)
+        else:
+            self.until = datetime.combine(datetime.now().date(), time())
+
+        self.since = self.until - timedelta(days=options["days"])
+
+        with transaction.atomic():
+            self.user_ids = self.copy_users()
+            self.hashtag_ids = self.copy_hashtags()
+            self.post_ids, self.post_times = self.copy_posts()
+            self.post_popularity = zipf_cum_weights(
+                options["posts"], options["zipf"]
+            )
+            self.post_by_rank = rank_permutation(
+                options["posts"], options["seed"]
+            )
+            self.copy_post_hashtags()
+            self.copy_comments()
+            self.copy_likes()
+
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "\n".join(
+                        connection.ops.sequence_reset_sql(
+                            no_style(), [get_user_model(), Hashtag, Post]
+                        )
+                    )
+                )
+
+        call_command("rebuild_post_counters", stdout=self.stdout)
+
+    def copy(self, model, fields, rows) -> int:
+        columns = ", ".join(
+            f'"{model._meta.get_field(field).column}"' for field in fields
+        )
+        stream = CopyStream(rows)
+
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f'COPY "{model._meta.db_table}" ({columns}) FROM STDIN',
+                stream,
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Copied {stream.count} {model._meta.verbose_name_plural}!"
+            )
+        )
+        return stream.count
+
+    def next_ids(self, model, count) -> range:
+        last_id = (
+            model.objects.order_by("-id").values_list("id", flat=True).first()
+            or 0
+        )
+        return range(last_id + 1, last_id + 1 + count)
+
+    def random_time(self, since):
+        return since + (self.until - since) * self.rng.random()
+
+    def copy_users(self) -> range:
+        user_model = get_user_model()
+        ids = self.next_ids(user_model, self.options["users"])
+        password = make_password(SEED_PASSWORD, salt="seed")
+        date_joined = self.since
+
+        self.copy(
+            user_model,
+            (
+                "id", "password", "is_superuser", "username", "first_name",
+                "last_name", "email", "is_staff", "is_active", "date_joined",
+                "followers_count",
+            ),
+            (
+                (
+                    user_id, password, False, f"seed_user_{user_id}",
+                    "", "", f"seed_user_{user_id}@example.com",
+                    False, True, date_joined, 0,
+                )
+                for user_id in ids
+            ),
+        )
+        return ids
+
+    def copy_hashtags(self) -> range:
+        ids = self.next_ids(Hashtag, self.options["hashtags"])
+        self.copy(
+            Hashtag,
+            ("id", "name", "posts_count"),
+            ((hashtag_id, f"SEED{hashtag_id}", 0) for hashtag_id in ids),
+        )
+        return ids
+
+    def copy_posts(self):
+        """Posts of Zipf-distributed authors spread over the period"""
+        ids = self.next_ids(Post, self.options["posts"])
+        author_weights = zipf_cum_weights(
+            self.options["users"], self.options["zipf"]
+        )
+        author_by_rank = rank_permutation(
+            self.options["users"], self.options["seed"] + 1
+        )
+        times = array("d")
+        period = (self.until - self.since).total_seconds()
+
+        def rows():
+            for post_id in ids:
+                author_rank = self.rng.choices(
+                    range(len(author_weights)), cum_weights=author_weights
+                )[0]
+                offset = self.rng.random() * period
+                times.append(offset)
+                words = self.rng.choices(WORDS, k=self.rng.randint(5, 40))
+                created_at = self.since + timedelta(seconds=offset)
+                yield (
+                    post_id,
+                    " ".join(words[:self.rng.randint(2, 5)]).capitalize(),
+                    " ".join(words).capitalize() + ".",
+                    created_at,
+                    created_at,
+                    self.user_ids[author_by_rank(author_rank)],
+                    None,
+                    0,
+                    0,
+                )
+
+        self.copy(
+            Post,
+            (
+                "id", "title", "content", "created_at", "updated_at",
+                "author", "image", "likes_count", "comments_count",
+            ),
+            rows(),
+        )
+        return ids, times
+
+    def post_time(self, index) -> datetime:
+        return self.since + timedelta(seconds=self.post_times[index])
+
+    def random_post_indexes(self, count):
+        ranks = self.rng.choices(
+            range(len(self.post_popularity)),
+            cum_weights=self.post_popularity,
+            k=count,
+        )
+        return [self.post_by_rank(rank) for rank in ranks]
+
+    def copy_post_hashtags(self) -> None:
+        hashtag_weights = zipf_cum_weights(
+            self.options["hashtags"], self.options["zipf"]
+        )
+        hashtag_by_rank = rank_permutation(
+            self.options["hashtags"], self.options["seed"] + 2
+        )
+
+        def rows():
+            for post_id in self.post_ids:
+                ranks = self.rng.choices(
+                    range(len(hashtag_weights)),
+                    cum_weights=hashtag_weights,
+                    k=self.rng.choices((0, 1, 2, 3), (30, 35, 25, 10))[0],
+                )
+
+                for rank in sorted(set(ranks)):
+                    yield post_id, self.hashtag_ids[hashtag_by_rank(rank)]
+
+        self.copy(Post.hashtags.through, ("post", "hashtag"), rows())
+
+    def copy_comments(self) -> None:
+        """Comments on Zipf-popular posts by uniformly random users"""
+
+        def rows():
+            remaining = self.options["comments"]
+
+            while remaining > 0:
+                batch = min(remaining, 10000)
+                remaining -= batch
+
+                for index in self.random_post_indexes(batch):
+                    words = self.rng.choices(WORDS, k=self.rng.randint(3, 20))
+                    yield (
+                        self.post_ids[index],
+                        self.rng.choice(self.user_ids),
+                        " ".join(words).capitalize() + ".",
+                        self.random_time(self.post_time(index)),
+                    )
+
+        self.copy(Comment, ("post", "author", "content", "created_at"), rows())
+
+    def copy_likes(self) -> None:
+        """
+        Likes of Zipf-popular posts: the number of likes of a user is
+        Zipf-distributed too, capped at a tenth of the posts with the
+        excess passed on to the next users, and a user likes a post at
+        most once
+        """
+        user_weights = [
+            1 / rank ** self.options["zipf"]
+            for rank in range(1, self.options["users"] + 1)
+        ]
+        weights_total = sum(user_weights)
+        user_by_rank = rank_permutation(
+            self.options["users"], self.options["seed"] + 3
+        )
+        max_likes_per_user = max(self.options["posts"] // 10, 1)
+
+        def rows():
+            remaining = self.options["likes"]
+            remaining_weight = weights_total
+
+            for rank, weight in enumerate(user_weights):
+                user_id = self.user_ids[user_by_rank(rank)]
+                count = min(
+                    round(remaining * weight / remaining_weight),
+                    max_likes_per_user,
+                )
+                remaining -= count
+                remaining_weight -= weight
+                indexes = set()
+
+                while len(indexes) < count:
+                    indexes.update(
+                        self.random_post_indexes(count - len(indexes))
+                    )
+
+                for index in sorted(indexes):
+                    yield (
+                        user_id,
+                        self.post_ids[index],
+                        self.random_time(self.post_time(index)),
+                    )
+
+        self.copy(Like, ("user", "post", "created_at"), rows())
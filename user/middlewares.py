@@ -1,27 +1,106 @@
-from django.contrib.auth import get_user_model
+from asgiref.sync import (
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async,
+)
+from django.conf import settings
 from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
 from rest_framework.response import Response
-from rest_framework_simplejwt.exceptions import TokenError
-from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+)
+
+from user.activity import activity_buffer
+from user.authentication import CachedJWTAuthentication
 
 
 class UserLastRequestTimeMiddleware:
+    """
+    Records the request time of the authenticated user in the activity
+    buffer, whose periodic flush is started by the first request the
+    worker serves (unless USER_ACTIVITY_FLUSH_THREAD is off, like in the
+    tests). The user of a valid access token is recorded before the
+    view runs, so the activity shown by the view includes the current
+    request; the users authenticated otherwise (like by a session) are
+    recorded once the view has authenticated them.
+    """
+
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response) -> None:
         self.get_response = get_response
+        self.authenticator = CachedJWTAuthentication()
 
-    def __call__(self, request) -> Response:
-        authorization_header = request.headers.get("Authorization", "")
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def get_token_user_id(self, request):
+        """The user id of a valid access token, without a query"""
+        try:
+            header = self.authenticator.get_header(request)
+            raw_token = (
+                self.authenticator.get_raw_token(header) if header else None
+            )
+
+            if raw_token is None:
+                return None
 
-        if authorization_header:
-            raw_token = authorization_header.split()[1]
+            return self.authenticator.get_user_id(
+                self.authenticator.get_validated_token(raw_token)
+            )
+        except (AuthenticationFailed, InvalidToken):
+            return None
 
-            try:
-                access_token = AccessToken(token=raw_token)
-                user = get_user_model().objects.get(id=access_token["user_id"])
-                user.last_request_time = timezone.now()
-                user.save()
-            except TokenError as e:
-                print(e)
+    def record_token_user(self, request, request_time) -> None:
+        user_id = self.get_token_user_id(request)
 
+        if user_id is not None:
+            activity_buffer.record(user_id, request_time)
+
+    def __call__(self, request) -> Response:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        if settings.USER_ACTIVITY_FLUSH_THREAD:
+            activity_buffer.start()
+
+        request_time = timezone.now()
+        self.record_token_user(request, request_time)
         response = self.get_response(request)
+        user = getattr(request, "user", None)
+
+        if user is not None and user.is_authenticated:
+            activity_buffer.record(user.pk, request_time)
+
+            if activity_buffer.should_flush():
+                activity_buffer.flush()
+
+        return response
+
+    async def __acall__(self, request) -> Response:
+        if settings.USER_ACTIVITY_FLUSH_THREAD:
+            activity_buffer.start()
+
+        request_time = timezone.now()
+        self.record_token_user(request, request_time)
+        response = await self.get_response(request)
+        user = getattr(request, "user", None)
+
+        if isinstance(user, SimpleLazyObject):
+            # Not replaced by an API authentication: the session user,
+            # loaded only when there is a session to load it from
+            if settings.SESSION_COOKIE_NAME not in request.COOKIES:
+                return response
+
+            user = await request.auser()
+
+        if user is not None and user.is_authenticated:
+            activity_buffer.record(user.pk, request_time)
+
+            if activity_buffer.should_flush():
+                await sync_to_async(activity_buffer.flush)()
+
         return response
@@ -0,0 +1,26 @@
+# Generated by Django 5.0 on 2026-10-18 07:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("user", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="followers_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="following",
+            field=models.ManyToManyField(
+                blank=True, related_name="followers", to=settings.AUTH_USER_MODEL
+            ),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.0 on 2026-10-18 08:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("user", "0002_user_following"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ThrottleCounter",
+            fields=[
+                (
+                    "key",
+                    models.CharField(max_length=255, primary_key=True, serialize=False),
+                ),
+                ("period", models.BigIntegerField()),
+                ("count", models.PositiveIntegerField()),
+                ("previous_count", models.PositiveIntegerField()),
+                ("expires_at", models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
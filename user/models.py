@@ -1,6 +1,101 @@
+from datetime import datetime
+
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import connection, models
+from django.utils import timezone
 
 
 class User(AbstractUser):
     last_request_time = models.DateTimeField(null=True, blank=True)
+    following = models.ManyToManyField(
+        "self",
+        symmetrical=False,
+        related_name="followers",
+        blank=True,
+    )
+    followers_count = models.PositiveIntegerField(default=0, editable=False)
+
+
+class ThrottleCounterManager(models.Manager):
+    def hit(self, key, limit, duration, now) -> bool:
+        """
+        Count a request of the key unless the requests of its fixed window
+        of ``duration`` seconds plus the covered part of the previous one
+        reach the limit, with one atomic INSERT ... ON CONFLICT DO UPDATE
+        ... WHERE; return whether the request was counted
+        """
+        period = int(now // duration)
+        previous_weight = 1 - now % duration / duration
+        table = self.model._meta.db_table
+        previous_count = f"""
+            CASE {table}.period
+                WHEN EXCLUDED.period THEN {table}.previous_count
+                WHEN EXCLUDED.period - 1 THEN {table}.count
+                ELSE 0
+            END
+        """
+        count = f"""
+            CASE {table}.period
+                WHEN EXCLUDED.period THEN {table}.count
+                ELSE 0
+            END
+        """
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {table} (key, period, count, previous_count,
+                                     expires_at)
+                VALUES (%s, %s, 1, 0, %s)
+                ON CONFLICT (key) DO UPDATE SET
+                    previous_count = {previous_count},
+                    count = {count} + 1,
+                    period = EXCLUDED.period,
+                    expires_at = EXCLUDED.expires_at
+                WHERE {previous_count} * %s + {count} + 1 <= %s
+                """,
+                [
+                    key,
+                    period,
+                    datetime.fromtimestamp((period + 2) * duration),
+                    previous_weight,
+                    limit,
+                ],
+            )
+            return cursor.rowcount == 1
+
+    def get_counts(self, key, duration, now) -> tuple:
+        """Counts of the key in the window ``now`` falls in and the previous"""
+        period = int(now // duration)
+        counter = self.filter(key=key).first()
+
+        if counter is None or counter.period < period - 1:
+            return 0, 0
+
+        if counter.period == period - 1:
+            return 0, counter.count
+
+        return counter.count, counter.previous_count
+
+    def purge_expired(self) -> int:
+        """Remove the counters of the keys not seen for two windows"""
+        deleted, _ = self.filter(expires_at__lt=timezone.now()).delete()
+        return deleted
+
+
+class ThrottleCounter(models.Model):
+    """
+    Requests of a throttle key (see user.throttling) counted in its
+    current and previous fixed window, shared by all the workers
+    """
+
+    key = models.CharField(max_length=255, primary_key=True)
+    period = models.BigIntegerField()
+    count = models.PositiveIntegerField()
+    previous_count = models.PositiveIntegerField()
+    expires_at = models.DateTimeField(db_index=True)
+
+    objects = ThrottleCounterManager()
+
+    def __str__(self):
+        return f"{self.key}: {self.count} (previous {self.previous_count})"
@@ -0,0 +1,64 @@
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+
+from user.cache import user_cache
+
+User = get_user_model()
+
+
+@receiver(m2m_changed, sender=User.following.through)
+def update_followers_count(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    """Keep User.followers_count in step with the following relation"""
+    if action == "post_add":
+        if reverse:
+            User.objects.filter(pk=instance.pk).update(
+                followers_count=F("followers_count") + len(pk_set)
+            )
+        else:
+            User.objects.filter(pk__in=pk_set).update(
+                followers_count=F("followers_count") + 1
+            )
+
+    elif action == "pre_remove":
+        if reverse:
+            removed = sender.objects.filter(
+                to_user=instance, from_user__in=pk_set
+            ).count()
+            User.objects.filter(pk=instance.pk).update(
+                followers_count=F("followers_count") - removed
+            )
+        else:
+            User.objects.filter(pk__in=pk_set, followers=instance).update(
+                followers_count=F("followers_count") - 1
+            )
+
+    elif action == "pre_clear":
+        if reverse:
+            User.objects.filter(pk=instance.pk).update(followers_count=0)
+        else:
+            User.objects.filter(followers=instance).update(
+                followers_count=F("followers_count") - 1
+            )
+
+
+@receiver(pre_delete, sender=User)
+def release_following(sender, instance, **kwargs):
+    """Follows of a deleted user are removed by cascade without m2m signals"""
+    User.objects.filter(followers=instance).update(
+        followers_count=F("followers_count") - 1
+    )
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """A profile or password change must not be served from the user cache"""
+    user_cache.invalidate(instance.pk)
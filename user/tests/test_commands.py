@@ -0,0 +1,99 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from post.models import Comment, Hashtag, Like, Post
+from user.models import ThrottleCounter
+
+SEED_OPTIONS = {
+    "users": 20,
+    "hashtags": 5,
+    "posts": 50,
+    "comments": 40,
+    "likes": 100,
+    "until": None,
+    "seed": 1,
+}
+
+
+def seed(**options):
+    call_command("seed", stdout=StringIO(), **{**SEED_OPTIONS, **options})
+
+
+def normalized_likes(users):
+    first_user_id = users[0].id
+    first_post_id = Post.objects.filter(author__in=users).order_by("id")[0].id
+    return sorted(
+        (like.user_id - first_user_id, like.post_id - first_post_id)
+        for like in Like.objects.filter(user__in=users)
+    )
+
+
+class SeedCommandTests(TestCase):
+    def test_seed_generates_rows_and_counters(self):
+        seed()
+
+        self.assertEquals(get_user_model().objects.count(), 20)
+        self.assertEquals(Hashtag.objects.count(), 5)
+        self.assertEquals(Post.objects.count(), 50)
+        self.assertEquals(Comment.objects.count(), 40)
+        self.assertEquals(Like.objects.count(), 100)
+        self.assertEquals(
+            sum(Post.objects.values_list("likes_count", flat=True)), 100
+        )
+        self.assertFalse(Post.objects.filter(search_vector=None).exists())
+        call_command("rebuild_post_counters", "--check", stdout=StringIO())
+
+    def test_seed_is_deterministic(self):
+        seed()
+        first_users = list(get_user_model().objects.order_by("id"))
+        seed()
+        second_users = list(
+            get_user_model().objects.order_by("id")[len(first_users):]
+        )
+
+        self.assertEquals(
+            normalized_likes(first_users),
+            normalized_likes(second_users),
+        )
+
+    def test_seed_continues_the_sequences(self):
+        seed()
+
+        post = Post.objects.create(
+            author=get_user_model().objects.first(),
+            title="Title",
+            content="Content",
+        )
+
+        self.assertEquals(post.id, Post.objects.order_by("-id")[1].id + 1)
+
+
+class PurgeThrottleCountersCommandTests(TestCase):
+    def test_purge_removes_expired_counters(self):
+        now = timezone.now()
+
+        for key, expires_at in (
+            ("expired", now - timedelta(minutes=1)),
+            ("current", now + timedelta(minutes=1)),
+        ):
+            ThrottleCounter.objects.create(
+                key=key,
+                period=0,
+                count=1,
+                previous_count=0,
+                expires_at=expires_at,
+            )
+
+        out = StringIO()
+        call_command("purge_throttle_counters", stdout=out)
+
+        self.assertIn("Removed 1 throttle counter(s)!", out.getvalue())
+        self.assertEquals(
+            list(ThrottleCounter.objects.values_list("key", flat=True)),
+            ["current"],
+        )
@@ -1,15 +1,32 @@
+import time
+from datetime import datetime
+from unittest import mock
+
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 
 from rest_framework import status
 from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 
+from post.cache import response_cache
+from user.activity import UserActivityBuffer, activity_buffer
+from user.cache import user_cache
+from user.models import ThrottleCounter
 from user.serializers import UserSerializer
+from user.throttling import SlidingWindowRateThrottle
 
 USER_CREATE_URL = reverse("user:create_user")
 USER_MANAGE_URL = reverse("user:manage_user")
 USER_ACTIVITY_URL = reverse("user:show_user_activity")
+POST_LIST_URL = reverse("post:post-list")
+ANALYTICS_URL = reverse("post:analytics")
 
 
 class UnauthenticatedUserApiTests(TestCase):
@@ -53,6 +70,10 @@ class AuthenticatedUserApiTests(TestCase):
             "test_password",
         )
         self.client.force_authenticate(self.user)
+        activity_buffer.clear()
+
+    def tearDown(self) -> None:
+        activity_buffer.clear()
 
     def test_retrieve_user(self):
         res = self.client.get(USER_MANAGE_URL)
@@ -87,3 +108,277 @@ class AuthenticatedUserApiTests(TestCase):
 
         self.assertEquals(res.status_code, status.HTTP_200_OK)
         self.assertEquals(payload["first_name"], self.user.first_name)
+
+    def test_last_request_time_is_buffered_until_flush(self):
+        self.client.get(USER_MANAGE_URL)
+        self.client.get(USER_MANAGE_URL)
+        self.user.refresh_from_db()
+
+        self.assertIsNone(self.user.last_request_time)
+        self.assertIsNotNone(activity_buffer.get(self.user.id))
+
+        self.assertEquals(activity_buffer.flush(), 1)
+        self.user.refresh_from_db()
+
+        self.assertIsNotNone(self.user.last_request_time)
+        self.assertIsNone(activity_buffer.get(self.user.id))
+
+    def test_show_user_activity_includes_current_request(self):
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+        request_time = timezone.now()
+
+        res = client.get(USER_ACTIVITY_URL)
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertGreaterEqual(
+            datetime.fromisoformat(res.data["last_request_time"]),
+            request_time,
+        )
+
+    def test_periodic_flush_started_only_when_serving(self):
+        with mock.patch.object(activity_buffer, "start") as start:
+            self.client.get(USER_MANAGE_URL)
+
+            start.assert_not_called()
+
+            with self.settings(USER_ACTIVITY_FLUSH_THREAD=True):
+                self.client.get(USER_MANAGE_URL)
+
+            start.assert_called_once_with()
+
+    def test_show_user_activity_includes_pending_request_time(self):
+        self.client.get(USER_MANAGE_URL)
+        pending_request_time = activity_buffer.get(self.user.id)
+
+        res = self.client.get(USER_ACTIVITY_URL)
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertEquals(
+            res.data["last_request_time"],
+            pending_request_time.isoformat(),
+        )
+
+
+@override_settings(USER_ACTIVITY_FLUSH_INTERVAL=0.1)
+class UserActivityPeriodicFlushTests(TransactionTestCase):
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            "test_user",
+            "test_password",
+        )
+        self.buffer = UserActivityBuffer()
+
+    def tearDown(self) -> None:
+        self.buffer.stop()
+
+    def get_last_request_time(self):
+        self.user.refresh_from_db()
+        return self.user.last_request_time
+
+    def test_pending_times_flushed_without_requests(self):
+        self.buffer.start()
+        self.buffer.record(self.user.id, timezone.now())
+        deadline = time.monotonic() + 5
+
+        while (
+            self.get_last_request_time() is None
+            and time.monotonic() < deadline
+        ):
+            time.sleep(0.05)
+
+        self.assertIsNotNone(self.user.last_request_time)
+        self.assertIsNone(self.buffer.get(self.user.id))
+
+    def test_pending_times_flushed_on_stop(self):
+        with self.settings(USER_ACTIVITY_FLUSH_INTERVAL=3600):
+            self.buffer.start()
+            self.buffer.record(self.user.id, timezone.now())
+
+            self.buffer.stop()
+
+        self.assertIsNotNone(self.get_last_request_time())
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test_user",
+            "test_password",
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+        user_cache.clear()
+
+    def get_queries(self):
+        response_cache.clear()
+
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.get(POST_LIST_URL)
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        return [query["sql"] for query in context.captured_queries]
+
+    def get_user_queries(self):
+        return [
+            sql for sql in self.get_queries() if 'FROM "user_user"' in sql
+        ]
+
+    # A cache out of the database, like Redis
+    @override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            }
+        }
+    )
+    def test_warm_request_runs_no_auth_queries(self):
+        cold_queries = self.get_queries()
+        warm_queries = self.get_queries()
+
+        self.assertEquals(len(warm_queries), len(cold_queries) - 1)
+        self.assertFalse(
+            any('FROM "user_user"' in sql for sql in warm_queries)
+        )
+
+    def test_database_cache_replaces_user_query(self):
+        self.get_queries()
+        warm_queries = self.get_queries()
+
+        self.assertFalse(
+            any('FROM "user_user"' in sql for sql in warm_queries)
+        )
+        self.assertEquals(
+            len([sql for sql in warm_queries if '"django_cache"' in sql]), 1
+        )
+
+    def test_user_update_invalidates_cache(self):
+        self.get_queries()
+
+        res = self.client.patch(USER_MANAGE_URL, {"first_name": "Updated"})
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+        self.assertIsNone(user_cache.get(self.user.id))
+        self.assertEquals(len(self.get_user_queries()), 1)
+
+    def test_invalidation_reaches_other_workers(self):
+        # The entries are kept out of the process (the database or Redis)
+        self.assertNotIsInstance(caches["default"], LocMemCache)
+
+        self.get_queries()
+        key = user_cache.make_key(self.user.id)
+        # The cache of another worker: its own cache object, sharing only
+        # what the cache server holds
+        other_worker_cache = caches.create_connection("default")
+
+        self.assertIsNotNone(other_worker_cache.get(key))
+
+        self.user.first_name = "Updated"
+        self.user.save()
+
+        self.assertIsNone(other_worker_cache.get(key))
+
+    def test_password_change_invalidates_cache(self):
+        self.get_queries()
+
+        self.user.set_password("new_test_password")
+        self.user.save()
+
+        self.assertIsNone(user_cache.get(self.user.id))
+
+    def test_deactivated_user_is_not_served_from_cache(self):
+        self.get_queries()
+
+        self.user.is_active = False
+        self.user.save()
+        res = self.client.get(POST_LIST_URL)
+
+        self.assertEquals(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class SlidingWindowThrottleTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test_user",
+            "test_password",
+        )
+        self.client.force_authenticate(self.user)
+        self.now = 6000.0
+        self.patches = [
+            mock.patch.object(
+                SlidingWindowRateThrottle,
+                "THROTTLE_RATES",
+                {"anon": "2/min", "user": "2/min", "analytics": "1/min"},
+            ),
+            mock.patch.object(
+                SlidingWindowRateThrottle,
+                "timer",
+                side_effect=lambda: self.now,
+            ),
+        ]
+
+        for patch in self.patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def get_statuses(self, count, url=USER_MANAGE_URL):
+        return [self.client.get(url).status_code for _ in range(count)]
+
+    def test_requests_over_limit_throttled(self):
+        self.assertEquals(
+            self.get_statuses(3),
+            [status.HTTP_200_OK] * 2 + [status.HTTP_429_TOO_MANY_REQUESTS],
+        )
+
+        res = self.client.get(USER_MANAGE_URL)
+
+        self.assertEquals(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEquals(res["Retry-After"], "60")
+
+        counter = ThrottleCounter.objects.get(
+            key=f"throttle_user_{self.user.id}"
+        )
+
+        self.assertEquals(counter.count, 2)
+        self.assertEquals(counter.previous_count, 0)
+
+    def test_previous_window_weighs_by_remaining_part(self):
+        self.get_statuses(2)
+
+        self.now += 60 + 15
+        self.assertEquals(
+            self.get_statuses(1), [status.HTTP_429_TOO_MANY_REQUESTS]
+        )
+
+        self.now += 15
+        res = self.client.get(USER_MANAGE_URL)
+
+        self.assertEquals(res.status_code, status.HTTP_200_OK)
+
+        res = self.client.get(USER_MANAGE_URL)
+
+        self.assertEquals(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEquals(res["Retry-After"], "30")
+
+    def test_unused_counters_reset(self):
+        self.get_statuses(3)
+
+        self.now += 2 * 60
+        self.assertEquals(self.get_statuses(2), [status.HTTP_200_OK] * 2)
+
+    def test_scoped_limit_of_analytics(self):
+        params = {"date_from": "2024-01-01", "date_to": "2024-01-01"}
+        statuses = [
+            self.client.get(ANALYTICS_URL, params).status_code
+            for _ in range(2)
+        ]
+
+        self.assertEquals(
+            statuses,
+            [status.HTTP_200_OK, status.HTTP_429_TOO_MANY_REQUESTS],
+        )
@@ -0,0 +1,55 @@
+from rest_framework import throttling
+
+from user.models import ThrottleCounter
+
+
+class SlidingWindowRateThrottle(throttling.SimpleRateThrottle):
+    """
+    Rate throttle approximating a sliding window from the request counts
+    of the current and the previous fixed window, the previous one
+    weighted by the part of it the sliding window still covers. Every
+    key has one row of two counters in the database instead of a list
+    of request times in a per-process cache, so the limits hold across
+    the workers; a request is checked and counted in one atomic upsert.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        return ThrottleCounter.objects.hit(
+            self.key, self.num_requests, self.duration, self.now
+        )
+
+    def wait(self):
+        count, previous_count = ThrottleCounter.objects.get_counts(
+            self.key, self.duration, self.now
+        )
+        elapsed = self.now % self.duration / self.duration
+
+        if count >= self.num_requests or not previous_count:
+            return (1 - elapsed) * self.duration
+
+        # The previous window must weigh little enough for one more request
+        weight = (self.num_requests - count - 1) / previous_count
+        return max(0, 1 - weight - elapsed) * self.duration
+
+
+class AnonRateThrottle(throttling.AnonRateThrottle, SlidingWindowRateThrottle):
+    pass
+
+
+class UserRateThrottle(throttling.UserRateThrottle, SlidingWindowRateThrottle):
+    pass
+
+
+class ScopedRateThrottle(
+    throttling.ScopedRateThrottle, SlidingWindowRateThrottle
+):
+    pass
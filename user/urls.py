@@ -7,6 +7,7 @@ from rest_framework_simplejwt.views import (
 
 from user.views import (
     CreateUserView,
+    FollowUserView,
     ManageUserView,
     ShowUserActivityView,
 )
@@ -19,6 +20,7 @@ urlpatterns = [
         ShowUserActivityView.as_view(),
         name="show_user_activity",
     ),
+    path("<int:pk>/follow/", FollowUserView.as_view(), name="follow_user"),
     path("token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("token/verify/", TokenVerifyView.as_view(), name="token_verify"),
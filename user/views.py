@@ -1,6 +1,11 @@
-from rest_framework import generics
+from django.contrib.auth import get_user_model
+from django.shortcuts import get_object_or_404
+from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
+from user.activity import activity_buffer
 from user.serializers import UserSerializer, UserActivitySerializer
 
 
@@ -13,7 +18,13 @@ class ManageUserView(generics.RetrieveUpdateAPIView):
     permission_classes = (IsAuthenticated,)
 
     def get_object(self):
-        return self.request.user
+        """
+        The authenticated user may come from the user cache; it is read
+        again so stale counters are neither shown nor saved back
+        """
+        user = self.request.user
+        user.refresh_from_db()
+        return user
 
 
 class ShowUserActivityView(generics.RetrieveAPIView):
@@ -21,4 +32,47 @@ class ShowUserActivityView(generics.RetrieveAPIView):
     permission_classes = (IsAuthenticated,)
 
     def get_object(self):
-        return self.request.user
+        """Overlay the request time that is not flushed to the DB yet"""
+        user = self.request.user
+        user.refresh_from_db()
+        pending_request_time = activity_buffer.get(user.pk)
+
+        if pending_request_time and (
+            user.last_request_time is None
+            or user.last_request_time < pending_request_time
+        ):
+            user.last_request_time = pending_request_time
+
+        return user
+
+
+class FollowUserView(APIView):
+    permission_classes = (IsAuthenticated,)
+
+    def post(self, request, pk=None):
+        """Endpoint for following the user"""
+        user = self.request.user
+        author = get_object_or_404(get_user_model(), pk=pk)
+
+        if author == user:
+            return Response(
+                {"error": "You cannot follow yourself."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        user.following.add(author)
+        return Response(
+            {"detail": f"You are following {author.username} now."},
+            status=status.HTTP_200_OK,
+        )
+
+    def delete(self, request, pk=None):
+        """Endpoint for unfollowing the user"""
+        user = self.request.user
+        author = get_object_or_404(get_user_model(), pk=pk)
+
+        user.following.remove(author)
+        return Response(
+            {"detail": f"You are not following {author.username} anymore."},
+            status=status.HTTP_200_OK,
+        )